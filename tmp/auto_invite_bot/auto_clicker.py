@@ -1,12 +1,41 @@
+import logging
 import time
 import random
 from typing import Optional
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, ElementClickInterceptedException,
+                                        StaleElementReferenceException, WebDriverException)
+
+from dom_ready import LOCATE_JS, READY_OBSERVER_JS, WAIT_READY_JS
+
+
+logger = logging.getLogger(__name__)
+
+# 就绪条件 -> expected_conditions 工厂
+READY_CONDITIONS = {
+    'clickable': EC.element_to_be_clickable,
+    'visible': EC.visibility_of_element_located,
+    'present': EC.presence_of_element_located,
+}
+
+# 可以由页面内观察器等待的定位方式
+OBSERVER_KINDS = {
+    By.CSS_SELECTOR: 'css',
+    By.XPATH: 'xpath',
+}
+
+# 按范围和选择器变体定位（value 为 page_selectors.SelectorRegistry.spec 返回的规则）
+SCOPED = 'scoped'
+
+# arguments: 滚动容器的 CSS 选择器（为空或找不到时滚动窗口）, 滚动距离（为空时滚到底部）
+SCROLL_DOWN_JS = """
+const [container, amount] = arguments;
+const target = (container && document.querySelector(container)) || document.scrollingElement || document.body;
+if (amount) { target.scrollBy(0, amount); } else { target.scrollTop = target.scrollHeight; }
+"""
 
 
 class AutoClicker:
@@ -18,15 +47,41 @@ class AutoClicker:
         self.max_delay = config.get('max_delay', 3.0)
         self.max_retries = config.get('max_retries', 3)
         self.click_retry_delay = config.get('click_retry_delay', 1.0)
-        self.implicit_wait = config.get('implicit_wait', 10)
+        self.default_timeout = config.get('default_timeout', 10)
+        # 每一步都使用显式等待，隐式等待默认关闭，避免找不到元素时每次查找都空等
+        self.implicit_wait = config.get('implicit_wait', 0)
 
         # 设置隐式等待时间
         self.driver.implicitly_wait(self.implicit_wait)
 
+        # observer=页面内 MutationObserver 通知就绪；poll=WebDriverWait 轮询
+        self.wait_strategy = config.get('wait_strategy', 'observer')
+        self._script_timeout = 0
+        if self.wait_strategy == 'observer':
+            try:
+                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                    'source': READY_OBSERVER_JS
+                })
+            except (AttributeError, WebDriverException):
+                # 不支持 CDP 时由等待脚本在当前文档中按需安装
+                pass
+
+        # 本次运行的耗时统计：等待元素就绪 / 鼠标移动与点击 / 模拟人类的随机延迟
+        self.timing = {"wait": 0.0, "action": 0.0, "delay": 0.0}
+        self.counts = {"clicks": 0, "failed_clicks": 0, "retries": 0, "wait_timeouts": 0, "stale_retries": 0}
+        self.last_click = {}
+        # 最近一次按范围定位时匹配到的选择器变体
+        self.last_match = None
+
+    def _sleep(self, seconds: float):
+        """计入延迟耗时的 sleep"""
+        time.sleep(seconds)
+        self.timing["delay"] += seconds
+
     def human_like_delay(self):
         """模拟人类随机延迟"""
         delay = random.uniform(self.min_delay, self.max_delay)
-        time.sleep(delay)
+        self._sleep(delay)
 
     def move_to_element(self, element):
         """模拟鼠标移动到元素"""
@@ -34,87 +89,217 @@ class AutoClicker:
             actions = ActionChains(self.driver)
             actions.move_to_element(element)
             actions.perform()
-            time.sleep(random.uniform(0.3, 0.8))
+            self._sleep(random.uniform(0.3, 0.8))
         except Exception as e:
-            print(f"鼠标移动失败: {e}")
+            logger.warning(f"鼠标移动失败: {e}")
+
+    def _wait_until(self, by: By, value: str, timeout: float, condition: str):
+        """显式等待元素满足就绪条件，计入等待耗时"""
+        start = time.perf_counter()
+        try:
+            if by == SCOPED:
+                return self._wait_scoped(value, timeout, condition)
+            if self.wait_strategy == 'observer' and by in OBSERVER_KINDS:
+                return self._observe(by, value, timeout, condition)
+            return WebDriverWait(self.driver, timeout).until(
+                READY_CONDITIONS[condition]((by, value))
+            )
+        except TimeoutException:
+            self.counts["wait_timeouts"] += 1
+            raise
+        finally:
+            self.timing["wait"] += time.perf_counter() - start
+
+    def _run_observer(self, timeout: float, spec: dict):
+        """执行一次异步等待脚本，返回页面回调的结果（超时为 None）"""
+        if timeout + 5 > self._script_timeout:
+            self._script_timeout = max(timeout + 5, 30)
+            self.driver.set_script_timeout(self._script_timeout)
+        return self.driver.execute_async_script(WAIT_READY_JS, spec, int(timeout * 1000))
+
+    def wait_for_signal(self, spec: dict, timeout: float = None):
+        """等待页面内观察器的条件（见 dom_ready.WAIT_READY_JS），返回结果，超时返回 None
+
+        等待期间文档被替换（整页跳转）时，在新文档中用剩余时间再等一次。
+        """
+        timeout = timeout or self.default_timeout
+        start = time.perf_counter()
+        try:
+            try:
+                result = self._run_observer(timeout, spec)
+            except WebDriverException:
+                remaining = max(timeout - (time.perf_counter() - start), 0.1)
+                try:
+                    result = self._run_observer(remaining, spec)
+                except WebDriverException:
+                    result = None
+        finally:
+            self.timing["wait"] += time.perf_counter() - start
+        if not result:
+            self.counts["wait_timeouts"] += 1
+        return result
+
+    def _observe(self, by: By, value: str, timeout: float, condition: str):
+        """由页面内观察器等待元素就绪，一次请求阻塞到元素出现或超时"""
+        deadline = time.perf_counter() + timeout
+        spec = {"type": "element", "kind": OBSERVER_KINDS[by], "selector": value, "condition": condition}
+        try:
+            element = self._run_observer(timeout, spec)
+        except WebDriverException:
+            # 等待期间页面跳转，旧文档中的脚本被丢弃；剩余时间改用轮询
+            remaining = max(deadline - time.perf_counter(), 0.1)
+            return WebDriverWait(self.driver, remaining).until(
+                READY_CONDITIONS[condition]((by, value))
+            )
+        if element is None:
+            raise TimeoutException(f"等待元素超时: {value}")
+        return element
+
+    def locate(self, spec: dict, condition: str = 'present'):
+        """按范围和选择器变体立即查找一次（一次脚本调用），返回元素或 None，匹配到的变体记入 last_match"""
+        result = self.driver.execute_script(LOCATE_JS, {**spec, "condition": condition})
+        if not result:
+            return None
+        self.last_match = spec["variants"][result["variant"]][1]
+        return result["element"]
+
+    def _wait_scoped(self, spec: dict, timeout: float, condition: str):
+        """等待范围内任一选择器变体满足就绪条件；observer 模式下由页面内观察器通知"""
+        deadline = time.perf_counter() + timeout
+        if self.wait_strategy == 'observer':
+            try:
+                result = self._run_observer(timeout, {**spec, "type": "scoped", "condition": condition})
+            except WebDriverException:
+                # 等待期间页面跳转，剩余时间改用轮询
+                timeout = max(deadline - time.perf_counter(), 0.1)
+            else:
+                if not result:
+                    raise TimeoutException(f"等待元素超时: {spec['variants'][0][1]}")
+                self.last_match = spec["variants"][result["variant"]][1]
+                return result["element"]
+        return WebDriverWait(self.driver, timeout).until(lambda driver: self.locate(spec, condition))
+
+    def _find_first(self, by: By, value):
+        """不等待地查找第一个匹配的元素"""
+        if by == SCOPED:
+            try:
+                return self.locate(value)
+            except WebDriverException:
+                return None
+        elements = self.driver.find_elements(by, value)
+        return elements[0] if elements else None
+
+    def click_with_retry(self, by: By, value: str, description: str = "",
+                         timeout: float = None, condition: str = "clickable") -> bool:
+        """带重试机制的点击，模拟人类行为
+
+        timeout / condition 由调用方按步骤指定，未指定时使用 default_timeout 和可点击条件。
+        本次点击的等待、操作、延迟耗时和重试次数保存在 self.last_click 中。
+        """
+        timing_before = dict(self.timing)
+        retries_before = self.counts["retries"]
+        self.last_match = None
+        ok = self._click_with_retry(by, value, description, timeout, condition)
+        self.last_click = {key: self.timing[key] - timing_before[key] for key in self.timing}
+        self.last_click["retries"] = self.counts["retries"] - retries_before
+        self.last_click["ok"] = ok
+        if by == SCOPED:
+            self.last_click["selector"] = self.last_match if ok else None
+        return ok
+
+    def _click_with_retry(self, by: By, value: str, description: str,
+                          timeout: Optional[float], condition: str) -> bool:
+        if timeout is None:
+            timeout = self.default_timeout
 
-    def click_with_retry(self, by: By, value: str, description: str = "") -> bool:
-        """带重试机制的点击，模拟人类行为"""
         for attempt in range(self.max_retries):
+            if attempt > 0:
+                self.counts["retries"] += 1
             try:
-                # 等待元素可见
-                element = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((by, value))
-                )
+                # 等待元素就绪
+                element = self._wait_until(by, value, timeout, condition)
 
                 # 模拟鼠标移动
+                start = time.perf_counter()
+                delay_before = self.timing["delay"]
                 self.move_to_element(element)
 
                 # 随机延迟
-                time.sleep(random.uniform(0.2, 0.5))
+                self._sleep(random.uniform(0.2, 0.5))
 
                 # 点击
                 element.click()
-                print(f"✓ 点击成功: {description}")
+                self.timing["action"] += (time.perf_counter() - start) - (self.timing["delay"] - delay_before)
+                self.counts["clicks"] += 1
+                logger.info(f"✓ 点击成功: {description}")
 
                 # 点击后的随机延迟
                 self.human_like_delay()
                 return True
 
-            except (TimeoutException, NoSuchElementException, ElementClickInterceptedException) as e:
-                print(f"✗ 点击失败 (尝试 {attempt + 1}/{self.max_retries}): {description} - {str(e)}")
+            except (TimeoutException, NoSuchElementException, ElementClickInterceptedException,
+                    StaleElementReferenceException) as e:
+                if isinstance(e, StaleElementReferenceException):
+                    # 等到的元素在点击前被页面重新渲染（例如后退后列表重新加载）
+                    self.counts["stale_retries"] += 1
+                logger.warning(f"✗ 点击失败 (尝试 {attempt + 1}/{self.max_retries}): {description} - {str(e)}")
 
                 if attempt < self.max_retries - 1:
-                    # 尝试滚动到元素位置
-                    try:
-                        element = self.driver.find_element(by, value)
+                    # 尝试滚动到元素位置（不等待，找不到就直接重试）
+                    element = self._find_first(by, value)
+                    if element is not None:
                         self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                        time.sleep(self.click_retry_delay)
-                    except:
-                        time.sleep(self.click_retry_delay)
+                    self._sleep(self.click_retry_delay)
 
+        self.counts["failed_clicks"] += 1
         return False
 
-    def click_by_text(self, text: str, partial: bool = False, description: str = "") -> bool:
+    def click_by_text(self, text: str, partial: bool = False, description: str = "", **wait) -> bool:
         """根据文本内容点击元素"""
         by = By.PARTIAL_LINK_TEXT if partial else By.LINK_TEXT
-        return self.click_with_retry(by, text, description or text)
+        return self.click_with_retry(by, text, description or text, **wait)
 
-    def click_by_xpath(self, xpath: str, description: str = "") -> bool:
+    def click_by_xpath(self, xpath: str, description: str = "", **wait) -> bool:
         """根据XPath点击元素"""
-        return self.click_with_retry(By.XPATH, xpath, description or xpath)
+        return self.click_with_retry(By.XPATH, xpath, description or xpath, **wait)
 
-    def click_by_css(self, css_selector: str, description: str = "") -> bool:
+    def click_by_css(self, css_selector: str, description: str = "", **wait) -> bool:
         """根据CSS选择器点击元素"""
-        return self.click_with_retry(By.CSS_SELECTOR, css_selector, description or css_selector)
+        return self.click_with_retry(By.CSS_SELECTOR, css_selector, description or css_selector, **wait)
 
-    def wait_for_element(self, by: By, value: str, timeout: int = 10):
+    def click_scoped(self, spec: dict, description: str = "", **wait) -> bool:
+        """在范围内按选择器变体点击元素，匹配到的变体见 last_click["selector"]"""
+        return self.click_with_retry(SCOPED, spec, description or spec["variants"][0][1], **wait)
+
+    def wait_for_element(self, by: By, value: str, timeout: int = None):
         """等待元素出现"""
         try:
-            return WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
+            return self._wait_until(by, value, timeout or self.default_timeout, 'present')
         except TimeoutException:
             return None
 
-    def wait_for_clickable(self, by: By, value: str, timeout: int = 10):
+    def wait_for_clickable(self, by: By, value: str, timeout: int = None):
         """等待元素可点击"""
         try:
-            return WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((by, value))
-            )
+            return self._wait_until(by, value, timeout or self.default_timeout, 'clickable')
         except TimeoutException:
             return None
 
-    def scroll_down(self, amount: int = None):
-        """滚动页面"""
-        if amount:
-            self.driver.execute_script(f"window.scrollBy(0, {amount});")
-        else:
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(random.uniform(0.5, 1.0))
+    def scroll_down(self, amount: int = None, container: str = None):
+        """滚动页面；amount 为空时滚到底部，container 为滚动容器的 CSS 选择器（列表在容器内滚动时）"""
+        self.driver.execute_script(SCROLL_DOWN_JS, container, amount)
+        self._sleep(random.uniform(0.5, 1.0))
 
     def go_back(self):
         """返回上一页"""
         self.driver.back()
         self.human_like_delay()
+
+    def timing_report(self) -> dict:
+        """本次运行等待与操作耗时汇总"""
+        total = sum(self.timing.values())
+        report = {key: round(value, 3) for key, value in self.timing.items()}
+        report["total"] = round(total, 3)
+        report["wait_ratio"] = round(self.timing["wait"] / total, 3) if total else 0.0
+        report.update(self.counts)
+        return report
@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试脚本
+
+用法：
+    python3 benchmark.py records [--sizes 1000,10000,100000,1000000]
+    python3 benchmark.py stats [--streams 50 --length 500]
+    python3 benchmark.py index [--sizes 100000,1000000,5000000]
+    python3 benchmark.py legacy [--size-mb 500]
+    python3 benchmark.py io [--talents 2000 --stall-ms 5 --work-ms 20]
+    python3 benchmark.py cards [--cards 50]          （需要 selenium 和 Chrome）
+    python3 benchmark.py startup [--repeat 3]        （需要 selenium 和 Chrome）
+    python3 benchmark.py e2e [--pages 3 --talents 10] （需要 selenium 和 Chrome，使用 mock_server.py）
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from card_extractor import CardExtractor
+from record_manager import RecordManager
+from io_worker import BackgroundRecordStore
+from legacy_reader import LegacyRecordReader
+from record_store import SqliteRecordStore, create_store
+
+
+def _seed_records(record_file: str, backend: str, size: int):
+    """直接写出含 size 位达人的历史记录文件，避免逐条 add_record 造数据"""
+    record = {"name": "达人", "status": "success", "time": "2024-01-07 14:30:25"}
+    if backend == 'json':
+        with open(record_file, 'w', encoding='utf-8') as f:
+            json.dump({f"talent_{i}": [record] for i in range(size)}, f, ensure_ascii=False, indent=2)
+    elif backend == 'sqlite':
+        store = SqliteRecordStore(record_file)
+        store.append_many((f"talent_{i}", record) for i in range(size))
+        store.close()
+    else:
+        log_file = os.path.splitext(record_file)[0] + '.jsonl'
+        with open(log_file, 'w', encoding='utf-8') as f:
+            for i in range(size):
+                f.write(json.dumps({"id": f"talent_{i}", "records": [record]}, ensure_ascii=False) + "\n")
+
+
+def bench_records(args):
+    """对比各存储后端在不同历史规模下的单次邀约写入耗时"""
+    sizes = [int(s) for s in args.sizes.split(',')]
+    backends = args.backends.split(',')
+
+    print("="*86)
+    print(f"{'后端':<8}{'历史规模':>12}{'加载耗时(s)':>14}{'单次写入(ms)':>16}{'写入次数':>10}{'统计耗时(ms)':>14}")
+    print("="*86)
+
+    for backend in backends:
+        for size in sizes:
+            if backend == 'json' and size > args.json_limit:
+                print(f"{backend:<8}{size:>12}{'跳过（整文件重写过慢）':>30}")
+                continue
+
+            work_dir = tempfile.mkdtemp(prefix='bench_records_')
+            try:
+                record_file = os.path.join(work_dir, 'invite_records.json')
+                _seed_records(record_file, backend, size)
+
+                start = time.perf_counter()
+                manager = RecordManager(record_file, backend)
+                load_time = time.perf_counter() - start
+
+                # 整文件重写的后端写入次数少一些，避免大规模时跑太久
+                writes = args.writes if backend != 'json' else max(1, args.writes // 10)
+                start = time.perf_counter()
+                for i in range(writes):
+                    manager.add_record(f"new_{i}", "新达人", "success")
+                per_write = (time.perf_counter() - start) / writes * 1000
+
+                start = time.perf_counter()
+                manager.get_statistics()
+                stats_time = (time.perf_counter() - start) * 1000
+                manager.close()
+
+                print(f"{backend:<8}{size:>12}{load_time:>14.3f}{per_write:>16.3f}{writes:>10}{stats_time:>14.2f}")
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("="*86)
+
+
+def bench_probe(args):
+    """（供 index 子命令在独立进程中调用）打开存储，输出启动耗时、峰值内存和查询耗时"""
+    import resource
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    manager = RecordManager(args.record_file, args.backend)
+    startup = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for i in range(args.lookups):
+        manager.is_invited(f"talent_{i * 7919 % (args.size * 2)}")
+    lookup = (time.perf_counter() - start) / args.lookups * 1e6
+    total = manager.get_statistics()["total"]
+    manager.close()
+
+    # ru_maxrss 在 Linux 上单位为 KB
+    print(json.dumps({"startup": startup, "rss_mb": (rss - base_rss) / 1024,
+                      "lookup_us": lookup, "total": total}))
+
+
+def bench_index(args):
+    """对比 jsonl 完整回放与紧凑索引在大规模历史下的启动耗时和内存"""
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    print("="*84)
+    print(f"{'方式':<22}{'历史规模':>12}{'启动耗时(s)':>14}{'新增内存(MB)':>16}{'单次查询(us)':>16}")
+    print("="*84)
+    for size in sizes:
+        work_dir = tempfile.mkdtemp(prefix='bench_index_')
+        try:
+            record_file = os.path.join(work_dir, 'invite_records.json')
+            _seed_records(record_file, 'jsonl', size)
+
+            runs = [("jsonl 完整回放", 'jsonl'), ("indexed 首次建索引", 'indexed'),
+                    ("indexed 读取索引", 'indexed')]
+            for label, backend in runs:
+                if backend == 'jsonl' and size > args.full_limit:
+                    print(f"{label:<22}{size:>12}{'跳过（内存占用过大）':>30}")
+                    continue
+                # 每种方式在独立进程中运行，峰值内存互不影响
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), 'probe', backend, record_file,
+                     '--size', str(size), '--lookups', str(args.lookups)],
+                    capture_output=True, text=True, check=True,
+                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{label:<22}{size:>12}{result['startup']:>14.3f}{result['rss_mb']:>16.1f}"
+                      f"{result['lookup_us']:>16.2f}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    print("="*84)
+
+
+def _write_legacy_file(record_file: str, size_mb: int) -> int:
+    """流式写出缩进格式的旧记录文件（与 JsonRecordStore 的写法一致），返回达人数"""
+    rng = random.Random(0)
+    target = size_mb * 1024 * 1024
+    count = 0
+    with open(record_file, 'w', encoding='utf-8') as f:
+        f.write('{')
+        while f.tell() < target:
+            history = [{"name": f"达人{count}", "status": rng.choice(["success", "failed"]),
+                        "time": "2025-01-01 12:00:00"} for _ in range(rng.randint(1, 3))]
+            entry = json.dumps(history, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            f.write(f'{"," if count else ""}\n  "talent_{count}": {entry}')
+            count += 1
+        f.write('\n}')
+    return count
+
+
+def bench_legacy_probe(args):
+    """（供 legacy 子命令在独立进程中调用）用一种方式读取旧记录文件，输出耗时、峰值内存和读到的达人数"""
+    import resource
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    error = None
+    if args.mode == 'json.load':
+        try:
+            with open(args.record_file, 'r', encoding='utf-8') as f:
+                count = len(json.load(f))
+        except ValueError as e:
+            count, error = 0, str(e)
+    elif args.mode == 'stream-dict':
+        reader = LegacyRecordReader(args.record_file)
+        count, error = len(dict(reader)), reader.error
+    elif args.mode == 'stream-iter':
+        reader = LegacyRecordReader(args.record_file)
+        for _ in reader:
+            pass
+        count, error = reader.count, reader.error
+    else:
+        store = create_store('indexed', args.record_file)
+        count = store.statistics()["total"]
+        store.close()
+    elapsed = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({"time": elapsed, "rss_mb": (rss - base_rss) / 1024, "count": count, "error": error},
+                     ensure_ascii=False))
+
+
+def bench_legacy(args):
+    """对比 json.load 与流式读取旧记录文件的耗时和峰值内存，并验证截断文件的恢复"""
+    work_dir = tempfile.mkdtemp(prefix='bench_legacy_')
+    try:
+        record_file = os.path.join(work_dir, 'invite_records.json')
+        start = time.perf_counter()
+        count = _write_legacy_file(record_file, args.size_mb)
+        size = os.path.getsize(record_file)
+        print(f"生成旧记录文件: {size / 1024 / 1024:.0f}MB，{count} 位达人（{time.perf_counter() - start:.1f}s）")
+
+        # 截断在文件中间，模拟写到一半被中断
+        truncated_file = os.path.join(work_dir, 'truncated', 'invite_records.json')
+        os.makedirs(os.path.dirname(truncated_file))
+        with open(record_file, 'rb') as src, open(truncated_file, 'wb') as dst:
+            remaining = int(size * args.truncate)
+            while remaining > 0:
+                chunk = src.read(min(remaining, 1 << 20))
+                dst.write(chunk)
+                remaining -= len(chunk)
+
+        runs = [("json.load", 'json.load', record_file),
+                ("流式读入字典", 'stream-dict', record_file),
+                ("流式遍历", 'stream-iter', record_file),
+                ("流式转换为 indexed", 'convert', record_file),
+                ("json.load（截断）", 'json.load', truncated_file),
+                ("流式遍历（截断）", 'stream-iter', truncated_file)]
+
+        print("="*80)
+        print(f"{'方式':<22}{'耗时(s)':>12}{'峰值新增内存(MB)':>20}{'读到达人数':>14}")
+        print("="*80)
+        for label, mode, path in runs:
+            # 每种方式在独立进程中运行，峰值内存互不影响
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), 'legacy-probe', mode, path],
+                capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{label:<22}{result['time']:>12.2f}{result['rss_mb']:>20.1f}{result['count']:>14}")
+            if result['error']:
+                print(f"    {result['error']}")
+        print("="*80)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def bench_stats(args):
+    """随机记录流上增量统计与完整重新统计的耗时（正确性由 test_record_stats.py 检查）"""
+    rng = random.Random(args.seed)
+
+    print("="*60)
+    print(f"{'后端':<8}{'记录流':>8}{'增量统计(ms)':>16}{'完整统计(ms)':>16}")
+    print("="*60)
+    for backend in args.backends.split(','):
+        work_dir = tempfile.mkdtemp(prefix='bench_stats_')
+        fast = slow = 0.0
+        try:
+            for stream in range(args.streams):
+                manager = RecordManager(os.path.join(work_dir, f'records_{stream}.json'), backend)
+                pool = [f"talent_{i}" for i in range(rng.randint(1, args.length // 2 + 1))]
+                for _ in range(args.length):
+                    manager.add_record(rng.choice(pool), "达人", rng.choice(["success", "failed"]))
+                    if rng.random() < 0.05:
+                        manager.start_page(rng.randint(1, 100))
+
+                start = time.perf_counter()
+                manager.get_statistics()
+                fast += time.perf_counter() - start
+                start = time.perf_counter()
+                manager.recompute_statistics()
+                slow += time.perf_counter() - start
+                manager.close()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        print(f"{backend:<8}{args.streams:>8}{fast / args.streams * 1000:>16.3f}{slow / args.streams * 1000:>16.3f}")
+    print("="*60)
+
+
+class _StalledHandler(logging.Handler):
+    """每次写日志前等待 stall 秒，模拟磁盘卡顿"""
+
+    def __init__(self, handler: logging.Handler, stall: float):
+        super().__init__()
+        self.handler = handler
+        self.stall = stall
+
+    def emit(self, record):
+        time.sleep(self.stall)
+        self.handler.emit(record)
+
+
+class _StalledStore:
+    """每次提交前等待 stall 秒的存储包装，模拟磁盘卡顿"""
+
+    def __init__(self, store, stall: float):
+        self.store = store
+        self.stall = stall
+
+    def append(self, talent_id, record):
+        self.append_many([(talent_id, record)])
+
+    def append_many(self, entries):
+        time.sleep(self.stall)
+        self.store.append_many(entries)
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+
+def bench_io(args):
+    """对比同步写盘与后台写盘时，主线程花在日志和邀约记录 I/O 上的时间"""
+    from io_worker import start_log_listener
+
+    stall = args.stall_ms / 1000
+    results = []
+    for backend in args.backends.split(','):
+        for background in (False, True):
+            work_dir = tempfile.mkdtemp(prefix='bench_io_')
+            try:
+                manager = RecordManager(os.path.join(work_dir, 'invite_records.json'), backend)
+                manager.store = _StalledStore(manager.store, stall)
+                if background:
+                    manager.store = BackgroundRecordStore(manager.store, args.queue_size)
+
+                handlers = [logging.FileHandler(os.path.join(work_dir, 'bot.log'), encoding='utf-8'),
+                            logging.StreamHandler(open(os.devnull, 'w'))]
+                handlers = [_StalledHandler(h, stall / 10) for h in handlers]
+                bench_logger = logging.getLogger(f'bench_io.{backend}.{background}')
+                bench_logger.propagate = False
+                bench_logger.setLevel(logging.INFO)
+                listener = None
+                if background:
+                    queue_handler, listener = start_log_listener(handlers, args.queue_size)
+                    bench_logger.addHandler(queue_handler)
+                else:
+                    for handler in handlers:
+                        bench_logger.addHandler(handler)
+
+                # 每位达人大致对应：几行点击日志 + 一条邀约记录，中间穿插模拟的浏览器操作（不计入 I/O）
+                driver_thread = 0.0
+                for i in range(args.talents):
+                    for step in ("详情", "邀请带货", "添加上次邀约商品", "确认", "发送邀约"):
+                        time.sleep(args.work_ms / 5000)
+                        start = time.perf_counter()
+                        bench_logger.info(f"✓ 点击成功: {step}")
+                        driver_thread += time.perf_counter() - start
+                    start = time.perf_counter()
+                    manager.add_record(f"talent_{i}", "达人", "success")
+                    bench_logger.info(f"✓ 邀约成功: 达人{i}")
+                    driver_thread += time.perf_counter() - start
+
+                start = time.perf_counter()
+                manager.close()
+                if listener:
+                    listener.stop()
+                shutdown = time.perf_counter() - start
+                for handler in handlers:
+                    handler.handler.close()
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            results.append((backend, "后台线程" if background else "同步", driver_thread, shutdown))
+
+    print("="*72)
+    print(f"{args.talents} 位达人，每位模拟浏览器操作 {args.work_ms}ms，"
+          f"磁盘卡顿：记录 {args.stall_ms}ms/次，日志 {args.stall_ms / 10}ms/行")
+    print("="*72)
+    print(f"{'后端':<8}{'写盘方式':<10}{'主线程 I/O(s)':>16}{'每位达人(ms)':>16}{'退出时写完(s)':>16}")
+    for backend, mode, driver_thread, shutdown in results:
+        print(f"{backend:<8}{mode:<10}{driver_thread:>16.3f}{driver_thread / args.talents * 1000:>16.3f}"
+              f"{shutdown:>16.3f}")
+    print("="*72)
+
+
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'assets', '达人广场源代码.txt')
+
+# 保存的页面快照里达人列表尚未渲染（只有 SSR 外壳），基准测试时按配置的选择器注入卡片
+INJECT_CARDS_JS = """
+const count = arguments[0];
+const missingEvery = arguments[1];
+const container = document.createElement('div');
+container.className = 'talent-list';
+for (let i = 0; i < count; i++) {
+    const card = document.createElement('div');
+    card.className = 'talent-item';
+    card.setAttribute('data-id', 'finder_' + i);
+    if (!(missingEvery && i % missingEvery === missingEvery - 1)) {
+        const name = document.createElement('span');
+        name.className = 'talent-name';
+        name.textContent = '达人' + i;
+        card.appendChild(name);
+    }
+    const button = document.createElement('button');
+    button.textContent = '详情';
+    card.appendChild(button);
+    container.appendChild(card);
+}
+(document.getElementById('app') || document.body).appendChild(container);
+"""
+
+
+def _create_headless_driver():
+    """创建无头 Chrome（基准测试专用，不使用系统用户目录）"""
+    from browser_factory import create_driver
+
+    return create_driver({"headless": True}, use_profile=False)
+
+
+class _RoundTripCounter:
+    """统计 WebDriver HTTP 请求次数（元素方法也经由 driver.execute 发出）"""
+
+    def __init__(self, driver):
+        self.count = 0
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, *args, **kwargs):
+        self.count += 1
+        return self._execute(*args, **kwargs)
+
+
+def _legacy_extract(driver) -> list:
+    """改造前 process_current_page 的逐卡片提取方式"""
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+
+    talents = []
+    for element in driver.find_elements(By.CLASS_NAME, "talent-item"):
+        try:
+            name = element.find_element(By.CLASS_NAME, "talent-name").text.strip()
+            talent_id = element.get_attribute("data-id") or name
+            talents.append({'name': name, 'id': talent_id})
+        except NoSuchElementException:
+            continue
+    return talents
+
+
+def bench_cards(args):
+    """对比逐卡片提取与单次脚本批量提取的请求次数和耗时"""
+    snapshot_url = 'file://' + os.path.abspath(args.snapshot)
+    with open('config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    driver = _create_headless_driver()
+    try:
+        driver.get(snapshot_url)
+        driver.execute_script(INJECT_CARDS_JS, args.cards, args.missing_every)
+        driver.implicitly_wait(args.implicit_wait)
+
+        counter = _RoundTripCounter(driver)
+        extractor = CardExtractor(driver, config)
+
+        results = []
+        for label, extract in (("逐卡片提取", lambda: _legacy_extract(driver)),
+                               ("批量脚本提取", extractor.extract)):
+            counter.count = 0
+            start = time.perf_counter()
+            talents = extract()
+            elapsed = time.perf_counter() - start
+            results.append((label, len(talents), counter.count, elapsed))
+    finally:
+        driver.quit()
+
+    print("="*64)
+    print(f"卡片 {args.cards} 张（每 {args.missing_every} 张缺名称），implicit_wait={args.implicit_wait}s")
+    print("="*64)
+    print(f"{'方式':<12}{'达人数':>8}{'请求次数':>12}{'耗时(s)':>12}")
+    for label, found, round_trips, elapsed in results:
+        print(f"{label:<12}{found:>8}{round_trips:>12}{elapsed:>12.3f}")
+    print("="*64)
+
+
+def bench_startup(args):
+    """对比冷启动、chromedriver 缓存命中和连接已有 Chrome 三种方式的启动耗时"""
+    import browser_factory
+
+    work_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    cache_file = os.path.join(work_dir, 'driver_cache.json')
+    launch_config = {"headless": True, "driver_cache_file": cache_file}
+    attach_config = {"browser_mode": "attach", "debugger_address": args.debugger_address,
+                     "driver_cache_file": cache_file}
+
+    def measure(config, cold: bool):
+        if cold:
+            # 清空 chromedriver 路径缓存和启动参数缓存
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+            browser_factory._options_cache.clear()
+        start = time.perf_counter()
+        driver = browser_factory.create_driver(config, use_profile=False)
+        elapsed = time.perf_counter() - start
+        browser_factory.shutdown_driver(driver, config)
+        return elapsed
+
+    results = []
+    try:
+        for label, config, cold in (("冷启动", launch_config, True),
+                                    ("缓存命中", launch_config, False),
+                                    ("连接已有会话", attach_config, False)):
+            timings = []
+            for _ in range(args.repeat):
+                try:
+                    timings.append(measure(config, cold))
+                except Exception as e:
+                    print(f"{label} 失败，已跳过: {str(e).splitlines()[0]}")
+                    break
+            if timings:
+                results.append((label, min(timings), sum(timings) / len(timings)))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("="*48)
+    print(f"{'方式':<12}{'最快(s)':>12}{'平均(s)':>12}")
+    for label, fastest, average in results:
+        print(f"{label:<12}{fastest:>12.3f}{average:>12.3f}")
+    print("="*48)
+    print(f"连接模式需先启动: google-chrome --remote-debugging-port={args.debugger_address.split(':')[-1]}")
+
+
+def bench_e2e(args):
+    """在本地模拟达人广场上完整运行 WechatStoreInviteBot，统计吞吐量和开销"""
+    from main import WechatStoreInviteBot
+    from mock_server import MockSquare, start_mock_server
+
+    square = MockSquare(args.pages, args.talents, args.latency_ms, args.render_delay_ms,
+                        args.failure_rate, args.snapshot, seed=args.seed,
+                        client_render=args.client_render or args.card_source == 'network',
+                        scroll_window=args.infinite_scroll)
+    server, start_url = start_mock_server(square)
+
+    work_dir = tempfile.mkdtemp(prefix='bench_e2e_')
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config.update({
+        "headless": True,
+        "browser_mode": "launch",
+        "use_system_profile": False,
+        "record_file": os.path.join(work_dir, 'invite_records.json'),
+        "log_file": os.path.join(work_dir, 'bot.log'),
+        "checkpoint_file": os.path.join(work_dir, 'checkpoint.json'),
+        "timeline_file": os.path.join(work_dir, 'timeline.jsonl'),
+        "skip_cache_file": os.path.join(work_dir, 'skip_cache.json'),
+        "page_cache_file": args.page_cache_file or os.path.join(work_dir, 'page_cache.json'),
+        "selector_stats_file": os.path.join(work_dir, 'selector_stats.json'),
+    })
+    config["card_source"] = args.card_source
+    # 详情地址模板在 back 模式下只用于重试队列直接打开详情
+    config.update({"detail_navigation": args.navigation, "detail_url_template": "/detail/{id}",
+                   "retry_queue_file": os.path.join(work_dir, 'retry_queue.json'),
+                   "retry_base_delay": args.retry_delay})
+    if args.infinite_scroll:
+        config["list_mode"] = "scroll"
+    if args.recycle_pages:
+        config["browser_recycle_pages"] = args.recycle_pages
+    config.update({"driver_stats": True, "profile": args.profile, "profile_file": args.profile_file})
+    if not args.human_delays:
+        config.update({"min_delay": args.delay, "max_delay": args.delay})
+    config_file = os.path.join(work_dir, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False)
+
+    # 前 done_pages 页的达人预先记为已邀约，模拟长期运行的店铺
+    if args.done_pages:
+        seed = RecordManager(config["record_file"], config.get("record_backend", "json"))
+        seed.add_records((talent["id"], talent["name"], "success")
+                         for page in range(1, args.done_pages + 1) for talent in square.page_talents(page))
+        seed.close()
+
+    bot = WechatStoreInviteBot(config_file)
+
+    # 浏览器创建后挂上请求计数
+    counter = {}
+    init_browser = bot.init_browser
+
+    def init_browser_with_counter():
+        init_browser()
+        counter["round_trips"] = _RoundTripCounter(bot.driver)
+
+    bot.init_browser = init_browser_with_counter
+
+    # 统计记录存储耗时
+    record_time = [0.0]
+    add_record = bot.record_manager.add_record
+
+    def timed_add_record(*a, **kw):
+        start = time.perf_counter()
+        try:
+            return add_record(*a, **kw)
+        finally:
+            record_time[0] += time.perf_counter() - start
+
+    bot.record_manager.add_record = timed_add_record
+
+    try:
+        start = time.perf_counter()
+        bot.run(start_url, args.pages)
+        elapsed = time.perf_counter() - start
+        stats = bot.record_manager.get_statistics()
+        # 本次运行邀约的达人数（不含 --done-pages 预先写入的记录）
+        attempts = bot.record_manager.get_run_statistics()["run"]["attempts"]
+        server_stats = square.stats()
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    processed = max(1, attempts)
+    rss_samples = [sample["driver_mb"] + sample["chrome_mb"] for sample in bot.browser_monitor.samples]
+    round_trips = counter["round_trips"].count if "round_trips" in counter else 0
+    result = {
+        "pages": args.pages,
+        "talents_per_page": args.talents,
+        "elapsed_s": round(elapsed, 3),
+        "records_total": stats["total"],
+        "records_success": stats["success"],
+        "server_invites": server_stats["invites"],
+        "server_unique_invited": server_stats["unique_invited"],
+        "server_duplicate_invites": server_stats["duplicate_invites"],
+        "talents_per_minute": round(attempts / elapsed * 60, 2) if elapsed else 0,
+        "round_trips_per_talent": round(round_trips / processed, 1),
+        "top_commands": [f"{command}={count}" for command, count, _ in bot.command_stats.top(5)],
+        "record_ms_per_talent": round(record_time[0] / processed * 1000, 3),
+        "navigation": args.navigation,
+        "listing_reloads": bot.nav_counts["listing_reloads"],
+        "stale_retries": bot.clicker.counts["stale_retries"] if bot.clicker else 0,
+        "retried": bot.retry_queue.counts["retried"],
+        "recovered": bot.retry_queue.counts["recovered"],
+        "retry_queue_left": len(bot.retry_queue),
+        "done_pages": args.done_pages,
+        "cached_pages": bot.cached_pages,
+        "time_to_first_new_s": round(bot.first_new_talent, 3) if bot.first_new_talent is not None else None,
+        "filtered_talents": bot.filtered_count,
+        "skip_cache_hits": bot.skip_cache.hits,
+        "card_source": args.card_source,
+        "browser_recycles": len(bot.browser_monitor.recycles),
+        "browser_peak_rss_mb": max(rss_samples, default=0),
+        "list_mode": config.get("list_mode", "pages"),
+        "scrolls": bot.card_stream.counts["scrolls"] if bot.card_stream else 0,
+        "stream_duplicates": bot.card_stream.counts["duplicates"] if bot.card_stream else 0,
+        "network_pages": bot.network_cards.counts["network"] if bot.network_cards else 0,
+        "dom_fallback_pages": bot.network_cards.counts["fallback"] if bot.network_cards else 0,
+    }
+
+    print("="*60)
+    print("端到端基准测试结果")
+    print("="*60)
+    for key, value in result.items():
+        print(f"  {key:<26}{value}")
+    print("="*60)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="邀约机器人性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    records_parser = subparsers.add_parser('records', help='记录存储写入耗时')
+    records_parser.add_argument('--sizes', default='1000,10000,100000,1000000')
+    records_parser.add_argument('--backends', default='json,jsonl,indexed,sqlite')
+    records_parser.add_argument('--writes', type=int, default=200)
+    records_parser.add_argument('--json-limit', type=int, default=100000,
+                                help='json 后端测试的最大历史规模')
+    records_parser.set_defaults(func=bench_records)
+
+    stats_parser = subparsers.add_parser('stats', help='增量统计与完整统计的耗时')
+    stats_parser.add_argument('--backends', default='json,jsonl,indexed,sqlite')
+    stats_parser.add_argument('--streams', type=int, default=50)
+    stats_parser.add_argument('--length', type=int, default=500)
+    stats_parser.add_argument('--seed', type=int, default=0)
+    stats_parser.set_defaults(func=bench_stats)
+
+    index_parser = subparsers.add_parser('index', help='大规模历史下紧凑索引的启动耗时与内存')
+    index_parser.add_argument('--sizes', default='100000,1000000,5000000')
+    index_parser.add_argument('--full-limit', type=int, default=1000000,
+                              help='jsonl 完整回放测试的最大历史规模')
+    index_parser.add_argument('--lookups', type=int, default=10000)
+    index_parser.set_defaults(func=bench_index)
+
+    probe_parser = subparsers.add_parser('probe')
+    probe_parser.add_argument('backend')
+    probe_parser.add_argument('record_file')
+    probe_parser.add_argument('--size', type=int, required=True)
+    probe_parser.add_argument('--lookups', type=int, default=10000)
+    probe_parser.set_defaults(func=bench_probe)
+
+    legacy_parser = subparsers.add_parser('legacy', help='大体积旧格式记录文件的流式读取与转换')
+    legacy_parser.add_argument('--size-mb', type=int, default=500)
+    legacy_parser.add_argument('--truncate', type=float, default=0.5, help='截断副本保留的比例')
+    legacy_parser.set_defaults(func=bench_legacy)
+
+    legacy_probe_parser = subparsers.add_parser('legacy-probe')
+    legacy_probe_parser.add_argument('mode', choices=['json.load', 'stream-dict', 'stream-iter', 'convert'])
+    legacy_probe_parser.add_argument('record_file')
+    legacy_probe_parser.set_defaults(func=bench_legacy_probe)
+
+    io_parser = subparsers.add_parser('io', help='同步写盘与后台写盘的主线程 I/O 耗时')
+    io_parser.add_argument('--backends', default='json,jsonl,indexed,sqlite')
+    io_parser.add_argument('--talents', type=int, default=2000)
+    io_parser.add_argument('--stall-ms', type=float, default=5.0,
+                           help='每次提交记录的模拟磁盘卡顿（日志每行为其 1/10）')
+    io_parser.add_argument('--work-ms', type=float, default=20.0,
+                           help='每位达人模拟的浏览器操作耗时（不计入 I/O）')
+    io_parser.add_argument('--queue-size', type=int, default=1000)
+    io_parser.set_defaults(func=bench_io)
+
+    cards_parser = subparsers.add_parser('cards', help='达人卡片提取请求次数与耗时')
+    cards_parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT, help='保存的页面源代码')
+    cards_parser.add_argument('--cards', type=int, default=50)
+    cards_parser.add_argument('--missing-every', type=int, default=10,
+                              help='每隔多少张卡片缺少名称元素（0 表示不缺）')
+    cards_parser.add_argument('--implicit-wait', type=float, default=1.0)
+    cards_parser.set_defaults(func=bench_cards)
+
+    startup_parser = subparsers.add_parser('startup', help='浏览器启动耗时')
+    startup_parser.add_argument('--repeat', type=int, default=3)
+    startup_parser.add_argument('--debugger-address', default='127.0.0.1:9222')
+    startup_parser.set_defaults(func=bench_startup)
+
+    e2e_parser = subparsers.add_parser('e2e', help='模拟达人广场上的端到端吞吐量')
+    e2e_parser.add_argument('--pages', type=int, default=3)
+    e2e_parser.add_argument('--talents', type=int, default=10, help='每页达人数')
+    e2e_parser.add_argument('--latency-ms', type=float, default=0)
+    e2e_parser.add_argument('--render-delay-ms', type=float, default=100)
+    e2e_parser.add_argument('--failure-rate', type=float, default=0.0)
+    e2e_parser.add_argument('--seed', type=int, default=0)
+    e2e_parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT)
+    e2e_parser.add_argument('--config', default='config.json')
+    e2e_parser.add_argument('--delay', type=float, default=0.1,
+                            help='替换 min_delay/max_delay 的固定延迟（秒）')
+    e2e_parser.add_argument('--card-source', choices=['dom', 'network'], default='dom',
+                            help='达人卡片来源（对应 card_source）；network 时模拟站点改为前端渲染')
+    e2e_parser.add_argument('--client-render', action='store_true', help='模拟站点由前端请求列表接口渲染卡片')
+    e2e_parser.add_argument('--infinite-scroll', type=int, default=0, metavar='N',
+                            help='模拟站点改为无限滚动列表（DOM 中最多 N 张卡片），机器人使用 list_mode=scroll')
+    e2e_parser.add_argument('--profile', choices=['cprofile', 'sampling'],
+                            help='在性能分析器中运行（对应 profile），结果写入 --profile-file')
+    e2e_parser.add_argument('--profile-file', default='bench_e2e.prof')
+    e2e_parser.add_argument('--recycle-pages', type=int, default=0,
+                            help='每个浏览器最多处理的页数（对应 browser_recycle_pages）')
+    e2e_parser.add_argument('--navigation', choices=['back', 'tab'], default='back',
+                            help='详情页打开方式（对应 detail_navigation）')
+    e2e_parser.add_argument('--retry-delay', type=float, default=0,
+                            help='重试队列的首次退避秒数，默认 0：运行结束时立即重试 --failure-rate 造成的失败')
+    e2e_parser.add_argument('--done-pages', type=int, default=0,
+                            help='前几页的达人预先记为已邀约，用于测量到达第一位待邀约达人的耗时')
+    e2e_parser.add_argument('--page-cache-file',
+                            help='页面缓存文件；两次运行指定同一文件即可对比缓存命中前后的耗时')
+    e2e_parser.add_argument('--human-delays', action='store_true', help='保留配置中的随机延迟')
+    e2e_parser.add_argument('--output', help='把结果写入 JSON 文件，作为回归基线')
+    e2e_parser.set_defaults(func=bench_e2e)
+
+    args = parser.parse_args()
+    if args.func(args) is False:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器创建工厂
+
+main.py、selector_helper.py、get_dom_structure.py 共用的 Chrome 启动逻辑：
+- Chrome 启动参数只构建一次
+- 解析出的 chromedriver 路径按 Chrome 版本缓存，之后启动不再调用 ChromeDriverManager().install()
+- browser_mode = "attach" 时通过调试端口连接已经在运行的 Chrome，跳过冷启动
+
+连接已有 Chrome 时，先用下面的方式启动 Chrome（关闭所有 Chrome 窗口后执行）：
+    google-chrome --remote-debugging-port=9222 --user-data-dir=<用户数据目录>
+"""
+
+import getpass
+import json
+import os
+import platform
+import re
+import subprocess
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+
+DEFAULT_DRIVER_CACHE = "/tmp/auto_invite_bot/driver_cache.json"
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# 移除 webdriver 属性（重要反检测措施）
+HIDE_WEBDRIVER_JS = '''
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    })
+'''
+
+_options_cache = {}
+
+
+def default_user_data_dir() -> str:
+    """系统 Chrome 用户数据目录"""
+    system = platform.system()
+    username = getpass.getuser()
+
+    if system == 'Windows':
+        return f"C:\\Users\\{username}\\AppData\\Local\\Google\\Chrome\\User Data"
+    elif system == 'Darwin':  # Mac
+        return f"/Users/{username}/Library/Application Support/Google/Chrome"
+    else:  # Linux
+        return f"/home/{username}/.config/google-chrome"
+
+
+def detect_chrome_version() -> Optional[str]:
+    """获取本机 Chrome 版本号，获取不到时返回 None"""
+    system = platform.system()
+    if system == 'Windows':
+        commands = [['reg', 'query', r'HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon', '/v', 'version']]
+    elif system == 'Darwin':
+        commands = [['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version']]
+    else:
+        commands = [[name, '--version'] for name in
+                    ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')]
+
+    for command in commands:
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'(\d+)\.\d+\.\d+\.\d+', output)
+        if match:
+            return match.group(0)
+    return None
+
+
+def resolve_driver_path(cache_file: str = DEFAULT_DRIVER_CACHE) -> str:
+    """返回 chromedriver 路径；Chrome 大版本不变且文件仍存在时直接使用缓存"""
+    version = detect_chrome_version()
+    cache_key = f"{platform.system()}-{version.split('.')[0]}" if version else None
+
+    cache = {}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+    cached_path = cache.get(cache_key) if cache_key else None
+    if cached_path and os.path.exists(cached_path):
+        return cached_path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    driver_path = ChromeDriverManager().install()
+
+    if cache_key:
+        cache[cache_key] = driver_path
+        try:
+            os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"保存 chromedriver 缓存失败: {e}")
+    return driver_path
+
+
+def build_chrome_options(config: dict, use_profile: bool = True) -> Options:
+    """构建 Chrome 启动参数（相同配置只构建一次）"""
+    attach = config.get('browser_mode', 'launch') == 'attach'
+    cache_key = (
+        attach,
+        config.get('debugger_address', '127.0.0.1:9222'),
+        config.get('headless', False),
+        use_profile,
+        config.get('card_source', 'dom'),
+    )
+    if cache_key in _options_cache:
+        return _options_cache[cache_key]
+
+    chrome_options = Options()
+
+    if config.get('card_source', 'dom') == 'network':
+        # 打开 performance 日志，从中读取达人列表接口的响应（见 network_capture.py）
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    if attach:
+        # 连接已运行的 Chrome 时，其它启动参数均无效
+        chrome_options.add_experimental_option('debuggerAddress', cache_key[1])
+        _options_cache[cache_key] = chrome_options
+        return chrome_options
+
+    # 是否无头模式
+    if config.get('headless', False):
+        chrome_options.add_argument('--headless')
+
+    if use_profile:
+        # 使用系统Chrome的用户数据目录，共享登录状态、Cookie、缓存等
+        chrome_options.add_argument(f'--user-data-dir={default_user_data_dir()}')
+        chrome_options.add_argument('--profile-directory=Default')
+
+    # ⭐ 增强反检测措施 - 让浏览器看起来像真人操作
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # 移除Chrome正在受到自动测试软件控制的提示
+    chrome_options.add_argument('--disable-infobars')
+
+    # 模拟真实浏览器的启动参数
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+
+    # ⭐ 使用真实的用户代理字符串
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+
+    # ⭐ 添加更多真实浏览器的参数
+    chrome_options.add_argument('--start-maximized')  # 最大化窗口
+    chrome_options.add_argument('--disable-extensions')  # 禁用扩展插件（可选）
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-renderer-backgrounding')
+
+    # 禁用WebRTC（防止IP泄露）
+    chrome_options.add_argument('--disable-webrtc')
+
+    _options_cache[cache_key] = chrome_options
+    return chrome_options
+
+
+def create_driver(config: dict, use_profile: Optional[bool] = None):
+    """创建（或连接）Chrome 并完成反检测设置
+
+    use_profile 为 None 时按 config 的 use_system_profile（默认 True）决定是否使用系统用户目录
+    """
+    if use_profile is None:
+        use_profile = config.get('use_system_profile', True)
+    service = Service(resolve_driver_path(config.get('driver_cache_file', DEFAULT_DRIVER_CACHE)))
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(config, use_profile))
+
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': HIDE_WEBDRIVER_JS
+    })
+    return driver
+
+
+def shutdown_driver(driver, config: dict):
+    """结束会话；连接模式下只停止 chromedriver，保留 Chrome 供下次复用"""
+    if config.get('browser_mode', 'launch') == 'attach':
+        driver.service.stop()
+    else:
+        driver.quit()
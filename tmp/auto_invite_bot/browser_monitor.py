@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器内存监控与定期重建
+
+一个 Chrome 连续跑几个小时、打开几百次页面后，渲染进程的内存会越涨越高，后面的页明显变慢。
+每处理完一页采样一次 chromedriver 及其启动的 Chrome 各进程的 RSS 之和，并记下这一页每位达人的耗时；
+内存超过 browser_max_rss_mb，或当前浏览器已处理 browser_recycle_pages 页时，由 main.py 关闭浏览器、
+重新 init_browser 并回到当前页继续，邀约记录、断点和各种缓存都不受影响。
+
+config.json：
+    "browser_max_rss_mb": 0        内存阈值（MB），0 为不按内存重建
+    "browser_recycle_pages": 0     每个浏览器最多处理的页数，0 为不按页数重建
+
+RSS 在 Linux 上读取 /proc，其它系统调用 ps；多个 Chrome 进程共享的内存会被重复计算，只适合看趋势。
+browser_mode = "attach" 时 Chrome 不是 chromedriver 的子进程、重建也不会关闭它，只统计 chromedriver 且不重建。
+"""
+
+import os
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+from timeline import percentile
+
+
+def _process_table() -> Dict[int, Tuple[int, int]]:
+    """本机进程表：pid -> (父进程 pid, RSS KB)；读取失败时返回空表"""
+    table = {}
+    if os.path.isdir('/proc'):
+        page_kb = os.sysconf('SC_PAGE_SIZE') // 1024
+        for name in os.listdir('/proc'):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f'/proc/{name}/stat', 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            # 进程名可能含空格和括号，从最后一个 ) 之后解析：state ppid ... rss（第 24 个字段）
+            fields = data[data.rindex(b')') + 2:].split()
+            table[int(name)] = (int(fields[1]), int(fields[21]) * page_kb)
+        return table
+
+    try:
+        output = subprocess.run(['ps', '-axo', 'pid=,ppid=,rss='],
+                                capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return table
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and all(part.isdigit() for part in parts):
+            table[int(parts[0])] = (int(parts[1]), int(parts[2]))
+    return table
+
+
+def process_tree_rss(root_pid: Optional[int]) -> Tuple[float, float, int]:
+    """返回 (根进程 MB, 全部子孙进程 MB, 子孙进程数)；根进程不存在时为 (0, 0, 0)"""
+    table = _process_table()
+    if root_pid is None or root_pid not in table:
+        return 0.0, 0.0, 0
+    children: Dict[int, List[int]] = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+
+    total_kb = 0
+    count = 0
+    pending = list(children.get(root_pid, []))
+    while pending:
+        pid = pending.pop()
+        total_kb += table[pid][1]
+        count += 1
+        pending.extend(children.get(pid, []))
+    return table[root_pid][1] / 1024, total_kb / 1024, count
+
+
+class BrowserMonitor:
+    """按页采样浏览器内存和每位达人耗时，判断是否需要重建浏览器"""
+
+    def __init__(self, config: dict):
+        self.max_rss_mb = config.get('browser_max_rss_mb', 0)
+        self.max_pages = config.get('browser_recycle_pages', 0)
+        # 连接已有 Chrome 时重建不会释放它的内存
+        self.can_recycle = config.get('browser_mode', 'launch') != 'attach'
+
+        # 第几个浏览器（每次重建加一）、当前浏览器已处理的页数
+        self.generation = 0
+        self.pages = 0
+        self.root_pid = None
+        # 每页一条：{time, page, generation, driver_mb, chrome_mb, processes, talents, talent_p50}
+        self.samples: List[Dict] = []
+        # 重建记录：{page, reason, duration}
+        self.recycles: List[Dict] = []
+        self._latencies: List[float] = []
+
+    def attach(self, driver):
+        """记下新浏览器的 chromedriver 进程"""
+        self.generation += 1
+        self.pages = 0
+        try:
+            self.root_pid = driver.service.process.pid
+        except AttributeError:
+            self.root_pid = None
+
+    def record_talent(self, seconds: float):
+        """记录当前页一位达人的处理耗时"""
+        self._latencies.append(seconds)
+
+    def sample(self, page: int) -> Dict:
+        """一页处理完后采样一次"""
+        self.pages += 1
+        driver_mb, chrome_mb, processes = process_tree_rss(self.root_pid)
+        sample = {
+            "time": time.time(),
+            "page": page,
+            "generation": self.generation,
+            "driver_mb": round(driver_mb, 1),
+            "chrome_mb": round(chrome_mb, 1),
+            "processes": processes,
+            "talents": len(self._latencies),
+            "talent_p50": round(percentile(self._latencies, 50), 3) if self._latencies else None,
+        }
+        self._latencies = []
+        self.samples.append(sample)
+        return sample
+
+    def recycle_reason(self, sample: Dict) -> Optional[str]:
+        """需要重建浏览器时返回原因"""
+        if not self.can_recycle:
+            return None
+        rss = sample["driver_mb"] + sample["chrome_mb"]
+        if self.max_rss_mb and rss >= self.max_rss_mb:
+            return f"浏览器内存 {rss:.0f}MB 超过 {self.max_rss_mb}MB"
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"当前浏览器已处理 {self.pages} 页"
+        return None
+
+    def report(self) -> List[str]:
+        """按浏览器分段汇总：页码范围、内存变化、首页与末页每位达人耗时 p50"""
+        lines = []
+        for generation in sorted({sample["generation"] for sample in self.samples}):
+            samples = [sample for sample in self.samples if sample["generation"] == generation]
+            rss = [sample["driver_mb"] + sample["chrome_mb"] for sample in samples]
+            timed = [sample["talent_p50"] for sample in samples if sample["talent_p50"] is not None]
+            latency = f"{timed[0]:.2f}s → {timed[-1]:.2f}s" if timed else "没有邀约"
+            lines.append(
+                f"浏览器 #{generation}: 第 {samples[0]['page']}~{samples[-1]['page']} 页，"
+                f"内存 {rss[0]:.0f}MB → {rss[-1]:.0f}MB（峰值 {max(rss):.0f}MB），"
+                f"每位达人耗时 p50 {latency}"
+            )
+        return lines
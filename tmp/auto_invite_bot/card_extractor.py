@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+达人卡片批量提取
+
+一次 execute_script 调用取回当前页所有卡片的字段，替代逐个卡片、逐个字段的 WebDriver 请求。
+每张卡片附带一个按达人 ID 定位的 CardHandle，元素过期时只做一次限定范围的查找重新定位。
+
+字段写法（config.json 中的 card_fields）：
+    ".talent-name"           卡片内第一个匹配元素的文本
+    ".talent-link@href"      卡片内第一个匹配元素的属性
+    "@data-id"               卡片自身的属性
+    ""                       卡片自身的文本
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from dom_ready import FINGERPRINT_JS
+
+
+DEFAULT_CARD_SELECTOR = ".talent-item"
+DEFAULT_CARD_FIELDS = {
+    "id": "@data-id",
+    "name": ".talent-name",
+}
+
+# 已读取过的卡片上打的标记属性（滚动加载时只读取新渲染的卡片）
+SEEN_MARK_ATTR = "data-invite-bot-seen"
+
+# arguments[0]: 卡片 CSS 选择器；arguments[1]: [[字段名, 子选择器, 属性名], ...]；
+# arguments[2]: 可选 [标记属性, 本轮标记]，跳过已带本轮标记的卡片，其余卡片打上 "本轮标记:达人ID"
+# （虚拟列表会复用卡片节点，节点换了达人时标记不再匹配，仍会被读取）
+EXTRACT_CARDS_JS = """
+const cardSelector = arguments[0];
+const fields = arguments[1];
+const mark = arguments[2];
+const cards = document.querySelectorAll(cardSelector);
+const result = [];
+for (let index = 0; index < cards.length; index++) {
+    const card = cards[index];
+    const item = {index: index, element: card};
+    for (const [key, selector, attr] of fields) {
+        const target = selector ? card.querySelector(selector) : card;
+        if (!target) {
+            item[key] = null;
+        } else if (attr) {
+            item[key] = target.getAttribute(attr);
+        } else {
+            item[key] = (target.innerText || target.textContent || '').trim();
+        }
+    }
+    if (mark) {
+        const value = mark[1] + ':' + (item.id || item.name || '');
+        if (card.getAttribute(mark[0]) === value) { continue; }
+        card.setAttribute(mark[0], value);
+    }
+    result.push(item);
+}
+return result;
+"""
+
+# arguments[0]: 卡片 CSS 选择器；arguments[1]: 子选择器；arguments[2]: 属性名；arguments[3]: 达人 ID
+FIND_CARD_BY_FIELD_JS = """
+const [cardSelector, selector, attr, value] = arguments;
+for (const card of document.querySelectorAll(cardSelector)) {
+    const target = selector ? card.querySelector(selector) : card;
+    if (!target) { continue; }
+    const text = attr ? target.getAttribute(attr) : (target.innerText || target.textContent || '').trim();
+    if (text === value) { return card; }
+}
+return null;
+"""
+
+# arguments[0]: 卡片 CSS 选择器；arguments[1]: 子选择器；arguments[2]: 属性名
+CARD_IDS_JS = """
+const [cardSelector, selector, attr] = arguments;
+return Array.from(document.querySelectorAll(cardSelector), function (card) {
+    const target = selector ? card.querySelector(selector) : card;
+    if (!target) { return ''; }
+    return attr ? (target.getAttribute(attr) || '') : (target.innerText || target.textContent || '').trim();
+});
+"""
+
+SCROLL_INTO_VIEW_JS = "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});"
+
+
+def parse_field_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """把 "selector@attr" 拆成 (selector, attr)"""
+    if '@' in spec:
+        selector, attr = spec.rsplit('@', 1)
+        return selector.strip(), attr.strip() or None
+    return spec.strip(), None
+
+
+def _css_string(value: str) -> str:
+    """转成 CSS 属性选择器中的带引号字符串"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class CardHandle:
+    """达人卡片句柄：保存达人 ID 和定位方式，元素过期时才重新定位
+
+    by_name 为 True 时 talent_id 保存的是达人名称，按名称字段定位卡片。
+    """
+
+    def __init__(self, extractor: 'CardExtractor', talent_id: str, element=None, by_name: bool = False):
+        self.extractor = extractor
+        self.talent_id = talent_id
+        self.by_name = by_name
+        self._element = element
+
+    def resolve(self):
+        """返回卡片元素；没有缓存时按达人 ID 查找一次，找不到返回 None"""
+        if self._element is None:
+            self._element = self.extractor.find_card(self.talent_id, self.by_name)
+        return self._element
+
+    def run(self, script: str, *args):
+        """以卡片元素为 arguments[0] 执行脚本；元素过期时重新定位一次再执行"""
+        from selenium.common.exceptions import StaleElementReferenceException
+
+        for attempt in range(2):
+            element = self.resolve()
+            if element is None:
+                return None
+            try:
+                return self.extractor.driver.execute_script(script, element, *args)
+            except StaleElementReferenceException:
+                if attempt:
+                    raise
+                self._element = None
+                self.extractor.re_resolutions += 1
+        return None
+
+    def scroll_into_view(self) -> bool:
+        """滚动到卡片"""
+        if self.resolve() is None:
+            return False
+        self.run(SCROLL_INTO_VIEW_JS)
+        return True
+
+
+class CardExtractor:
+    """达人卡片提取器"""
+
+    def __init__(self, driver, config: dict):
+        self.driver = driver
+        self.card_selector = config.get('card_selector', DEFAULT_CARD_SELECTOR)
+        card_fields = config.get('card_fields', DEFAULT_CARD_FIELDS)
+
+        # 字段映射在初始化时解析一次，每页直接复用
+        self.fields = [[key, *parse_field_spec(spec)] for key, spec in card_fields.items()]
+        self.id_spec = parse_field_spec(card_fields.get('id', ''))
+        self.name_spec = parse_field_spec(card_fields.get('name', ''))
+        # 列表指纹使用的字段：配置了 ID 字段时用 ID，否则用名称
+        self.fingerprint_field = self.id_spec if card_fields.get('id') else self.name_spec
+
+        # 卡片句柄因元素过期而重新定位的次数（按页清零）
+        self.re_resolutions = 0
+
+    def extract(self, mark: Optional[str] = None) -> List[Dict]:
+        """返回当前页所有达人卡片：[{id, name, index, handle, ...}]，没有名称的卡片会被跳过
+
+        mark 不为空时只返回还没有带这个标记的卡片，并给它们打上标记（滚动加载的列表每次只取新出现的卡片）。
+        """
+        mark_arg = [SEEN_MARK_ATTR, mark] if mark else None
+        raw_cards = self.driver.execute_script(EXTRACT_CARDS_JS, self.card_selector, self.fields, mark_arg) or []
+
+        talents = []
+        for card in raw_cards:
+            element = card.pop('element', None)
+            name = (card.get('name') or '').strip()
+            if not name:
+                continue
+            card['name'] = name
+            # 没有ID时退回使用达人名称
+            by_name = not card.get('id')
+            card['id'] = card.get('id') or name
+            card['handle'] = CardHandle(self, card['id'], element, by_name)
+            talents.append(card)
+        return talents
+
+    def find_card(self, talent_id: str, by_name: bool = False):
+        """按达人 ID 查找一张卡片
+
+        ID 取自卡片自身属性时直接用属性选择器查找，否则按 ID（或名称）字段在卡片中匹配，均为一次脚本调用。
+        """
+        selector, attr = self.name_spec if by_name else self.id_spec
+        if not selector and attr:
+            css = f"{self.card_selector}[{attr}={_css_string(talent_id)}]"
+            return self.driver.execute_script("return document.querySelector(arguments[0]);", css)
+        return self.driver.execute_script(FIND_CARD_BY_FIELD_JS, self.card_selector, selector, attr, talent_id)
+
+    def card_scope(self, handle: CardHandle) -> Dict:
+        """卡片作为选择器范围：ID 取自卡片属性时给出 CSS（每次查找都重新定位，不会过期），否则给出卡片元素"""
+        selector, attr = self.name_spec if handle.by_name else self.id_spec
+        if not selector and attr:
+            return {"scope": f"{self.card_selector}[{attr}={_css_string(handle.talent_id)}]", "root": None}
+        return {"scope": None, "root": handle.resolve(), "root_required": True}
+
+    def fingerprint(self) -> str:
+        """当前列表指纹："卡片数|第一张ID|最后一张ID"，用于判断翻页后列表是否已更换"""
+        return self.driver.execute_script(FINGERPRINT_JS, self.card_selector, *self.fingerprint_field) or ''
+
+    def card_ids(self) -> List[str]:
+        """当前页所有卡片的 ID（未配置 ID 字段时为名称），按页面顺序，一次脚本调用"""
+        return self.driver.execute_script(CARD_IDS_JS, self.card_selector, *self.fingerprint_field) or []
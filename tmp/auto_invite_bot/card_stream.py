@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动加载列表的达人卡片流
+
+无限滚动或虚拟列表只渲染可见范围内的卡片，一次提取拿不到整个列表。
+CardStream.stream() 是一个生成器：每次读取新渲染出来的卡片交给调用方处理，处理完再向下滚动一步，
+等列表变化后继续读取；连续 scroll_stall_rounds 次滚动都没有新卡片时结束。
+
+- 只取新卡片：读取过的卡片节点在页面里打上本轮标记（见 card_extractor.SEEN_MARK_ATTR），
+  每次脚本调用只返回没有标记的卡片
+- 去重：虚拟列表滚回去或重新渲染时同一位达人可能再次出现，最近 stream_dedup_window 个达人 ID 不重复产出
+- 内存：只保留当前一批卡片和固定大小的去重窗口，与列表长度无关
+
+config.json：
+    "list_mode": "scroll"               列表按滚动加载处理（默认 "pages" 按分页处理）
+    "scroll_step": 600                  每次向下滚动的像素数，应小于列表可见高度
+    "scroll_container": ""              列表在容器内滚动时填容器的 CSS 选择器，为空时滚动窗口
+    "scroll_stall_rounds": 3            连续几次滚动没有新卡片视为到底
+    "scroll_settle_timeout": 2.0        每次滚动后等待列表变化的秒数
+    "stream_dedup_window": 500          去重窗口大小
+"""
+
+import uuid
+from collections import deque
+from typing import Callable, Dict, Iterator, Optional
+
+
+class CardStream:
+    """边滚动边读取新出现的达人卡片"""
+
+    def __init__(self, extractor, clicker, config: dict,
+                 wait_for_new_list: Callable[[str, float], Optional[str]]):
+        self.extractor = extractor
+        self.clicker = clicker
+        # 等待列表指纹变化（与翻页共用），返回新指纹，超时返回 None
+        self.wait_for_new_list = wait_for_new_list
+        self.scroll_step = config.get('scroll_step', 600)
+        self.container = config.get('scroll_container') or None
+        self.stall_rounds = max(1, config.get('scroll_stall_rounds', 3))
+        self.settle_timeout = config.get('scroll_settle_timeout', 2.0)
+
+        # 最近产出的达人 ID（固定大小）
+        self._recent = deque(maxlen=max(1, config.get('stream_dedup_window', 500)))
+        self._recent_ids = set()
+        # 本次运行：滚动次数、产出的卡片数、去掉的重复卡片数
+        self.counts = {"scrolls": 0, "yielded": 0, "duplicates": 0}
+
+    def _remember(self, talent_id: str) -> bool:
+        """记入去重窗口，最近已经产出过时返回 False"""
+        if talent_id in self._recent_ids:
+            return False
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_ids.discard(self._recent[0])
+        self._recent.append(talent_id)
+        self._recent_ids.add(talent_id)
+        return True
+
+    def stream(self) -> Iterator[Dict]:
+        """依次产出新出现的达人卡片（格式同 CardExtractor.extract），列表不再增长时结束"""
+        # 每轮使用新的标记，之前（包括别的进程）打过的标记不影响本轮
+        mark = uuid.uuid4().hex[:8]
+        stalls = 0
+        while True:
+            fresh = 0
+            for card in self.extractor.extract(mark):
+                if not self._remember(card['id']):
+                    self.counts["duplicates"] += 1
+                    continue
+                fresh += 1
+                self.counts["yielded"] += 1
+                yield card
+
+            stalls = 0 if fresh else stalls + 1
+            if stalls >= self.stall_rounds:
+                return
+
+            previous = self.extractor.fingerprint()
+            self.clicker.scroll_down(self.scroll_step, self.container)
+            self.counts["scrolls"] += 1
+            # 等新卡片渲染出来；超时说明列表没有变化，下一轮读不到新卡片即计一次停滞
+            self.wait_for_new_list(previous, self.settle_timeout)
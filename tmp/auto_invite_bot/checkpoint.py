@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行断点记录
+
+记录当前运行的 run_id、页码、最后处理的达人以及列表游标（页面 URL、滚动位置），
+程序崩溃或 Ctrl+C 后使用 `python3 main.py --resume` 直接回到中断的位置。
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from json_state import load_json, save_json
+
+
+class RunCheckpoint:
+    """运行断点"""
+
+    def __init__(self, checkpoint_file: str):
+        self.checkpoint_file = checkpoint_file
+        self.data: Dict = {}
+
+    def load(self) -> Optional[Dict]:
+        """读取上一次未完成的断点，没有时返回 None"""
+        data = load_json(self.checkpoint_file, "断点文件")
+        if data is None or data.get('finished'):
+            return None
+        self.data = data
+        return data
+
+    def start(self, run_id: str, start_url: str, page: int = 1):
+        """开始新的运行"""
+        self.data = {
+            "run_id": run_id,
+            "start_url": start_url,
+            "page": page,
+            "last_talent_id": None,
+            "last_talent_name": None,
+            "cursor": {},
+            "finished": False,
+        }
+        self._save()
+
+    def update(self, **fields):
+        """更新断点字段并立即写盘"""
+        self.data.update(fields)
+        self._save()
+
+    def finish(self):
+        """正常结束，下次 --resume 不再使用该断点"""
+        self.update(finished=True)
+
+    def _save(self):
+        """写临时文件后原子替换，避免崩溃时留下半个文件"""
+        self.data["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        save_json(self.checkpoint_file, self.data, "断点", indent=2)
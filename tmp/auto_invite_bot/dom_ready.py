@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面就绪信号
+
+注入页面的 MutationObserver 脚本：DOM 每次变化时在页面内检查等待条件，
+条件满足时立即回调，Python 端只需一次 execute_async_script 调用，不再每 500ms 通过 HTTP 轮询。
+
+AutoClicker 通过 Page.addScriptToEvaluateOnNewDocument 在每个新文档里预先安装观察器；
+等待脚本本身也会在观察器缺失时安装一次（例如注入之前就已打开的页面）。
+"""
+
+
+# 没有卡片时的列表指纹
+EMPTY_FINGERPRINT = '0||'
+
+# 安装 window.__inviteBotReady（重复执行无副作用）
+READY_OBSERVER_JS = """
+(function () {
+    if (window.__inviteBotReady) { return; }
+    const ready = {waiters: [], timer: null};
+
+    function visible(el) {
+        if (!el.isConnected) { return false; }
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') { return false; }
+        return el.getClientRects().length > 0;
+    }
+
+    function find(kind, selector, root) {
+        root = root || document;
+        if (kind === 'xpath') {
+            return document.evaluate(selector, root, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return root.querySelector(selector);
+    }
+
+    function satisfies(el, condition) {
+        if (condition !== 'present' && !visible(el)) { return false; }
+        return !(condition === 'clickable' && el.disabled);
+    }
+
+    // 在范围内按变体顺序查找：root 为指定元素（如当前卡片，root_required 时没有元素就不查找），
+    // scope 为范围元素的 CSS 选择器（从最后一个可见的匹配开始，即最上层的弹窗；
+    // 页面上没有可见的范围元素时不查找，只有 scope_optional 的范围（如分页栏）退回整个文档），
+    // 都没有时为整个文档；返回 {element, variant}
+    ready.locate = function (w) {
+        let roots = [document];
+        if (w.root || w.root_required) {
+            roots = w.root && w.root.isConnected ? [w.root] : [];
+        } else if (w.scope) {
+            roots = Array.prototype.filter.call(document.querySelectorAll(w.scope), visible).reverse();
+            if (!roots.length && w.scope_optional) { roots = [document]; }
+        }
+        for (const root of roots) {
+            for (let i = 0; i < w.variants.length; i++) {
+                const el = find(w.variants[i][0], w.variants[i][1], root);
+                if (el && satisfies(el, w.condition)) { return {element: el, variant: i}; }
+            }
+        }
+        return null;
+    };
+
+    // 列表指纹：卡片数量 + 第一张和最后一张卡片的 ID
+    ready.fingerprint = function (cardSelector, selector, attr) {
+        const cards = document.querySelectorAll(cardSelector);
+        function cardId(card) {
+            const target = selector ? card.querySelector(selector) : card;
+            if (!target) { return ''; }
+            return attr ? (target.getAttribute(attr) || '') : (target.innerText || target.textContent || '').trim();
+        }
+        if (!cards.length) { return '0||'; }
+        return cards.length + '|' + cardId(cards[0]) + '|' + cardId(cards[cards.length - 1]);
+    };
+
+    // 与 Selenium 的 expected_conditions 一致：只看第一个匹配的元素
+    function check(w) {
+        if (w.type === 'fingerprint') {
+            const current = ready.fingerprint(w.selector, w.field[0], w.field[1]);
+            return current !== w.previous && current !== '0||' ? current : null;
+        }
+        if (w.type === 'scoped') {
+            return ready.locate(w);
+        }
+        const el = find(w.kind, w.selector);
+        return el && satisfies(el, w.condition) ? el : null;
+    }
+
+    function settle() {
+        ready.waiters = ready.waiters.filter(function (w) {
+            const result = check(w);
+            if (!result) { return true; }
+            clearTimeout(w.timeout);
+            w.done(result);
+            return false;
+        });
+        if (!ready.waiters.length && ready.timer) {
+            clearInterval(ready.timer);
+            ready.timer = null;
+        }
+    }
+
+    ready.wait = function (w, timeoutMs, done) {
+        const result = check(w);
+        if (result) { done(result); return; }
+        w.done = done;
+        w.timeout = setTimeout(function () {
+            ready.waiters = ready.waiters.filter(function (x) { return x !== w; });
+            done(null);
+        }, timeoutMs);
+        ready.waiters.push(w);
+        // 样式表、布局引起的可见性变化不一定产生 DOM 变动，页面内低频补查
+        if (!ready.timer) { ready.timer = setInterval(settle, 200); }
+    };
+
+    new MutationObserver(function () {
+        if (ready.waiters.length) { settle(); }
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+
+    window.__inviteBotReady = ready;
+})();
+"""
+
+# arguments: 等待条件, timeoutMs, callback
+# 等待条件：{type: 'element', kind: 'css' / 'xpath', selector, condition}
+#           {type: 'scoped', scope, root, root_required, scope_optional, variants: [[kind, selector], ...], condition}
+#           {type: 'fingerprint', selector: 卡片选择器, field: [子选择器, 属性名], previous: 原指纹}
+WAIT_READY_JS = READY_OBSERVER_JS + """
+const done = arguments[arguments.length - 1];
+window.__inviteBotReady.wait(arguments[0], arguments[1], done);
+"""
+
+# arguments: {scope, root, root_required, scope_optional, variants, condition}；不等待，立即返回 {element, variant} 或 null
+LOCATE_JS = READY_OBSERVER_JS + """
+return window.__inviteBotReady.locate(arguments[0]);
+"""
+
+# arguments: 卡片选择器, 子选择器, 属性名
+FINGERPRINT_JS = READY_OBSERVER_JS + """
+return window.__inviteBotReady.fingerprint(arguments[0], arguments[1], arguments[2]);
+"""
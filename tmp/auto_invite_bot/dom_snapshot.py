@@ -0,0 +1,731 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线页面快照选择器校验工具
+
+不启动浏览器，直接解析保存的页面源代码（如 get_dom_structure.py 导出的
+/tmp/findersquare_dom.html 或 assets/达人广场源代码.txt），用 config.json 中的
+卡片选择器、字段映射和各步骤按钮选择器（在各自的范围内：卡片、弹窗、分页栏或整个页面）进行匹配，
+报告每个选择器变体的匹配数量和提取到的达人。
+
+支持的 CSS 子集：标签、*、#id、.class、[attr]、[attr=v]、[attr*=v]、[attr^=v]、[attr$=v]、
+后代（空格）与子元素（>）组合、逗号分隔的选择器列表。
+支持的 XPath 子集：/、//、.、..、标签名和 *，谓词中的 text()、@attr、. 、数字下标、
+contains()、starts-with()、normalize-space()、string()、not()、= / != / and / or。
+
+用法：
+    python3 dom_snapshot.py [快照文件] [--config config.json] [--require-cards] [--check-scopes [范围 ...]]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from card_extractor import DEFAULT_CARD_FIELDS, DEFAULT_CARD_SELECTOR, parse_field_spec
+from page_selectors import (OPTIONAL_SCOPES, is_xpath, load_scope_selectors, load_step_scopes,
+                            load_step_selectors, step_description)
+
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+
+class Node:
+    """DOM 元素节点；children 中的 str 为文本节点"""
+
+    __slots__ = ('tag', 'attrs', 'children', 'parent', 'order')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional['Node'], order: int):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List = []
+        self.parent = parent
+        self.order = order
+
+    def elements(self) -> List['Node']:
+        return [child for child in self.children if isinstance(child, Node)]
+
+    def text_nodes(self) -> List[str]:
+        return [child for child in self.children if isinstance(child, str)]
+
+    def text_content(self) -> str:
+        parts = []
+        stack = [iter(self.children)]
+        while stack:
+            for child in stack[-1]:
+                if isinstance(child, str):
+                    parts.append(child)
+                else:
+                    stack.append(iter(child.children))
+                    break
+            else:
+                stack.pop()
+        return ''.join(parts)
+
+    def iter_descendants(self):
+        """按文档顺序遍历所有后代元素"""
+        stack = list(reversed(self.elements()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements()))
+
+    def classes(self) -> List[str]:
+        return self.attrs.get('class', '').split()
+
+    def outer_html(self, limit: int = 200) -> str:
+        attrs = ''.join(f' {k}="{v}"' for k, v in self.attrs.items())
+        html = f"<{self.tag}{attrs}>{self.text_content().strip()}</{self.tag}>"
+        return html[:limit]
+
+
+class _TreeBuilder(HTMLParser):
+    """用标准库 HTMLParser 构建简易 DOM 树"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {}, None, 0)
+        self._stack = [self.root]
+        self._order = 0
+
+    def _new_node(self, tag, attrs) -> Node:
+        self._order += 1
+        parent = self._stack[-1]
+        node = Node(tag, {k: (v if v is not None else '') for k, v in attrs}, parent, self._order)
+        parent.children.append(node)
+        return node
+
+    def handle_starttag(self, tag, attrs):
+        node = self._new_node(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self._new_node(tag, attrs)
+
+    def handle_endtag(self, tag):
+        # 容错：向上找到同名的未闭合元素再出栈
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    """解析 HTML，返回文档根节点"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# ---------------------------------------------------------------- CSS
+
+_IDENT = r'(?:\\.|[\w\-\u0080-\uffff])+'
+_CSS_TOKEN = re.compile(
+    r'\s*(?P<comb>[>+~])\s*|(?P<space>\s+)|'
+    r'(?P<tag>\*|' + _IDENT + r')|'
+    r'#(?P<id>' + _IDENT + r')|'
+    r'\.(?P<cls>' + _IDENT + r')|'
+    r'\[\s*(?P<attr>[\w\-:]+)\s*(?:(?P<op>[*^$~|]?=)\s*(?P<val>"[^"]*"|\'[^\']*\'|[^\]\s]+)\s*)?\]'
+)
+
+
+def _unescape(ident: str) -> str:
+    return re.sub(r'\\(.)', r'\1', ident)
+
+
+class CssSelector:
+    """预编译的 CSS 选择器"""
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.groups = [self._parse(part.strip()) for part in selector.split(',') if part.strip()]
+
+    @staticmethod
+    def _parse(selector: str) -> List:
+        """解析为 [(组合符, {tag, ids, classes, attrs}), ...]"""
+        parts = []
+        combinator = None
+        compound = None
+        pos = 0
+        while pos < len(selector):
+            match = _CSS_TOKEN.match(selector, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"不支持的 CSS 选择器: {selector!r}（位置 {pos}）")
+            pos = match.end()
+            if match.group('comb') or match.group('space'):
+                if compound is not None:
+                    parts.append((combinator or ' ', compound))
+                    compound = None
+                    combinator = ' '
+                if match.group('comb'):
+                    combinator = match.group('comb')
+                continue
+            if compound is None:
+                compound = {'tag': None, 'ids': [], 'classes': [], 'attrs': []}
+            if match.group('tag'):
+                compound['tag'] = match.group('tag').lower()
+            elif match.group('id'):
+                compound['ids'].append(_unescape(match.group('id')))
+            elif match.group('cls'):
+                compound['classes'].append(_unescape(match.group('cls')))
+            else:
+                value = match.group('val')
+                if value and value[0] in '"\'':
+                    value = value[1:-1]
+                compound['attrs'].append((match.group('attr'), match.group('op'), value))
+        if compound is not None:
+            parts.append((combinator or ' ', compound))
+        if any(comb in '+~' for comb, _ in parts):
+            raise ValueError(f"不支持兄弟组合符: {selector!r}")
+        return parts
+
+    @staticmethod
+    def _match_compound(node: Node, compound: Dict) -> bool:
+        if compound['tag'] not in (None, '*') and node.tag != compound['tag']:
+            return False
+        if compound['ids'] and node.attrs.get('id') not in compound['ids']:
+            return False
+        if compound['classes']:
+            classes = node.classes()
+            if any(cls not in classes for cls in compound['classes']):
+                return False
+        for name, op, value in compound['attrs']:
+            actual = node.attrs.get(name)
+            if actual is None:
+                return False
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and value not in actual:
+                return False
+            if op == '^=' and not actual.startswith(value):
+                return False
+            if op == '$=' and not actual.endswith(value):
+                return False
+            if op == '~=' and value not in actual.split():
+                return False
+        return True
+
+    def _match_parts(self, node: Node, parts: List, index: int) -> bool:
+        combinator, compound = parts[index]
+        if not self._match_compound(node, compound):
+            return False
+        if index == 0:
+            return True
+        parent = node.parent
+        if combinator == '>':
+            return parent is not None and parent.tag != '#document' and self._match_parts(parent, parts, index - 1)
+        while parent is not None and parent.tag != '#document':
+            if self._match_parts(parent, parts, index - 1):
+                return True
+            parent = parent.parent
+        return False
+
+    def matches(self, node: Node) -> bool:
+        return any(self._match_parts(node, parts, len(parts) - 1) for parts in self.groups if parts)
+
+    def select(self, scope: Node) -> List[Node]:
+        return [node for node in scope.iter_descendants() if self.matches(node)]
+
+    def select_one(self, scope: Node) -> Optional[Node]:
+        for node in scope.iter_descendants():
+            if self.matches(node):
+                return node
+        return None
+
+
+# ---------------------------------------------------------------- XPath
+
+_XPATH_TOKEN = re.compile(
+    r'\s*(?:(?P<str>"[^"]*"|\'[^\']*\')|(?P<num>\d+(?:\.\d+)?)|'
+    r'(?P<op>!=|<=|>=|//|\.\.|[/\[\]()@,=<>.*|])|(?P<name>[\w\-:]+))'
+)
+
+
+def _tokenize_xpath(expr: str) -> List:
+    tokens = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        match = _XPATH_TOKEN.match(expr, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"不支持的 XPath: {expr!r}（位置 {pos}）")
+        pos = match.end()
+        if match.group('str') is not None:
+            tokens.append(('str', match.group('str')[1:-1]))
+        elif match.group('num') is not None:
+            tokens.append(('num', float(match.group('num'))))
+        elif match.group('op') is not None:
+            tokens.append(('op', match.group('op')))
+        else:
+            tokens.append(('name', match.group('name')))
+    return tokens
+
+
+def _string_value(value) -> str:
+    if isinstance(value, list):
+        if not value:
+            return ''
+        first = value[0]
+        return first if isinstance(first, str) else first.text_content()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    return value
+
+
+def _bool_value(value) -> bool:
+    if isinstance(value, list):
+        return bool(value)
+    if isinstance(value, str):
+        return value != ''
+    return bool(value)
+
+
+def _items_as_strings(value) -> List[str]:
+    return [item if isinstance(item, str) else item.text_content() for item in value]
+
+
+class XPathSelector:
+    """预编译的 XPath 选择器（递归下降解析为闭包）"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._tokens = _tokenize_xpath(expression)
+        self._pos = 0
+        self._evaluate = self._parse_path()
+        if self._pos != len(self._tokens):
+            raise ValueError(f"不支持的 XPath: {expression!r}")
+
+    # ---- 词法辅助
+    def _peek(self, offset: int = 0):
+        index = self._pos + offset
+        return self._tokens[index] if index < len(self._tokens) else (None, None)
+
+    def _accept(self, kind: str, value=None) -> bool:
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self._pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value=None):
+        if not self._accept(kind, value):
+            raise ValueError(f"不支持的 XPath: {self.expression!r}（期望 {value or kind}）")
+
+    # ---- 路径
+    def _parse_path(self):
+        """解析位置路径，返回 f(context_nodes) -> 节点列表"""
+        if self._accept('op', '('):
+            # (路径)[n]：谓词作用于整个结果集
+            inner = self._parse_path()
+            self._expect('op', ')')
+            predicates = []
+            while self._accept('op', '['):
+                predicates.append(self._parse_or())
+                self._expect('op', ']')
+
+            def evaluate_group(context: List[Node]) -> List[Node]:
+                nodes = inner(context)
+                for predicate in predicates:
+                    nodes = [node for i, node in enumerate(nodes)
+                             if self._predicate_true(predicate(node, i + 1, len(nodes)), i + 1)]
+                return nodes
+
+            return evaluate_group
+
+        absolute = False
+        steps = []
+        if self._accept('op', '//'):
+            absolute = True
+            steps.append(('descendant-or-self', None, []))
+        elif self._accept('op', '/'):
+            absolute = True
+
+        steps.append(self._parse_step())
+        while True:
+            if self._accept('op', '//'):
+                steps.append(('descendant-or-self', None, []))
+                steps.append(self._parse_step())
+            elif self._accept('op', '/'):
+                steps.append(self._parse_step())
+            else:
+                break
+
+        def evaluate(context: List[Node]) -> List[Node]:
+            nodes = context
+            if absolute:
+                root = context[0]
+                while root.parent is not None:
+                    root = root.parent
+                nodes = [root]
+            for axis, test, predicates in steps:
+                nodes = self._apply_step(nodes, axis, test, predicates)
+            return nodes
+
+        return evaluate
+
+    def _parse_step(self):
+        if self._accept('op', '..'):
+            return ('parent', None, [])
+        if self._accept('op', '.'):
+            return ('self', None, [])
+        axis = 'child'
+        if self._accept('op', '@'):
+            raise ValueError(f"不支持选取属性节点: {self.expression!r}")
+        if self._accept('op', '*'):
+            test = '*'
+        else:
+            kind, value = self._peek()
+            if kind != 'name':
+                raise ValueError(f"不支持的 XPath: {self.expression!r}")
+            self._pos += 1
+            test = value.lower()
+            if test == 'text' and self._accept('op', '('):
+                self._expect('op', ')')
+                axis, test = 'text', None
+        predicates = []
+        while self._accept('op', '['):
+            predicates.append(self._parse_or())
+            self._expect('op', ']')
+        return (axis, test, predicates)
+
+    @staticmethod
+    def _apply_step(nodes: List, axis: str, test: Optional[str], predicates: List) -> List:
+        result = []
+        seen = set()
+
+        def add(node):
+            if id(node) not in seen:
+                seen.add(id(node))
+                result.append(node)
+
+        for node in nodes:
+            if axis == 'text':
+                for text in node.text_nodes():
+                    result.append(text)
+                continue
+            if axis == 'parent':
+                if node.parent is not None:
+                    add(node.parent)
+                continue
+            if axis == 'self':
+                add(node)
+                continue
+            if axis == 'descendant-or-self':
+                add(node)
+                for descendant in node.iter_descendants():
+                    add(descendant)
+                continue
+
+            candidates = [child for child in node.elements()
+                          if test == '*' or child.tag == test]
+            for predicate in predicates:
+                candidates = [c for i, c in enumerate(candidates)
+                              if XPathSelector._predicate_true(predicate(c, i + 1, len(candidates)), i + 1)]
+            for candidate in candidates:
+                add(candidate)
+
+        if axis != 'text':
+            result.sort(key=lambda n: n.order)
+        return result
+
+    @staticmethod
+    def _predicate_true(value, position: int) -> bool:
+        if isinstance(value, float):
+            return value == position
+        return _bool_value(value)
+
+    # ---- 表达式（谓词内部），返回 f(node, position, size) -> 值
+    def _parse_or(self):
+        left = self._parse_and()
+        while self._accept('name', 'or'):
+            right = self._parse_and()
+            left = (lambda a, b: lambda n, p, s: _bool_value(a(n, p, s)) or _bool_value(b(n, p, s)))(left, right)
+        return left
+
+    def _parse_and(self):
+        left = self._parse_compare()
+        while self._accept('name', 'and'):
+            right = self._parse_compare()
+            left = (lambda a, b: lambda n, p, s: _bool_value(a(n, p, s)) and _bool_value(b(n, p, s)))(left, right)
+        return left
+
+    def _parse_compare(self):
+        left = self._parse_primary()
+        for op in ('=', '!='):
+            if self._accept('op', op):
+                right = self._parse_primary()
+                return self._compare(left, right, op == '=')
+        return left
+
+    @staticmethod
+    def _compare(left, right, equal: bool):
+        def evaluate(node, position, size):
+            a, b = left(node, position, size), right(node, position, size)
+            if isinstance(a, float) or isinstance(b, float):
+                try:
+                    a_values = [float(x) for x in (_items_as_strings(a) if isinstance(a, list) else [a])]
+                    b_values = [float(x) for x in (_items_as_strings(b) if isinstance(b, list) else [b])]
+                except ValueError:
+                    return not equal
+            else:
+                a_values = _items_as_strings(a) if isinstance(a, list) else [_string_value(a)]
+                b_values = _items_as_strings(b) if isinstance(b, list) else [_string_value(b)]
+            hit = any((x == y) == equal for x in a_values for y in b_values)
+            return hit
+        return evaluate
+
+    def _parse_primary(self):
+        kind, value = self._peek()
+        if kind == 'str':
+            self._pos += 1
+            return lambda n, p, s, v=value: v
+        if kind == 'num':
+            self._pos += 1
+            return lambda n, p, s, v=value: v
+        if self._accept('op', '('):
+            inner = self._parse_or()
+            self._expect('op', ')')
+            return inner
+        if self._accept('op', '@'):
+            _, name = self._peek()
+            self._pos += 1
+            return lambda n, p, s, a=name: [n.attrs[a]] if a in n.attrs else []
+        if kind == 'name' and self._peek(1) == ('op', '(') and value != 'text':
+            return self._parse_function()
+
+        # 相对路径：.、..、text()、子元素名、.//x 等
+        path = self._parse_path()
+        return lambda n, p, s: path([n])
+
+    def _parse_function(self):
+        _, name = self._peek()
+        self._pos += 2
+        args = []
+        if not self._accept('op', ')'):
+            args.append(self._parse_or())
+            while self._accept('op', ','):
+                args.append(self._parse_or())
+            self._expect('op', ')')
+
+        def arg_string(i, n, p, s):
+            return _string_value(args[i](n, p, s)) if i < len(args) else n.text_content()
+
+        if name == 'contains':
+            return lambda n, p, s: arg_string(1, n, p, s) in arg_string(0, n, p, s)
+        if name == 'starts-with':
+            return lambda n, p, s: arg_string(0, n, p, s).startswith(arg_string(1, n, p, s))
+        if name == 'normalize-space':
+            return lambda n, p, s: ' '.join(arg_string(0, n, p, s).split())
+        if name == 'string':
+            return lambda n, p, s: arg_string(0, n, p, s)
+        if name == 'not':
+            return lambda n, p, s: not _bool_value(args[0](n, p, s))
+        if name == 'position':
+            return lambda n, p, s: float(p)
+        if name == 'last':
+            return lambda n, p, s: float(s)
+        raise ValueError(f"不支持的 XPath 函数: {name}()")
+
+    def select(self, scope: Node) -> List[Node]:
+        return [node for node in self._evaluate([scope]) if isinstance(node, Node)]
+
+    def select_one(self, scope: Node) -> Optional[Node]:
+        nodes = self.select(scope)
+        return nodes[0] if nodes else None
+
+
+def compile_selector(selector: str):
+    """按写法编译为 XPath 或 CSS 选择器"""
+    return XPathSelector(selector) if is_xpath(selector) else CssSelector(selector)
+
+
+# ---------------------------------------------------------------- 报告
+
+def extract_talents(root: Node, card_selector: str, card_fields: Dict[str, str]) -> List[Dict]:
+    """与 CardExtractor.extract 相同的规则离线提取达人卡片"""
+    cards = CssSelector(card_selector).select(root)
+    fields = [(key, *parse_field_spec(spec)) for key, spec in card_fields.items()]
+    compiled = {selector: CssSelector(selector) for _, selector, _ in fields if selector}
+
+    talents = []
+    for index, card in enumerate(cards):
+        item = {'index': index}
+        for key, selector, attr in fields:
+            target = compiled[selector].select_one(card) if selector else card
+            if target is None:
+                item[key] = None
+            elif attr:
+                item[key] = target.attrs.get(attr)
+            else:
+                item[key] = target.text_content().strip()
+        name = (item.get('name') or '').strip()
+        if not name:
+            continue
+        item['name'] = name
+        item['id'] = item.get('id') or name
+        talents.append(item)
+    return talents
+
+
+def locate(root: Node, spec: Dict) -> Optional[Node]:
+    """在快照中按 SelectorRegistry.spec 给出的定位规则查找，与 dom_ready.locate 一致（快照中不判断可见性）"""
+    if spec.get('root') is not None or spec.get('root_required'):
+        scope_roots = [spec['root']] if spec.get('root') is not None else []
+    elif spec.get('scope'):
+        scope_roots = list(reversed(CssSelector(spec['scope']).select(root)))
+        if not scope_roots and spec.get('scope_optional'):
+            scope_roots = [root]
+    else:
+        scope_roots = [root]
+    for scope_root in scope_roots:
+        for _, selector in spec['variants']:
+            match = compile_selector(selector).select_one(scope_root)
+            if match is not None:
+                return match
+    return None
+
+
+def evaluate_snapshot(html: str, config: dict) -> Dict:
+    """解析快照并评估所有已配置的选择器"""
+    start = time.perf_counter()
+    root = parse_html(html)
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    card_selector = config.get('card_selector', DEFAULT_CARD_SELECTOR)
+    card_fields = config.get('card_fields', DEFAULT_CARD_FIELDS)
+
+    start = time.perf_counter()
+    card_count = len(CssSelector(card_selector).select(root))
+    talents = extract_talents(root, card_selector, card_fields)
+    steps = {}
+    scopes = load_step_scopes(config)
+    scope_selectors = load_scope_selectors(config)
+    for step, variants in load_step_selectors(config).items():
+        scope = scopes[step]
+        if scope == 'card':
+            scope_roots = CssSelector(card_selector).select(root)
+        elif scope == 'page' or not scope_selectors.get(scope):
+            scope_roots = [root]
+        else:
+            # 与 dom_ready.locate 一致：只有可选的范围在没有范围元素时退回整个页面
+            scope_roots = CssSelector(scope_selectors[scope]).select(root)
+            if not scope_roots and scope in OPTIONAL_SCOPES:
+                scope_roots = [root]
+
+        results = []
+        for selector in variants:
+            try:
+                compiled = compile_selector(selector)
+                matches = [match for scope_root in scope_roots for match in compiled.select(scope_root)]
+                results.append({'selector': selector, 'count': len(matches),
+                                'first': matches[0].outer_html() if matches else None})
+            except ValueError as e:
+                results.append({'selector': selector, 'count': 0, 'error': str(e)})
+        steps[step] = {'scope': scope, 'scope_count': len(scope_roots), 'variants': results,
+                       'count': sum(result['count'] for result in results)}
+    scope_counts = {}
+    for scope, selector in scope_selectors.items():
+        try:
+            scope_counts[scope] = {'selector': selector, 'count': len(CssSelector(selector).select(root))}
+        except ValueError as e:
+            scope_counts[scope] = {'selector': selector, 'count': 0, 'error': str(e)}
+    evaluate_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'parse_ms': parse_ms,
+        'evaluate_ms': evaluate_ms,
+        'card_selector': card_selector,
+        'card_count': card_count,
+        'talents': talents,
+        'steps': steps,
+        'scopes': scope_counts,
+    }
+
+
+def print_report(report: Dict, show: int = 10):
+    """打印评估结果"""
+    print("="*60)
+    print(f"解析耗时: {report['parse_ms']:.1f}ms，选择器评估耗时: {report['evaluate_ms']:.1f}ms")
+    print("="*60)
+    print(f"\n卡片选择器 {report['card_selector']!r}: 匹配 {report['card_count']} 个元素，"
+          f"提取到 {len(report['talents'])} 位达人")
+    for talent in report['talents'][:show]:
+        print(f"  - [{talent['index']}] {talent['name']} (ID: {talent['id']})")
+    if len(report['talents']) > show:
+        print(f"  ... 另有 {len(report['talents']) - show} 位")
+
+    print("\n范围选择器：")
+    for scope, scope_result in report['scopes'].items():
+        mark = "✓" if scope_result['count'] else "⚠"
+        if scope_result['count']:
+            note = ""
+        elif scope in OPTIONAL_SCOPES:
+            note = "（快照中不存在，运行时退回整个页面查找）"
+        else:
+            note = "（快照中不存在，运行时该范围内的步骤会找不到按钮）"
+        print(f"  {mark} {scope} {scope_result['selector']!r}: 匹配 {scope_result['count']} 个{note}")
+        if scope_result.get('error'):
+            print(f"      错误: {scope_result['error']}")
+
+    print("\n步骤按钮（按范围查找）：")
+    for step, step_result in report['steps'].items():
+        mark = "✓" if step_result['count'] else "✗"
+        print(f"  {mark} {step_description(step)}: 范围 {step_result['scope']}（{step_result['scope_count']} 个）")
+        for result in step_result['variants']:
+            print(f"      {result['count']:>4} 个  {result['selector']}")
+            if result.get('error'):
+                print(f"           错误: {result['error']}")
+            elif result['first']:
+                print(f"           首个: {result['first']}")
+    print("\n" + "="*60)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="离线校验页面快照中的选择器")
+    parser.add_argument('snapshot', nargs='?', default='/tmp/findersquare_dom.html',
+                        help='保存的页面源代码文件')
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    parser.add_argument('--require-cards', action='store_true',
+                        help='未提取到任何达人时以非零状态退出（用于 CI）')
+    parser.add_argument('--check-scopes', metavar='SCOPE', nargs='*',
+                        help='指定的范围（不写时为全部）在快照中没有匹配时以非零状态退出')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    with open(args.snapshot, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    report = evaluate_snapshot(html, config)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+    if args.require_cards and not report['talents']:
+        sys.exit(1)
+    if args.check_scopes is not None:
+        missing = [scope for scope in (args.check_scopes or report['scopes'])
+                   if not report['scopes'].get(scope, {}).get('count')]
+        if missing:
+            print(f"快照中没有匹配的范围: {', '.join(missing)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,41 +5,19 @@
 使用此脚本可以获取动态加载后的HTML结构，帮助找到正确的选择器
 """
 
+import json
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+
+from browser_factory import create_driver, shutdown_driver
+from dom_snapshot import evaluate_snapshot, print_report
 
 
 def get_dom_structure():
     """获取页面的DOM结构"""
-    # 配置Chrome选项
-    chrome_options = Options()
-
-    # 使用系统Chrome用户数据目录
-    import platform
-    import getpass
-
-    system = platform.system()
-    username = getpass.getuser()
-
-    if system == 'Windows':
-        user_data_dir = f"C:\\Users\\{username}\\AppData\\Local\\Google\\Chrome\\User Data"
-    elif system == 'Darwin':  # Mac
-        user_data_dir = f"/Users/{username}/Library/Application Support/Google/Chrome"
-    else:  # Linux
-        user_data_dir = f"/home/{username}/.config/google-chrome"
-
-    chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
-    chrome_options.add_argument('--profile-directory=Default')
-
-    # 禁用自动化控制特征
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-
-    # 初始化浏览器
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # 与主程序共用浏览器创建逻辑（系统用户目录、chromedriver 缓存、连接已有会话）
+    with open('config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    driver = create_driver(config)
 
     try:
         # 打开达人广场页面
@@ -86,6 +64,12 @@ def get_dom_structure():
 
         print(f"\n✓ 完整HTML已保存到: /tmp/findersquare_dom.html")
 
+        # 用当前 config.json 中的选择器离线评估刚保存的快照
+        try:
+            print_report(evaluate_snapshot(page_html, config))
+        except Exception as e:
+            print(f"离线评估选择器时出错: {e}")
+
         # 搜索包含"flex flex-row items-center"的元素（达人名称的class）
         print("\n" + "="*80)
         print("搜索达人名称相关元素:")
@@ -126,7 +110,8 @@ def get_dom_structure():
         print("\n提示:")
         print("1. 查看 /tmp/findersquare_dom.html 获取完整HTML")
         print("2. 根据上面的输出，找到达人卡片的class")
-        print("3. 将class信息更新到 main.py 中")
+        print("3. 将class信息更新到 config.json 中")
+        print("4. 修改选择器后用 python3 dom_snapshot.py /tmp/findersquare_dom.html 离线验证，无需再启动浏览器")
 
         # 保持浏览器打开，方便用户查看
         input("\n按回车键关闭浏览器...")
@@ -136,7 +121,7 @@ def get_dom_structure():
         import traceback
         traceback.print_exc()
     finally:
-        driver.quit()
+        shutdown_driver(driver, config)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台 I/O
+
+浏览器操作都在主线程上进行，写日志和写邀约记录不应占用这条线程：
+- 日志：主线程的 QueueHandler 只把日志放进有界队列，由 QueueListener 线程写文件和控制台
+- 邀约记录：BackgroundRecordStore 把写入放进有界队列，后台线程把积压的记录合成一批，
+  一次 append_many 提交（group commit）；未提交的记录保存在内存中，is_invited 立即可见
+
+队列满时主线程会等待（而不是丢弃日志或记录），close() / stop() 会写完队列中剩余的内容；
+提交失败的记录在下一次提交、flush() 或 close() 时重试，close() 时仍写不进去则抛出异常。
+"""
+
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BlockingQueueHandler(QueueHandler):
+    """队列满时等待的 QueueHandler（默认的 put_nowait 会直接报错丢弃日志）"""
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+
+def start_log_listener(handlers: List[logging.Handler], maxsize: int = 10000) -> Tuple[QueueHandler, QueueListener]:
+    """启动日志后台线程，返回 (挂到 logger 上的 QueueHandler, 需要在退出时 stop 的 QueueListener)"""
+    log_queue = queue.Queue(maxsize)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return BlockingQueueHandler(log_queue), listener
+
+
+class BackgroundRecordStore:
+    """把写入交给后台线程分组提交的存储包装，接口与 record_store 中的各后端相同"""
+
+    def __init__(self, store, maxsize: int = 1000, batch_size: int = 200):
+        self.store = store
+        self.batch_size = batch_size
+        self.queue: queue.Queue = queue.Queue(maxsize)
+
+        # store_lock 保护对底层存储的访问；pending 为已入队、尚未提交的达人 -> [汇总状态, 条数]
+        self.store_lock = threading.Lock()
+        self.pending_lock = threading.Lock()
+        self.pending: Dict[str, List] = {}
+        # 提交失败、等待重试的记录（受 store_lock 保护）
+        self.failed: List[Tuple[str, Dict]] = []
+
+        self.stats = {"batches": 0, "records": 0, "write_time": 0.0, "errors": 0}
+        self.thread = threading.Thread(target=self._run, name="record-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            # 把提交期间积压的记录合成一批
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [item for item in items if item is not _STOP]
+            if entries:
+                self._commit(entries)
+            for _ in items:
+                self.queue.task_done()
+            if len(entries) < len(items):
+                return
+
+    def _commit(self, entries: List[Tuple[str, Dict]]):
+        """提交一批记录；之前提交失败的记录排在前面一起重试，entries 为空时只重试失败的记录"""
+        start = time.perf_counter()
+        with self.store_lock:
+            batch = self.failed + entries
+            if not batch:
+                return
+            try:
+                self.store.append_many(batch)
+            except Exception as e:
+                # 提交失败时保留在 pending 中（本次运行内依然视为已邀约），下次提交或 close() 时重试
+                self.failed = batch
+                self.stats["errors"] += 1
+                logger.error(f"后台写入 {len(batch)} 条邀约记录失败，稍后重试: {e}")
+                return
+            self.failed = []
+        self.stats["batches"] += 1
+        self.stats["records"] += len(batch)
+        self.stats["write_time"] += time.perf_counter() - start
+
+        with self.pending_lock:
+            for talent_id, _ in batch:
+                state = self.pending.get(talent_id)
+                if state:
+                    state[1] -= 1
+                    if state[1] <= 0:
+                        del self.pending[talent_id]
+
+    def _pending_status(self, talent_id: str) -> Optional[str]:
+        with self.pending_lock:
+            state = self.pending.get(talent_id)
+            return state[0] if state else None
+
+    def contains(self, talent_id: str) -> bool:
+        if self._pending_status(talent_id) is not None:
+            return True
+        with self.store_lock:
+            return self.store.contains(talent_id)
+
+    def talent_status(self, talent_id: str) -> Optional[str]:
+        pending = self._pending_status(talent_id)
+        with self.store_lock:
+            stored = self.store.talent_status(talent_id)
+        if pending is None:
+            return stored
+        return "success" if "success" in (pending, stored) else "failed"
+
+    def append(self, talent_id: str, record: Dict):
+        self.append_many([(talent_id, record)])
+
+    def append_many(self, entries: Iterable[Tuple[str, Dict]]):
+        for talent_id, record in entries:
+            with self.pending_lock:
+                state = self.pending.setdefault(talent_id, [record["status"], 0])
+                if record["status"] == "success":
+                    state[0] = "success"
+                state[1] += 1
+            self.queue.put((talent_id, record))
+
+    def flush(self):
+        """等待队列中的记录全部提交（并重试一次之前失败的记录）"""
+        self.queue.join()
+        if self.failed:
+            self._commit([])
+
+    def statistics(self) -> Dict:
+        self.flush()
+        with self.store_lock:
+            return self.store.statistics()
+
+    def get_all(self) -> Dict[str, List[Dict]]:
+        self.flush()
+        with self.store_lock:
+            return self.store.get_all()
+
+    def close(self):
+        """写完剩余记录后停止后台线程并关闭底层存储；仍有记录写不进去时抛出异常，不静默丢弃"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        if self.failed:
+            self._commit([])
+        lost = len(self.failed)
+        self.store.close()
+        if lost:
+            raise RuntimeError(f"{lost} 条邀约记录未能写入存储，详见日志")
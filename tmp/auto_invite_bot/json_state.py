@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 状态文件
+
+断点、重试队列、选择器统计、跳过缓存、页面缓存都是一个小 JSON 文件：
+- load_json：读取失败（文件损坏等）时打印原因并当作没有
+- save_json：写临时文件后用 os.replace 原子替换，崩溃时不会留下半个文件
+- ExpiringCache：键 -> {..., time} 的跨运行缓存，签名（规则、记录文件等）变化时整体作废，
+  超过有效期的条目在读取时丢弃
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+def load_json(path: Optional[str], description: str) -> Optional[Any]:
+    """读取 JSON 文件；没有配置路径、文件不存在或读取失败时返回 None"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"读取{description}失败: {e}")
+        return None
+
+
+def save_json(path: str, data: Any, description: str, indent: Optional[int] = None) -> bool:
+    """写临时文件后原子替换，返回是否写入成功"""
+    tmp_file = path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_file, path)
+        return True
+    except OSError as e:
+        print(f"保存{description}失败: {e}")
+        return False
+
+
+class ExpiringCache:
+    """带签名和有效期的键值缓存，保存为 {"signature": ..., ENTRIES_KEY: {键: {..., "time": 时间戳}}}"""
+
+    # 文件中条目所在的字段名和日志中的名称，由子类指定
+    ENTRIES_KEY = "entries"
+    DESCRIPTION = "缓存"
+
+    def __init__(self, cache_file: Optional[str], signature: str, ttl_days: float):
+        self.cache_file = cache_file
+        self.signature = signature
+        self.ttl = ttl_days * 86400
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+        self.hits = 0
+        self._load()
+
+    def __bool__(self) -> bool:
+        return bool(self.cache_file)
+
+    def _load(self):
+        data = load_json(self.cache_file, self.DESCRIPTION)
+        if data is None:
+            return
+        if data.get('signature') != self.signature:
+            # 规则或记录文件改过，之前的结果不再适用
+            self.dirty = True
+            return
+        saved = data.get(self.ENTRIES_KEY, {})
+        now = time.time()
+        self.entries = {key: entry for key, entry in saved.items() if now - entry.get('time', 0) < self.ttl}
+        self.dirty = len(self.entries) != len(saved)
+
+    def put(self, key: str, **fields):
+        self.entries[key] = {**fields, "time": time.time()}
+        self.dirty = True
+
+    def save(self):
+        """有改动时保存"""
+        if not self.cache_file or not self.dirty:
+            return
+        if save_json(self.cache_file, {"signature": self.signature, self.ENTRIES_KEY: self.entries},
+                     self.DESCRIPTION):
+            self.dirty = False
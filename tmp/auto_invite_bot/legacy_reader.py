@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+旧格式 invite_records.json 的流式读取
+
+旧格式为一个 JSON 对象：{"达人ID": [{"name", "status", "time"}, ...], ...}。
+json.load 需要把整个文件和解析结果同时放进内存，文件被截断时还会整体失败。
+这里按块读取、每次只解析一位达人，内存占用只与单个条目的大小有关；
+遇到截断或损坏时保留之前所有完整的达人，并记录损坏处的字节偏移和剩余字节数。
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+WHITESPACE = ' \t\n\r'
+
+_FAIL = object()
+
+
+class LegacyRecordReader:
+    """逐位达人读取旧格式记录文件的迭代器，读完后可查看 complete / error / corrupt_offset"""
+
+    def __init__(self, record_file: str, chunk_size: int = 1 << 20, max_entry_size: int = 64 << 20):
+        self.record_file = record_file
+        self.chunk_size = chunk_size
+        self.max_entry_size = max_entry_size
+
+        self.count = 0
+        self.complete = False
+        self.error: Optional[str] = None
+        self.corrupt_offset: Optional[int] = None
+        self.corrupt_bytes = 0
+
+        self._file = None
+        self._buf = ''
+        self._pos = 0
+        # _mark 之前的内容已完整解析，补充数据时只丢弃这一部分
+        self._mark = 0
+        self._consumed_bytes = 0
+        self._eof = False
+
+    def _fill(self):
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return
+        if self._mark:
+            self._consumed_bytes += len(self._buf[:self._mark].encode('utf-8'))
+            self._buf = self._buf[self._mark:]
+            self._pos -= self._mark
+            self._mark = 0
+        self._buf += chunk
+
+    def _peek(self) -> str:
+        """跳过空白，返回下一个字符；文件结束时返回空字符串"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return ''
+            self._fill()
+
+    def _decode(self, decoder: json.JSONDecoder):
+        """从当前位置解析一个 JSON 值，数据不够时继续读取"""
+        while True:
+            try:
+                value, self._pos = decoder.raw_decode(self._buf, self._pos)
+                return value
+            except json.JSONDecodeError:
+                if self._eof or len(self._buf) - self._mark > self.max_entry_size:
+                    return _FAIL
+                self._fill()
+
+    def _fail(self, message: str):
+        self.error = message
+        self.corrupt_offset = self._consumed_bytes + len(self._buf[:self._mark].encode('utf-8'))
+        self.corrupt_bytes = max(0, os.path.getsize(self.record_file) - self.corrupt_offset)
+
+    def __iter__(self) -> Iterator[Tuple[str, List[Dict]]]:
+        decoder = json.JSONDecoder()
+        with open(self.record_file, 'r', encoding='utf-8', errors='replace') as self._file:
+            if self._peek() != '{':
+                self._fail("文件不是 JSON 对象")
+                return
+            self._pos += 1
+            self._mark = self._pos
+
+            while True:
+                ch = self._peek()
+                if ch == '}':
+                    self.complete = True
+                    return
+                if self.count:
+                    if ch != ',':
+                        self._fail("缺少分隔符" if ch else "文件被截断")
+                        return
+                    self._pos += 1
+                    ch = self._peek()
+
+                key = self._decode(decoder) if ch == '"' else _FAIL
+                if key is _FAIL or self._peek() != ':':
+                    self._fail("达人ID 不完整" if self._eof else "达人ID 格式错误")
+                    return
+                self._pos += 1
+                self._peek()
+
+                value = self._decode(decoder)
+                if value is _FAIL or not isinstance(value, list):
+                    self._fail("邀约记录不完整" if self._eof else "邀约记录格式错误")
+                    return
+
+                self._mark = self._pos
+                self.count += 1
+                yield key, value
+
+    def report(self) -> str:
+        """读取结果的一行说明"""
+        if self.complete:
+            return f"{self.record_file}: 完整，共 {self.count} 位达人"
+        return (f"{self.record_file}: {self.error}，保留了 {self.count} 位完整的达人，"
+                f"第 {self.corrupt_offset} 字节之后的 {self.corrupt_bytes} 字节无法解析")
+
+
+def convert_legacy_to_log(record_file: str, log_file: str) -> LegacyRecordReader:
+    """一次遍历把旧格式记录写成追加式日志（每位达人一行），写临时文件后原子替换"""
+    reader = LegacyRecordReader(record_file)
+    tmp_file = log_file + '.tmp'
+    parent = os.path.dirname(log_file)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for talent_id, history in reader:
+                f.write(json.dumps({"id": talent_id, "records": history}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, log_file)
+    except BaseException:
+        # 没有导入完成时不留下日志，下次启动重新导入
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return reader
@@ -4,22 +4,32 @@
 微信小店达人广场自动邀约机器人
 """
 
+import argparse
 import json
 import logging
 import time
 import os
 from typing import Optional
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from urllib.parse import urljoin
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 
 from auto_clicker import AutoClicker
+from browser_factory import create_driver, shutdown_driver
+from browser_monitor import BrowserMonitor
+from card_extractor import CardExtractor, CardHandle
+from card_stream import CardStream
+from checkpoint import RunCheckpoint
+from dom_ready import EMPTY_FINGERPRINT
+from io_worker import start_log_listener
+from network_capture import NetworkCardSource
+from page_cache import PageCache, page_key
+from page_selectors import INVITE_STEPS, SelectorRegistry, load_step_waits, step_description
+from profiling import DriverCommandStats, profile_run
 from record_manager import RecordManager
+from retry_queue import RetryQueue
+from talent_filter import SkipCache, TalentFilter
+from timeline import RunTimeline, percentile
 
 
 class WechatStoreInviteBot:
@@ -30,8 +40,46 @@ class WechatStoreInviteBot:
         with open(config_file, 'r', encoding='utf-8') as f:
             self.config = json.load(f)
 
+        # 日志和邀约记录默认由后台线程写盘，点击流程不等待磁盘
+        self.background_io = self.config.get('background_io', True)
+
         # 初始化记录管理器
-        self.record_manager = RecordManager(self.config['record_file'])
+        self.record_manager = RecordManager(
+            self.config['record_file'],
+            self.config.get('record_backend', 'json'),
+            background=self.background_io,
+            queue_size=self.config.get('io_queue_size', 1000)
+        )
+
+        # 按卡片信息预先筛选达人（talent_filters 为空时不筛选），筛掉的达人跨运行缓存
+        self.talent_filter = TalentFilter(self.config.get('talent_filters', []))
+        self.skip_cache = SkipCache(
+            self.config.get('skip_cache_file') if self.talent_filter else None,
+            self.talent_filter.signature,
+            self.config.get('skip_cache_days', 7)
+        )
+        self.filtered_count = 0
+
+        # 临时失败的达人延后重试，permanent_failure_steps 中的步骤失败视为永久失败
+        self.retry_queue = RetryQueue(
+            self.config.get('retry_queue_file'),
+            self.config.get('retry_base_delay', 60),
+            self.config.get('retry_max_delay', 6 * 3600),
+            self.config.get('retry_max_attempts', 3)
+        )
+        self.permanent_failure_steps = set(self.config.get('permanent_failure_steps', ['invite']))
+
+        # 整页都已处理过的列表页（page_cache_file 为空时不缓存），命中时直接翻页
+        self.page_cache = PageCache(
+            self.config.get('page_cache_file'),
+            page_key([os.path.abspath(self.config['record_file']), self.talent_filter.signature]),
+            self.config.get('page_cache_days', 3)
+        )
+        self.page_key = None
+        self.cached_pages = 0
+        # 从开始处理列表到第一位待邀约达人的耗时（秒）
+        self.run_started = None
+        self.first_new_talent = None
 
         # 设置日志
         self._setup_logging()
@@ -39,94 +87,110 @@ class WechatStoreInviteBot:
         # 初始化浏览器
         self.driver = None
         self.clicker = None
+        self.card_extractor = None
+        self.network_cards = None
+        # list_mode 为 scroll 时边滚动边读取卡片（无限滚动/虚拟列表）
+        self.card_stream = None
+        # 每页采样浏览器内存，超过阈值时重建浏览器
+        self.browser_monitor = BrowserMonitor(self.config)
+        # 按类型统计 WebDriver 命令的次数和耗时（driver_stats 为 false 时不统计）
+        self.command_stats = DriverCommandStats() if self.config.get('driver_stats', False) else None
+
+        # 运行断点（--resume 时从这里恢复）
+        self.checkpoint = RunCheckpoint(
+            self.config.get('checkpoint_file', '/tmp/auto_invite_bot/checkpoint.json')
+        )
+        self.current_page = 1
+
+        # 每一步的耗时事件（timeline_file 为空时不记录）
+        self.timeline = RunTimeline(
+            self.config.get('timeline_file'),
+            self.config.get('timeline_format', 'jsonl'),
+            self.record_manager.run_id
+        )
+        self.current_talent_id = None
+
+        # 流程各步骤的选择器（按范围查找，启动时编译一次）
+        self.selectors = SelectorRegistry(self.config)
+        self.step_waits = load_step_waits(self.config)
+        # 当前正在邀约的达人卡片，"详情"按钮只在这张卡片内查找
+        self.current_card = None
+
+        # 详情页打开方式：back=当前页跳转后后退；tab=新标签页打开，列表页保持不动
+        self.detail_navigation = self.config.get('detail_navigation', 'back')
+        self.detail_url_template = self.config.get('detail_url_template', '')
+        self.listing_handle = None
+        self.detail_handle = None
+        self.nav_counts = {"listing_reloads": 0, "detail_tabs": 0}
+
+        # 已处理过的列表指纹 -> 页码，翻页后回到旧页时停止；翻页耗时（秒）
+        self.seen_pages = {}
+        self.page_turn_latencies = []
 
     def _setup_logging(self):
         """设置日志"""
         log_file = self.config.get('log_file', 'bot.log')
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        self.log_handlers = [
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+        for handler in self.log_handlers:
+            handler.setFormatter(formatter)
+
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        self.log_listener = None
+        if self.background_io:
+            # 主线程只把日志放进队列，由后台线程格式化并写文件和控制台
+            self.queue_handler, self.log_listener = start_log_listener(
+                self.log_handlers, self.config.get('io_queue_size', 1000)
+            )
+            root.addHandler(self.queue_handler)
+        else:
+            for handler in self.log_handlers:
+                root.addHandler(handler)
         self.logger = logging.getLogger(__name__)
 
+    def _stop_logging(self):
+        """写完队列中的日志并停止后台线程，之后的日志直接写出"""
+        if not self.log_listener:
+            return
+        self.log_listener.stop()
+        self.log_listener = None
+        root = logging.getLogger()
+        root.removeHandler(self.queue_handler)
+        for handler in self.log_handlers:
+            root.addHandler(handler)
+
     def init_browser(self):
         """初始化浏览器"""
-        chrome_options = Options()
-
-        # 是否无头模式
-        if self.config.get('headless', False):
-            chrome_options.add_argument('--headless')
-
-        # 获取系统Chrome用户数据目录
-        import platform
-        import os
-        import getpass
-
-        system = platform.system()
-        username = getpass.getuser()
-
-        if system == 'Windows':
-            user_data_dir = f"C:\\Users\\{username}\\AppData\\Local\\Google\\Chrome\\User Data"
-        elif system == 'Darwin':  # Mac
-            user_data_dir = f"/Users/{username}/Library/Application Support/Google/Chrome"
-        else:  # Linux
-            user_data_dir = f"/home/{username}/.config/google-chrome"
-
-        # 使用系统Chrome的用户数据目录，共享登录状态、Cookie、缓存等
-        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
-        chrome_options.add_argument('--profile-directory=Default')
-
-        # ⭐ 增强反检测措施 - 让浏览器看起来像真人操作
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-
-        # 移除Chrome正在受到自动测试软件控制的提示
-        chrome_options.add_argument('--disable-infobars')
-
-        # 模拟真实浏览器的启动参数
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-
-        # ⭐ 使用真实的用户代理字符串
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-
-        # ⭐ 添加更多真实浏览器的参数
-        chrome_options.add_argument('--start-maximized')  # 最大化窗口
-        chrome_options.add_argument('--disable-extensions')  # 禁用扩展插件（可选）
-        chrome_options.add_argument('--disable-background-timer-throttling')
-        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-        chrome_options.add_argument('--disable-renderer-backgrounding')
-
-        # 禁用WebRTC（防止IP泄露）
-        chrome_options.add_argument('--disable-webrtc')
-
-        # 初始化驱动
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-
-        # ⭐ 移除webdriver属性（重要反检测措施）
-        self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-            'source': '''
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                })
-            '''
-        })
+        # Chrome 启动参数、chromedriver 路径缓存、连接已有会话均由 browser_factory 处理
+        self.driver = create_driver(self.config)
 
         # 设置页面加载超时
         self.driver.set_page_load_timeout(self.config.get('page_load_timeout', 30))
 
-        # 初始化点击器
+        # 初始化点击器；重建浏览器时沿用本次运行已有的统计
+        previous = (self.clicker, self.network_cards, self.card_stream)
         self.clicker = AutoClicker(self.driver, self.config)
+        self.card_extractor = CardExtractor(self.driver, self.config)
+        if self.config.get('card_source', 'dom') == 'network':
+            self.network_cards = NetworkCardSource(self.driver, self.config)
+        if self.config.get('list_mode', 'pages') == 'scroll':
+            self.card_stream = CardStream(self.card_extractor, self.clicker, self.config, self._wait_for_new_list)
+            if self.detail_navigation != 'tab' and not previous[0]:
+                self.logger.warning("滚动加载的列表建议 detail_navigation 设为 tab：后退会重新加载列表并回到顶部")
+        for old, new in zip(previous, (self.clicker, self.network_cards, self.card_stream)):
+            if old and new:
+                new.counts = old.counts
+        if previous[0]:
+            self.clicker.timing = previous[0].timing
+        self.browser_monitor.attach(self.driver)
+        if self.command_stats:
+            self.command_stats.attach(self.driver)
 
         self.logger.info("浏览器初始化成功")
 
@@ -134,166 +198,538 @@ class WechatStoreInviteBot:
         """导航到达人广场页面"""
         self.logger.info(f"正在导航到达人广场: {url}")
         self.driver.get(url)
-        time.sleep(2)
 
-    def invite_single_talent(self, talent_name: str, talent_id: str) -> bool:
-        """邀约单个达人"""
-        self.logger.info(f"开始邀约达人: {talent_name}")
+        # 等到第一张达人卡片出现，而不是固定等待
+        card_selector = self.card_extractor.card_selector
+        if self.clicker.wait_for_element(By.CSS_SELECTOR, card_selector) is None:
+            self.logger.warning("页面中没有等到达人卡片")
+
+    def _step_spec(self, step: str) -> dict:
+        """步骤的定位规则；card 范围的步骤限定在当前达人卡片内"""
+        card_scope = None
+        if self.current_card is not None and self.selectors.scopes[step] == 'card':
+            card_scope = self.card_extractor.card_scope(self.current_card)
+        return self.selectors.spec(step, card_scope)
+
+    def _click_step(self, step: str, record: bool = True) -> bool:
+        """点击流程中的某一步（选择器和范围见 page_selectors.py，可在 config.json 中覆盖）
+
+        record 为 False 时不计入选择器统计和时间线（重建浏览器后翻回当前页）
+        """
+        wait = self.step_waits[step]
+        start = time.time()
+        ok = self.clicker.click_scoped(self._step_spec(step), step_description(step), **wait)
+        if not record:
+            return ok
+        self.selectors.record(step, self.clicker.last_click.get("selector"))
+        self.timeline.event(step, "step", start, time.time() - start,
+                            page=self.current_page, talent=self.current_talent_id,
+                            **self.clicker.last_click)
+        return ok
+
+    def _detail_url(self, talent: dict) -> Optional[str]:
+        """达人详情页地址：优先使用卡片字段 detail_url，其次按 detail_url_template 拼接"""
+        url = talent.get('detail_url')
+        if not url and self.detail_url_template:
+            try:
+                url = self.detail_url_template.format(**talent)
+            except (KeyError, IndexError) as e:
+                self.logger.warning(f"detail_url_template 缺少字段 {e}")
+                return None
+        return url or None
+
+    def _open_details(self, detail_url: Optional[str] = None, new_tab: bool = False) -> bool:
+        """打开达人详情页
+
+        tab 模式下在新标签页中打开详情，邀约结束后关闭标签页切回列表，列表页不会重新加载；
+        没有详情地址时点击详情按钮，若页面自己打开了新窗口则切过去，否则退回后退模式。
+        new_tab 为 True 时（重试队列）不论哪种模式，有详情地址就在新标签页中打开。
+        """
+        if self.detail_navigation != 'tab' and not (new_tab and detail_url):
+            return self._click_step("details")
+
+        self.listing_handle = self.driver.current_window_handle
+        if detail_url:
+            start = time.time()
+            # 相对地址按列表页地址解析
+            detail_url = urljoin(self.driver.current_url, detail_url)
+            self.driver.switch_to.new_window('tab')
+            self.detail_handle = self.driver.current_window_handle
+            self.nav_counts["detail_tabs"] += 1
+            self.driver.get(detail_url)
+            self.timeline.event("open_tab", "step", start, time.time() - start,
+                                page=self.current_page, talent=self.current_talent_id)
+            return True
 
-        try:
-            # 1. 点击详情按钮，跳转到达人详情页
-            if not self.clicker.click_by_xpath(
-                "//button[contains(text(), '详情')]",
-                "详情按钮"
-            ):
-                self.logger.error(f"点击详情按钮失败: {talent_name}")
-                return False
+        handles_before = set(self.driver.window_handles)
+        if not self._click_step("details"):
+            return False
+        opened = [h for h in self.driver.window_handles if h not in handles_before]
+        if opened:
+            self.driver.switch_to.window(opened[0])
+            self.detail_handle = opened[0]
+            self.nav_counts["detail_tabs"] += 1
+        return True
+
+    def _back_to_square(self, delay: bool = False):
+        """回到达人广场，计入时间线
+
+        详情在新标签页中打开时关闭该标签页并切回列表；否则浏览器后退，列表页会重新加载。
+        """
+        start = time.time()
+        if self.detail_handle:
+            if self.driver.current_window_handle == self.detail_handle:
+                self.driver.close()
+            self.driver.switch_to.window(self.listing_handle)
+            self.detail_handle = None
+            name = "close_tab"
+        else:
+            self.driver.back()
+            self.nav_counts["listing_reloads"] += 1
+            name = "back"
+        if delay:
+            self.clicker.human_like_delay()
+        self.timeline.event(name, "step", start, time.time() - start,
+                            page=self.current_page, talent=self.current_talent_id)
 
-            # 2. 点击"邀请带货"按钮
-            if not self.clicker.click_by_xpath(
-                "//button[contains(text(), '邀请带货')]",
-                "邀请带货按钮"
-            ):
-                self.logger.error(f"点击邀请带货按钮失败: {talent_name}")
-                self.driver.back()
-                return False
+    def _invite_failed(self, talent_name: str, talent_id: str, detail_url: Optional[str],
+                       step: str, error: Optional[Exception] = None) -> bool:
+        """记录一次邀约失败：临时失败放进重试队列，永久失败（或重试次数用完）不再重试；总是返回 False"""
+        self.record_manager.add_record(talent_id, talent_name, "failed")
 
-            # 3. 点击"添加上次邀约商品"
-            if not self.clicker.click_by_xpath(
-                "//button[contains(text(), '添加上次邀约商品')]",
-                "添加上次邀约商品"
-            ):
-                self.logger.error(f"点击添加上次邀约商品失败: {talent_name}")
-                # 尝试返回达人详情页
-                self.driver.back()
-                return False
+        reason = f"{step_description(step)}: {error}" if error else f"{step_description(step)}失败"
+        permanent = step in self.permanent_failure_steps or (
+            error is not None and not isinstance(error, WebDriverException)
+        )
+        if permanent:
+            self.retry_queue.drop(talent_id, permanent=True)
+            self.logger.info(f"永久失败，不再重试: {talent_name} - {reason}")
+        elif self.retry_queue.defer(talent_id, talent_name, reason, detail_url, self.current_page):
+            entry = self.retry_queue.entries[talent_id]
+            self.logger.info(f"临时失败，第 {entry['attempts']} 次放入重试队列，"
+                             f"{entry['next_time'] - time.time():.0f}s 后重试: {talent_name} - {reason}")
+        else:
+            self.logger.info(f"已重试 {self.retry_queue.max_attempts} 次仍失败，不再重试: {talent_name}")
+        return False
+
+    def invite_single_talent(self, talent_name: str, talent_id: str,
+                             detail_url: Optional[str] = None, new_tab: bool = False) -> bool:
+        """邀约单个达人"""
+        self.logger.info(f"开始邀约达人: {talent_name}")
 
-            # 4. 点击确认按钮
-            if not self.clicker.click_by_xpath(
-                "//button[contains(text(), '确认')]",
-                "确认按钮"
-            ):
-                self.logger.error(f"点击确认按钮失败: {talent_name}")
-                self.driver.back()
-                return False
+        step = "details"
+        try:
+            # 1. 打开达人详情页（点击详情按钮，或 tab 模式下在新标签页中打开）
+            if not self._open_details(detail_url, new_tab):
+                self.logger.error(f"打开详情页失败: {talent_name}")
+                return self._invite_failed(talent_name, talent_id, detail_url, step)
 
-            # 5. 点击发送邀约
-            if not self.clicker.click_by_xpath(
-                "//button[contains(text(), '发送邀约')]",
-                "发送邀约按钮"
-            ):
-                self.logger.error(f"点击发送邀约失败: {talent_name}")
-                self.driver.back()
-                return False
+            # 2~5. 邀请带货 -> 添加上次邀约商品 -> 确认 -> 发送邀约
+            for step in INVITE_STEPS[1:]:
+                if not self._click_step(step):
+                    self.logger.error(f"点击{step_description(step)}失败: {talent_name}")
+                    self._back_to_square()
+                    return self._invite_failed(talent_name, talent_id, detail_url, step)
 
-            # 6. 关闭当前页面，返回达人广场
-            self.driver.back()
-            self.clicker.human_like_delay()
+            # 6. 关闭详情页，返回达人广场
+            self._back_to_square(delay=True)
 
             # 7. 记录邀约成功
             self.record_manager.add_record(talent_id, talent_name, "success")
-            self.logger.info(f"✓ 邀约成功: {talent_name}")
+            if self.retry_queue.drop(talent_id, recovered=True):
+                self.logger.info(f"✓ 重试邀约成功: {talent_name}")
+            else:
+                self.logger.info(f"✓ 邀约成功: {talent_name}")
 
             return True
 
         except Exception as e:
             self.logger.error(f"邀约过程中发生异常: {talent_name} - {str(e)}")
             # 尝试返回达人广场
-            self.driver.back()
-            self.clicker.human_like_delay()
-            self.record_manager.add_record(talent_id, talent_name, "failed")
-            return False
+            self._back_to_square(delay=True)
+            return self._invite_failed(talent_name, talent_id, detail_url, step, e)
+
+    def replay_retry_queue(self):
+        """运行结束时集中重试已到期、且有详情地址的达人（在新标签页中打开）；其余留到卡片再次出现时重试"""
+        due = [entry for entry in self.retry_queue.due() if entry.get('detail_url')]
+        if not due:
+            return
+        self.logger.info(f"重试队列中有 {len(due)} 位达人到了重试时间，开始集中重试")
+        self.current_card = None
+        for entry in due:
+            self.current_talent_id = entry['id']
+            try:
+                with self.timeline.span("retry", "talent", talent=entry['id'],
+                                        attempt=entry['attempts'] + 1) as event:
+                    event["ok"] = self.invite_single_talent(entry['name'], entry['id'],
+                                                            entry['detail_url'], new_tab=True)
+            except Exception as e:
+                self.logger.error(f"重试邀约失败: {entry['name']} - {str(e)}")
+
+    def _current_cards(self):
+        """当前页达人卡片：card_source 为 network 时优先读列表接口响应，没有匹配的响应再从 DOM 提取"""
+        if self.network_cards:
+            cards = self.network_cards.collect()
+            if cards is not None:
+                self.logger.info(f"从列表接口响应中读取到 {len(cards)} 位达人")
+                for card in cards:
+                    # 接口数据里的 ID 不一定出现在 DOM 中，滚动时按名称定位卡片
+                    card['handle'] = CardHandle(self.card_extractor, card['name'], by_name=True)
+                return cards
+            self.logger.info("没有匹配的列表接口响应，改为从页面提取")
+
+        # 一次脚本调用取回当前页所有达人卡片（选择器和字段映射见 config.json）
+        return self.card_extractor.extract()
+
+    def _filter_reason(self, card: dict) -> Optional[str]:
+        """达人不符合 talent_filters 时返回原因；先查跳过缓存，再按卡片信息判断"""
+        if not self.talent_filter:
+            return None
+        reason = self.skip_cache.get(card['id'])
+        if reason is None:
+            reason = self.talent_filter.check(card)
+            if reason:
+                self.skip_cache.add(card['id'], reason)
+        return reason
+
+    def _pending_talents(self, cards, tally: dict, defer_retries: bool = True):
+        """从卡片中逐个挑出待邀约的达人（生成器），跳过已邀约和不符合条件的；到了重试时间的达人排在最后
+
+        tally 累计 pending（待邀约）、filtered（按条件跳过）、waiting_retry（还在重试队列中、尚未到期）。
+        defer_retries 为 False 时到期的达人按出现顺序立即重试：滚动加载的列表读完时，
+        前面的卡片通常已经被虚拟列表移出页面，再滚动过去会找不到。
+        """
+        retries = []
+        for card in cards:
+            if self.record_manager.is_invited(card['id']):
+                if self.retry_queue.is_due(card['id']):
+                    if defer_retries:
+                        retries.append(card)
+                    else:
+                        tally["pending"] += 1
+                        yield card
+                elif card['id'] in self.retry_queue:
+                    tally["waiting_retry"] += 1
+                else:
+                    self.logger.info(f"跳过已邀约达人: {card['name']}")
+                continue
+            # 不符合条件的达人在打开详情页之前跳过
+            reason = self._filter_reason(card)
+            if reason:
+                self.logger.info(f"跳过不符合条件的达人: {card['name']} - {reason}")
+                tally["filtered"] += 1
+                continue
+            tally["pending"] += 1
+            yield card
+
+        # 临时失败、已到重试时间的达人排在本页最后集中重试
+        if retries:
+            self.logger.info(f"本页有 {len(retries)} 位达人到了重试时间，排在最后重试")
+            tally["pending"] += len(retries)
+            yield from retries
 
     def process_current_page(self) -> int:
         """处理当前页面的所有达人"""
         self.logger.info("开始处理当前页面的达人")
 
-        # 获取当前页面所有达人列表
-        # 注意：这里需要根据实际的页面结构调整XPath或CSS选择器
-        # 以下是示例代码，实际使用时需要调整
+        self.card_extractor.re_resolutions = 0
+        page_mark = self.command_stats.mark() if self.command_stats else None
+        # 本页待邀约、按条件跳过、还在重试队列中尚未到期的达人数（后者不为 0 的页不记入页面缓存）
+        tally = {"pending": 0, "filtered": 0, "waiting_retry": 0}
+        if self.card_stream:
+            # 滚动加载的列表：读到一批新卡片就开始邀约，邀约完再向下滚动
+            talents = self._pending_talents(self.card_stream.stream(), tally, defer_retries=False)
+        else:
+            try:
+                talents = list(self._pending_talents(self._current_cards(), tally))
+            except Exception as e:
+                self.logger.error(f"获取达人列表失败: {str(e)}")
+                return 0
 
-        talents = []
+        # 邀约每个达人；handled 为走完流程（且不在重试队列中）的达人数，等于 pending 时整页记入页面缓存
+        success_count = 0
+        handled = 0
         try:
-            # 假设每个达人项都有 class="talent-item"
-            talent_elements = self.driver.find_elements(By.CLASS_NAME, "talent-item")
-
-            for element in talent_elements:
+            for talent in talents:
+                # 滚动到达人卡片，确保元素可见（卡片元素过期时按达人 ID 重新定位）
                 try:
-                    # 获取达人名称（需要根据实际情况调整）
-                    name_element = element.find_element(By.CLASS_NAME, "talent-name")
-                    talent_name = name_element.text.strip()
-
-                    # 获取达人ID（可以从URL或data属性中获取）
-                    # 这里假设有一个data-id属性
-                    talent_id = element.get_attribute("data-id") or talent_name
-
-                    if not self.record_manager.is_invited(talent_id):
-                        talents.append({
-                            'name': talent_name,
-                            'id': talent_id,
-                            'element': element
-                        })
-                    else:
-                        self.logger.info(f"跳过已邀约达人: {talent_name}")
-
-                except NoSuchElementException:
+                    if not talent['handle'].scroll_into_view():
+                        self.logger.warning(f"当前页已找不到达人卡片: {talent['name']}")
+                        continue
+                    time.sleep(1)
+
+                    if self.first_new_talent is None:
+                        self.first_new_talent = time.time() - self.run_started
+                        self.timeline.event("first_new_talent", "run", self.run_started, self.first_new_talent,
+                                            page=self.current_page, cached_pages=self.cached_pages)
+                        self.logger.info(f"到达第一位待邀约达人耗时 {self.first_new_talent:.2f}s"
+                                         f"（页面缓存跳过 {self.cached_pages} 页）")
+
+                    # 滚到卡片后、打开详情页之前的列表位置，写入断点后 --resume 回到这位达人附近
+                    cursor = self._list_cursor()
+                    self.current_talent_id = talent['id']
+                    self.current_card = talent['handle']
+                    started = time.time()
+                    talent_mark = self.command_stats.mark() if self.command_stats else None
+                    with self.timeline.span("talent", "talent", page=self.current_page,
+                                            talent=talent['id']) as event:
+                        event["ok"] = self.invite_single_talent(talent['name'], talent['id'],
+                                                                self._detail_url(talent))
+                        if talent_mark:
+                            commands, command_time, by_type = self.command_stats.since(talent_mark)
+                            self.command_stats.per_talent.append(commands)
+                            event.update(commands=commands, command_s=round(command_time, 3),
+                                         command_types=by_type)
+                    self.browser_monitor.record_talent(time.time() - started)
+                    if event["ok"]:
+                        success_count += 1
+
+                    self.checkpoint.update(last_talent_id=talent['id'], last_talent_name=talent['name'],
+                                           cursor=cursor)
+                    if talent['id'] not in self.retry_queue:
+                        handled += 1
+
+                    # 每邀约完一个，休息一下
+                    time.sleep(2)
+
+                except Exception as e:
+                    self.logger.error(f"邀约达人失败: {talent['name']} - {str(e)}")
                     continue
-
         except Exception as e:
+            # 滚动加载时读取新卡片失败，已读到的达人都已处理
             self.logger.error(f"获取达人列表失败: {str(e)}")
-            return 0
-
-        # 邀约每个达人
-        success_count = 0
-        for talent in talents:
-            # 点击达人卡片，确保元素可见
-            try:
-                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", talent['element'])
-                time.sleep(1)
-
-                if self.invite_single_talent(talent['name'], talent['id']):
-                    success_count += 1
-
-                # 每邀约完一个，休息一下
-                time.sleep(2)
-
-            except Exception as e:
-                self.logger.error(f"邀约达人失败: {talent['name']} - {str(e)}")
-                continue
 
+        if self.talent_filter:
+            self.filtered_count += tally["filtered"]
+            self.skip_cache.save()
+            self.logger.info(f"第 {self.current_page} 页按条件跳过 {tally['filtered']} 位达人，"
+                             f"待邀约 {tally['pending']} 位")
+        if self.card_stream:
+            counts = self.card_stream.counts
+            self.logger.info(f"滚动 {counts['scrolls']} 次，读取到 {counts['yielded']} 位达人，"
+                             f"去掉重复卡片 {counts['duplicates']} 张")
+        self.logger.info(f"第 {self.current_page} 页卡片重新定位 {self.card_extractor.re_resolutions} 次")
+        if page_mark:
+            commands, command_time, by_type = self.command_stats.since(page_mark)
+            self.command_stats.per_page.append(commands)
+            most = sorted(by_type.items(), key=lambda item: -item[1])[:3]
+            self.logger.info(f"第 {self.current_page} 页 WebDriver 命令 {commands} 次，耗时 {command_time:.2f}s"
+                             + (f"（{'，'.join(f'{k} {v}' for k, v in most)}）" if most else ""))
+        if self.page_key and handled == tally["pending"] and not tally["waiting_retry"]:
+            self.page_cache.mark_done(self.page_key, self.current_page)
+            self.page_cache.save()
         return success_count
 
-    def has_next_page(self) -> bool:
-        """检查是否有下一页"""
+    def _page_already_done(self) -> bool:
+        """按当前页的达人 ID 列表查页面缓存，命中表示整页都已处理过"""
+        self.page_key = None
+        # 滚动加载的列表没有固定的"页"，不使用页面缓存
+        if not self.page_cache or self.card_stream:
+            return False
         try:
-            # 检查下一页按钮是否存在且可点击
-            next_button = self.driver.find_element(By.XPATH, "//button[contains(text(), '下一页')]")
-            return next_button.is_enabled()
-        except NoSuchElementException:
+            talent_ids = self.card_extractor.card_ids()
+        except Exception as e:
+            self.logger.warning(f"读取当前页达人 ID 失败，不使用页面缓存: {e}")
+            return False
+        if not talent_ids:
             return False
+        self.page_key = page_key(talent_ids)
+        invalidated = self.page_cache.invalidated
+        if self.page_cache.lookup(self.page_key, self.current_page):
+            return True
+        if self.page_cache.invalidated > invalidated:
+            self.logger.info(f"第 {self.current_page} 页的达人顺序已变化，"
+                             f"作废该页及之后的 {self.page_cache.invalidated - invalidated} 条页面缓存")
+        return False
 
-    def go_to_next_page(self) -> bool:
-        """翻到下一页"""
+    def has_next_page(self) -> bool:
+        """检查是否有下一页"""
+        # 在分页栏内查找下一页按钮并检查是否可用；不等待，最后一页不会空等
+        button = self.clicker.locate(self._step_spec("next_page"))
+        return button is not None and button.is_enabled()
+
+    def _wait_for_new_list(self, previous: str, timeout: float) -> Optional[str]:
+        """等待列表指纹变化，返回新指纹；超时返回 None"""
+        if self.clicker.wait_strategy == 'observer':
+            return self.clicker.wait_for_signal({
+                "type": "fingerprint",
+                "selector": self.card_extractor.card_selector,
+                "field": list(self.card_extractor.fingerprint_field),
+                "previous": previous,
+            }, timeout)
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            current = self.card_extractor.fingerprint()
+            if current not in (previous, EMPTY_FINGERPRINT):
+                return current
+            time.sleep(0.5)
+        return None
+
+    def go_to_next_page(self, replay: bool = False) -> bool:
+        """翻到下一页
+
+        点击前记下列表指纹（卡片数、第一张和最后一张卡片的 ID），点击后等到指纹变化为止；
+        指纹不变（仍是同一页）或回到已处理过的页时返回 False，避免重复处理。
+        replay 为 True 时是回到断点或重建浏览器后重放翻页，不计入翻页耗时、时间线和选择器统计。
+        """
         self.logger.info("正在翻到下一页...")
 
         try:
-            if not self.clicker.click_by_xpath(
-                "//button[contains(text(), '下一页')]",
-                "下一页按钮"
-            ):
+            previous = self.card_extractor.fingerprint()
+            self.seen_pages.setdefault(previous, self.current_page)
+
+            start = time.time()
+            if not self._click_step("next_page", record=not replay):
                 return False
+            # 不计点击后的随机延迟
+            click_delay = self.clicker.last_click.get("delay", 0)
 
-            # 等待页面加载
-            time.sleep(2)
-            self.logger.info("翻页成功")
+            current = self._wait_for_new_list(previous, self.step_waits["next_page"]["timeout"])
+            latency = time.time() - start - click_delay
+            if not current:
+                self.logger.warning(f"翻页后达人列表没有变化（等待 {latency:.2f}s），仍是同一页")
+                return False
+            if current in self.seen_pages:
+                self.logger.warning(f"翻页后回到了已处理的第 {self.seen_pages[current]} 页")
+                return False
+
+            if not replay:
+                self.page_turn_latencies.append(latency)
+                self.timeline.event("page_turn", "step", start, latency, page=self.current_page)
+            self.logger.info(f"翻页成功，耗时 {latency:.2f}s")
             return True
 
         except Exception as e:
             self.logger.error(f"翻页失败: {str(e)}")
             return False
 
-    def run(self, start_url: str, max_pages: int = None):
-        """运行机器人"""
+    def log_timing_report(self):
+        """输出本次运行等待与操作耗时"""
+        if not self.clicker:
+            return
+        report = self.clicker.timing_report()
+        self.logger.info(
+            f"耗时统计: 等待 {report['wait']:.1f}s / 操作 {report['action']:.1f}s / "
+            f"随机延迟 {report['delay']:.1f}s（等待占比 {report['wait_ratio']:.0%}）"
+        )
+        self.logger.info(
+            f"点击 {report['clicks']} 次，失败 {report['failed_clicks']} 次，"
+            f"重试 {report['retries']} 次，等待超时 {report['wait_timeouts']} 次"
+        )
+        if self.page_turn_latencies:
+            self.logger.info(
+                f"翻页 {len(self.page_turn_latencies)} 次，耗时 p50 {percentile(self.page_turn_latencies, 50):.2f}s / "
+                f"p95 {percentile(self.page_turn_latencies, 95):.2f}s / 最长 {max(self.page_turn_latencies):.2f}s"
+            )
+        if self.page_cache:
+            first = f"{self.first_new_talent:.2f}s" if self.first_new_talent is not None else "没有待邀约达人"
+            self.logger.info(
+                f"页面缓存命中 {self.cached_pages} 页、作废 {self.page_cache.invalidated} 条，"
+                f"到达第一位待邀约达人耗时 {first}"
+            )
+        retry = self.retry_queue.counts
+        self.logger.info(
+            f"重试队列: 本次重试 {retry['retried']} 次，重试成功 {retry['recovered']} 位，"
+            f"转为永久失败 {retry['gave_up']} 位，队列中还有 {len(self.retry_queue)} 位"
+        )
+        if self.talent_filter:
+            by_rule = "，".join(f"{rule} {count} 位" for rule, count in self.talent_filter.counts.items() if count)
+            self.logger.info(
+                f"按条件跳过 {self.filtered_count} 位达人（其中 {self.skip_cache.hits} 位来自跳过缓存）"
+                + (f"：{by_rule}" if by_rule else "")
+            )
+        monitor = self.browser_monitor
+        if monitor.samples:
+            self.logger.info(f"浏览器重建 {len(monitor.recycles)} 次"
+                             + "".join(f"，第 {r['page']} 页（{r['reason']}）" for r in monitor.recycles))
+            for line in monitor.report():
+                self.logger.info(line)
+        if self.command_stats:
+            for line in self.command_stats.report():
+                self.logger.info(line)
+        self.logger.info(
+            f"详情页打开方式 {self.detail_navigation}: 新标签页 {self.nav_counts['detail_tabs']} 个，"
+            f"后退重新加载列表 {self.nav_counts['listing_reloads']} 次，"
+            f"过期元素重试 {report['stale_retries']} 次"
+        )
+
+    def _list_cursor(self) -> dict:
+        """当前列表位置：页面 URL（可能带分页参数）和滚动位置"""
+        return {
+            "url": self.driver.current_url,
+            "scroll_y": self.driver.execute_script("return window.pageYOffset;") or 0,
+        }
+
+    def resume_from_checkpoint(self, start_url: str, saved: dict) -> int:
+        """回到断点所在页，返回页码"""
+        page = saved.get("page", 1)
+        cursor = saved.get("cursor") or {}
+        self.record_manager.run_id = saved.get("run_id", self.record_manager.run_id)
+        self.timeline.run_id = self.record_manager.run_id
+        self.logger.info(
+            f"从断点恢复: 运行 {saved.get('run_id')}，第 {page} 页，"
+            f"上次处理到 {saved.get('last_talent_name') or '（页首）'}"
+        )
+
+        return self._return_to_page(start_url, page, cursor)
+
+    def _return_to_page(self, start_url: str, page: int, cursor: dict) -> int:
+        """打开第 page 页并恢复滚动位置，返回实际到达的页码"""
+        if cursor.get("url") and cursor["url"] != start_url:
+            # URL 里带有分页游标，直接打开
+            self.navigate_to_talent_square(cursor["url"])
+        else:
+            # 只能从第一页翻过去：只点下一页，不提取卡片；翻过的页本来就处理过，不按"回到已处理的页"停止。
+            # 重放的点击也不计入点击器的等待、操作耗时和点击次数
+            self.navigate_to_talent_square(start_url)
+            seen_pages, self.seen_pages = self.seen_pages, {}
+            timing, counts = dict(self.clicker.timing), dict(self.clicker.counts)
+            try:
+                for skipped in range(1, page):
+                    if not self.has_next_page() or not self.go_to_next_page(replay=True):
+                        self.logger.warning(f"翻页到第 {page} 页失败，从第 {skipped} 页继续")
+                        return skipped
+            finally:
+                self.seen_pages = seen_pages
+                # 原地恢复：重建浏览器后的新点击器与之前的点击器共用这两个字典
+                self.clicker.timing.update(timing)
+                self.clicker.counts.update(counts)
+
+        if cursor.get("scroll_y"):
+            self.driver.execute_script("window.scrollTo(0, arguments[0]);", cursor["scroll_y"])
+        return page
+
+    def _check_browser(self, start_url: str, page: int) -> int:
+        """一页处理完后采样浏览器内存；超过阈值时关闭并重建浏览器、回到当前页，返回继续处理的页码"""
+        sample = self.browser_monitor.sample(page)
+        self.timeline.event("browser_sample", "browser", sample["time"], 0, page=page,
+                            generation=sample["generation"], driver_mb=sample["driver_mb"],
+                            chrome_mb=sample["chrome_mb"], talent_p50=sample["talent_p50"])
+        reason = self.browser_monitor.recycle_reason(sample)
+        if not reason:
+            return page
+
+        self.logger.info(f"{reason}，重建浏览器后回到第 {page} 页")
+        cursor = self._list_cursor()
+        start = time.time()
+        shutdown_driver(self.driver, self.config)
+        self.driver = None
+        self.init_browser()
+        reached = self._return_to_page(start_url, page, cursor)
+        duration = time.time() - start
+        self.browser_monitor.recycles.append({"page": page, "reason": reason, "duration": duration})
+        self.timeline.event("browser_recycle", "browser", start, duration, page=page, reason=reason)
+        self.logger.info(f"浏览器已重建，耗时 {duration:.2f}s")
+        return reached
+
+    def run(self, start_url: str, max_pages: int = None, resume: bool = False):
+        """运行机器人；配置了 profile 时在性能分析器中运行，结束后写出分析文件"""
+        with profile_run(self.config.get('profile'), self.config.get('profile_file'), self.logger,
+                         self.config.get('profile_interval', 0.005)):
+            self._run(start_url, max_pages, resume)
+
+    def _run(self, start_url: str, max_pages: int = None, resume: bool = False):
         self.logger.info("="*50)
         self.logger.info("微信小店达人广场邀约机器人启动")
         self.logger.info("="*50)
@@ -302,35 +738,57 @@ class WechatStoreInviteBot:
             # 初始化浏览器
             self.init_browser()
 
-            # 导航到达人广场
-            self.navigate_to_talent_square(start_url)
+            # 导航到达人广场（--resume 时直接回到断点所在页）
+            saved = self.checkpoint.load() if resume else None
+            if saved and saved.get("start_url") == start_url:
+                current_page = self.resume_from_checkpoint(start_url, saved)
+                self.checkpoint.update(page=current_page, cursor=self._list_cursor())
+            else:
+                if resume:
+                    self.logger.info("没有可恢复的断点，从第一页开始")
+                self.navigate_to_talent_square(start_url)
+                current_page = 1
+                self.checkpoint.start(self.record_manager.run_id, start_url)
 
             # 显示初始统计
             self.record_manager.print_statistics()
-
-            # 当前页码
-            current_page = 1
+            self.run_started = time.time()
 
             # 处理每一页
             while True:
-                self.logger.info(f"\n{'='*50}")
-                self.logger.info(f"正在处理第 {current_page} 页")
-                self.logger.info(f"{'='*50}\n")
-
-                # 处理当前页面的所有达人
-                self.process_current_page()
-
-                # 更新统计
-                self.record_manager.print_statistics()
+                self.current_page = current_page
+                if self._page_already_done():
+                    # 整页都已处理过：不提取卡片、不输出统计，直接翻页
+                    self.cached_pages += 1
+                    self.logger.info(f"第 {current_page} 页的达人都已处理过（页面缓存），直接翻页")
+                    # 游标也要换成这一页的，否则 --resume 会打开上一页的地址当作这一页
+                    self.checkpoint.update(page=current_page, cursor=self._list_cursor())
+                else:
+                    self.logger.info(f"\n{'='*50}")
+                    self.logger.info(f"正在处理第 {current_page} 页")
+                    self.logger.info(f"{'='*50}\n")
+                    self.record_manager.start_page(current_page)
+                    self.checkpoint.update(page=current_page, cursor=self._list_cursor())
+
+                    # 处理当前页面的所有达人
+                    self.process_current_page()
+
+                    # 更新统计
+                    self.record_manager.print_statistics()
+
+                # 内存或页数超过阈值时重建浏览器，回到当前页继续
+                current_page = self._check_browser(start_url, current_page)
 
                 # 检查是否还有下一页
                 if not self.has_next_page():
                     self.logger.info("已到达最后一页，结束邀约")
+                    self.checkpoint.finish()
                     break
 
                 # 检查是否达到最大页数限制
                 if max_pages and current_page >= max_pages:
                     self.logger.info(f"已达到最大页数限制 {max_pages}，结束邀约")
+                    self.checkpoint.finish()
                     break
 
                 # 翻到下一页
@@ -340,25 +798,42 @@ class WechatStoreInviteBot:
 
                 current_page += 1
 
+            # 集中重试本次和之前运行中临时失败、已到期的达人
+            self.replay_retry_queue()
+
             # 最终统计
             self.logger.info("\n" + "="*50)
             self.logger.info("邀约完成！最终统计：")
             self.logger.info("="*50)
             self.record_manager.print_statistics()
+            self.log_timing_report()
 
         except KeyboardInterrupt:
             self.logger.info("\n用户中断，正在停止...")
             self.record_manager.print_statistics()
+            self.log_timing_report()
 
         except Exception as e:
             self.logger.error(f"运行过程中发生错误: {str(e)}", exc_info=True)
 
         finally:
+            self.skip_cache.save()
+            self.page_cache.save()
+            self.selectors.save()
+            self.timeline.close()
+
             # 关闭浏览器
             if self.driver:
-                self.driver.quit()
+                shutdown_driver(self.driver, self.config)
                 self.logger.info("浏览器已关闭")
 
+            try:
+                # 关闭记录存储（有记录最终没能写入时抛出异常）
+                self.record_manager.close()
+            finally:
+                # 写完后台队列中的日志
+                self._stop_logging()
+
 
 def main():
     """主函数"""
@@ -368,9 +843,15 @@ def main():
     # 最大处理页数（None表示不限制）
     MAX_PAGES = None
 
+    parser = argparse.ArgumentParser(description="微信小店达人广场自动邀约机器人")
+    parser.add_argument('--resume', action='store_true', help='从上次中断的页面继续')
+    parser.add_argument('--max-pages', type=int, default=MAX_PAGES, help='最大处理页数')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    args = parser.parse_args()
+
     # 创建并运行机器人
-    bot = WechatStoreInviteBot()
-    bot.run(START_URL, MAX_PAGES)
+    bot = WechatStoreInviteBot(args.config)
+    bot.run(START_URL, args.max_pages, resume=args.resume)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟达人广场
+
+用 assets/达人广场源代码.txt 的页面外壳（去掉外部脚本和样式）拼出分页的达人列表、
+达人详情页、邀约弹窗按钮和"下一页"按钮，不依赖线上微信小店即可跑通 WechatStoreInviteBot.run。
+
+用法：
+    python3 mock_server.py --pages 5 --talents 20 --port 8765 [--latency-ms 50] [--failure-rate 0.1]
+然后把 START_URL 指向 http://127.0.0.1:8765/shop/findersquare/find
+
+--client-render 时列表页和线上一样由前端请求 /api/findersquare/talent/list 拿到 JSON 后渲染卡片，
+用于测试 card_source = "network"；--infinite-scroll N 时列表页没有分页栏，滚动到底部附近时
+按页请求列表接口追加卡片，DOM 中最多保留 N 张（虚拟列表），用于测试 list_mode = "scroll"；--fixture 可指定接口数据文件（每页一个达人数组）：
+    [[{"finderUsername": "...", "nickname": "..."}, ...], ...]
+"""
+
+import argparse
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'assets', '达人广场源代码.txt')
+
+LISTING_PATH = '/shop/findersquare/find'
+LISTING_API_PATH = '/api/findersquare/talent/list'
+
+# 卡片上的类目、粉丝数和带货等级（按达人序号轮换），用于测试 talent_filters
+CATEGORIES = ["美妆", "服饰", "食品", "母婴", "数码"]
+SALES_TIERS = ["暂无", "1万-5万", "5万-10万", "10万+"]
+
+# 由列表接口数据生成一张卡片
+RENDER_CARD_JS = """
+function renderCard(item) {{
+  const card = document.createElement('div');
+  card.className = 'talent-item';
+  card.dataset.id = item.finderUsername;
+  card.innerHTML = '<span class="talent-name"></span><span class="talent-category"></span>' +
+    '<span class="talent-fans"></span><span class="talent-sales"></span><button type="button">详情</button>';
+  card.querySelector('.talent-name').textContent = item.nickname;
+  card.querySelector('.talent-category').textContent = item.category;
+  card.querySelector('.talent-fans').textContent = item.fansText;
+  card.querySelector('.talent-sales').textContent = item.salesTier;
+  card.querySelector('button').onclick = function () {{
+    location.href = '/detail/' + encodeURIComponent(item.finderUsername);
+  }};
+  return card;
+}}
+"""
+
+# 前端渲染的列表页：请求列表接口后生成卡片
+CLIENT_RENDER_JS = "<script>" + RENDER_CARD_JS + """
+fetch('{api}?page={page}').then(function (res) {{ return res.json(); }}).then(function (res) {{
+  const list = document.querySelector('.talent-list');
+  for (const item of res.data.list) {{ list.appendChild(renderCard(item)); }}
+}});
+</script>
+"""
+
+# 无限滚动 + 虚拟列表：滚动到底部附近时请求下一批，DOM 中最多保留 {window} 张卡片，
+# 滚出去的卡片被移除，用顶部留白保持滚动位置
+INFINITE_SCROLL_JS = "<script>" + RENDER_CARD_JS + """
+(function () {{
+  const list = document.querySelector('.talent-list');
+  let page = 0, loading = false, done = false, spacer = 0;
+  function load() {{
+    if (loading || done) {{ return; }}
+    loading = true;
+    page += 1;
+    fetch('{api}?page=' + page).then(function (res) {{ return res.json(); }}).then(function (res) {{
+      for (const item of res.data.list) {{ list.appendChild(renderCard(item)); }}
+      while (list.children.length > {window}) {{
+        spacer += list.firstElementChild.offsetHeight;
+        list.removeChild(list.firstElementChild);
+      }}
+      list.style.paddingTop = spacer + 'px';
+      done = !res.data.hasMore;
+      loading = false;
+      nearBottom();
+    }});
+  }}
+  // 页面还不够高（滚动不会触发加载）时继续加载
+  function nearBottom() {{
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 300) {{ load(); }}
+  }}
+  window.addEventListener('scroll', nearBottom);
+  load();
+}})();
+</script>
+<style>.talent-item {{ height: 80px; }}</style>
+"""
+
+# 详情页的邀约流程：邀请带货 -> 添加上次邀约商品 -> 确认 -> 发送邀约，每一步点击后才渲染下一步按钮
+DETAIL_BODY = """
+<div class="talent-detail" data-id="{talent_id}">
+  <h2 class="talent-name">{name}</h2>
+  <button type="button" class="weui-desktop-btn weui-desktop-btn_primary" onclick="mockNext('add')">邀请带货</button>
+  <div class="weui-desktop-dialog invite-dialog" style="display:none;">
+    <button type="button" id="step-add" class="weui-desktop-btn" style="display:none;" onclick="mockNext('confirm')">添加上次邀约商品</button>
+    <button type="button" id="step-confirm" class="weui-desktop-btn" style="display:none;" onclick="mockNext('send')">确认</button>
+    <button type="button" id="step-send" class="weui-desktop-btn weui-desktop-btn_primary" style="display:none;" onclick="mockSend()">发送邀约</button>
+    <p class="invite-result"></p>
+  </div>
+</div>
+<script>
+const RENDER_DELAY = {render_delay};
+const BROKEN_STEP = {broken_step};
+function mockNext(step) {{
+  document.querySelector('.invite-dialog').style.display = 'block';
+  if (step === BROKEN_STEP) {{ return; }}
+  setTimeout(function () {{
+    document.getElementById('step-' + step).style.display = 'inline-block';
+  }}, RENDER_DELAY);
+}}
+function mockSend() {{
+  fetch('/api/invite?id={talent_id}', {{method: 'POST'}}).then(function () {{
+    document.querySelector('.invite-result').textContent = '邀约已发送';
+  }});
+}}
+</script>
+"""
+
+
+def _load_shell(snapshot_path: str):
+    """读取页面快照，去掉外部脚本/样式，返回 (内容插入点之前, 之后) 两段 HTML"""
+    with open(snapshot_path, 'r', encoding='utf-8') as f:
+        page = f.read()
+    page = re.sub(r'<script\b[^>]*\bsrc=[^>]*>\s*</script>', '', page)
+    page = re.sub(r'<link\b[^>]*rel="stylesheet"[^>]*>', '', page)
+
+    marker = '<div class="content-wrapper">'
+    index = page.find(marker)
+    if index < 0:
+        index = page.find('<div id="app">')
+        marker = '<div id="app">'
+    if index < 0:
+        return '<!DOCTYPE html><html><body>', '</body></html>'
+    index += len(marker)
+    return page[:index], page[index:]
+
+
+class MockSquare:
+    """模拟达人广场的数据和计数"""
+
+    def __init__(self, pages: int = 5, talents_per_page: int = 20, latency_ms: float = 0,
+                 render_delay_ms: float = 100, failure_rate: float = 0.0,
+                 snapshot_path: str = DEFAULT_SNAPSHOT, seed: Optional[int] = None,
+                 client_render: bool = False, fixture: Optional[List[List[Dict]]] = None,
+                 scroll_window: int = 0):
+        self.pages = len(fixture) if fixture else pages
+        self.talents_per_page = talents_per_page
+        self.client_render = client_render
+        self.scroll_window = scroll_window
+        self.fixture = fixture
+        self.latency_ms = latency_ms
+        self.render_delay_ms = render_delay_ms
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.shell_head, self.shell_tail = _load_shell(snapshot_path)
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {"requests": 0, "listing": 0, "api": 0, "detail": 0, "invites": 0}
+        self.invited: Dict[str, int] = {}
+        self.names = {talent["id"]: talent["name"]
+                      for page in range(1, self.pages + 1) for talent in self.page_talents(page)}
+
+    def talent(self, page: int, index: int) -> Dict:
+        talent_id = f"finder_{page:04d}_{index:03d}"
+        serial = (page - 1) * self.talents_per_page + index
+        return {"id": talent_id, "name": f"模拟达人{page}-{index}",
+                "category": CATEGORIES[serial % len(CATEGORIES)],
+                "fans": f"{(serial * 7919 % 500 + 1) / 10:g}万",
+                "sales_tier": SALES_TIERS[serial % len(SALES_TIERS)]}
+
+    def page_talents(self, page: int) -> List[Dict]:
+        """第 page 页的达人：[{id, name, category, fans, sales_tier}]"""
+        if self.fixture:
+            return [{"id": item["finderUsername"], "name": item["nickname"],
+                     "category": item.get("category", ""), "fans": item.get("fansText", ""),
+                     "sales_tier": item.get("salesTier", "")}
+                    for item in self.fixture[page - 1]]
+        return [self.talent(page, index) for index in range(self.talents_per_page)]
+
+    def listing_api(self, page: int) -> Dict:
+        """列表接口响应"""
+        return {
+            "errcode": 0,
+            "data": {
+                "list": [{"finderUsername": t["id"], "nickname": t["name"], "category": t["category"],
+                          "fansText": t["fans"], "salesTier": t["sales_tier"]}
+                         for t in self.page_talents(page)],
+                "page": page,
+                "hasMore": page < self.pages,
+            },
+        }
+
+    def count(self, key: str):
+        with self.lock:
+            self.counters[key] += 1
+
+    def wrap(self, body: str) -> str:
+        return self.shell_head + body + self.shell_tail
+
+    def listing_html(self, page: int) -> str:
+        if self.scroll_window:
+            script = INFINITE_SCROLL_JS.format(api=LISTING_API_PATH, window=self.scroll_window)
+            return self.wrap(f'<div class="talent-list" data-page="1"></div>{script}')
+        cards = []
+        for talent in ([] if self.client_render else self.page_talents(page)):
+            cards.append(
+                f'<div class="talent-item" data-id="{talent["id"]}">'
+                f'<span class="talent-name">{html.escape(talent["name"])}</span>'
+                f'<span class="talent-category">{html.escape(talent["category"])}</span>'
+                f'<span class="talent-fans">{html.escape(talent["fans"])}</span>'
+                f'<span class="talent-sales">{html.escape(talent["sales_tier"])}</span>'
+                f'<button type="button" onclick="location.href=\'/detail/{talent["id"]}\'">详情</button>'
+                f'</div>'
+            )
+        disabled = ' disabled' if page >= self.pages else ''
+        pager = (f'<div class="pager"><span class="page-current">{page}</span>'
+                 f'<button type="button"{disabled} onclick="location.href=\'{LISTING_PATH}?page={page + 1}\'">'
+                 f'下一页</button></div>')
+        script = CLIENT_RENDER_JS.format(api=LISTING_API_PATH, page=page) if self.client_render else ''
+        return self.wrap(f'<div class="talent-list" data-page="{page}">{"".join(cards)}</div>{pager}{script}')
+
+    def detail_html(self, talent_id: str) -> str:
+        broken = '"send"' if self.random.random() < self.failure_rate else 'null'
+        name = self.names.get(talent_id, talent_id)
+        return self.wrap(DETAIL_BODY.format(
+            talent_id=html.escape(talent_id), name=html.escape(name),
+            render_delay=int(self.render_delay_ms), broken_step=broken,
+        ))
+
+    def record_invite(self, talent_id: str):
+        with self.lock:
+            self.counters["invites"] += 1
+            self.invited[talent_id] = self.invited.get(talent_id, 0) + 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {**self.counters, "unique_invited": len(self.invited),
+                    "duplicate_invites": sum(c - 1 for c in self.invited.values())}
+
+
+def _make_handler(square: MockSquare):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self):
+            square.count("requests")
+            if square.latency_ms:
+                time.sleep(square.latency_ms / 1000)
+
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == LISTING_PATH:
+                square.count("listing")
+                page = max(1, min(square.pages, int(query.get('page', ['1'])[0])))
+                self._send(200, square.listing_html(page))
+            elif url.path == LISTING_API_PATH:
+                square.count("api")
+                page = max(1, min(square.pages, int(query.get('page', ['1'])[0])))
+                self._send(200, json.dumps(square.listing_api(page), ensure_ascii=False),
+                           'application/json; charset=utf-8')
+            elif url.path.startswith('/detail/'):
+                square.count("detail")
+                self._send(200, square.detail_html(unquote(url.path[len('/detail/'):])))
+            elif url.path == '/api/invite':
+                square.record_invite(query.get('id', [''])[0])
+                self._send(200, '{"code": 0}', 'application/json')
+            elif url.path == '/api/stats':
+                self._send(200, json.dumps(square.stats(), ensure_ascii=False), 'application/json')
+            else:
+                self._send(404, 'not found', 'text/plain; charset=utf-8')
+
+        do_GET = _handle
+        do_POST = _handle
+
+    return Handler
+
+
+def start_mock_server(square: MockSquare, host: str = '127.0.0.1', port: int = 0):
+    """在后台线程启动服务，返回 (server, 列表页 URL)；port=0 时自动分配端口"""
+    server = ThreadingHTTPServer((host, port), _make_handler(square))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}{LISTING_PATH}"
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="本地模拟达人广场")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--talents', type=int, default=20, help='每页达人数')
+    parser.add_argument('--latency-ms', type=float, default=0, help='每个请求的额外延迟')
+    parser.add_argument('--render-delay-ms', type=float, default=100, help='弹窗按钮的渲染延迟')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='发送邀约按钮不出现的概率')
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT)
+    parser.add_argument('--client-render', action='store_true', help='由前端请求列表接口渲染卡片')
+    parser.add_argument('--infinite-scroll', type=int, default=0, metavar='N',
+                        help='无限滚动列表，DOM 中最多保留 N 张卡片')
+    parser.add_argument('--fixture', help='列表接口数据文件，每页一个达人数组')
+    args = parser.parse_args()
+
+    fixture = None
+    if args.fixture:
+        with open(args.fixture, 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+
+    square = MockSquare(args.pages, args.talents, args.latency_ms, args.render_delay_ms,
+                        args.failure_rate, args.snapshot, client_render=args.client_render,
+                        fixture=fixture, scroll_window=args.infinite_scroll)
+    server, url = start_mock_server(square, args.host, args.port)
+    print(f"模拟达人广场已启动: {url}")
+    print("按 Ctrl+C 停止")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n统计: {square.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从页面自身的列表接口响应中读取达人卡片
+
+达人广场的卡片由前端请求列表接口拿到 JSON 后渲染。card_source = "network" 时，
+Chrome 开启 performance 日志（goog:loggingPrefs），这里从日志中找出匹配 listing_api.url_pattern
+的响应，用 CDP Network.getResponseBody 取回 JSON，直接解析出达人 ID 和名称；
+没有匹配的响应时返回 None，由调用方退回 DOM 提取。
+
+config.json 中的 listing_api：
+    "url_pattern": "findersquare.*list"     接口 URL 的正则
+    "items_path": "data.list"               响应 JSON 中达人数组的路径（. 分隔，数字表示下标）
+    "fields": {"id": "finderUsername", "name": "nickname"}   达人对象中的字段路径
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_LISTING_API = {
+    "url_pattern": "findersquare.*list",
+    "items_path": "data.list",
+    "fields": {
+        "id": "finderUsername",
+        "name": "nickname",
+    },
+}
+
+
+def dig(data: Any, path: str) -> Any:
+    """按 "a.b.0.c" 取出嵌套字段，路径不存在时返回 None"""
+    for key in filter(None, path.split('.')):
+        if isinstance(data, list) and key.isdigit():
+            index = int(key)
+            data = data[index] if index < len(data) else None
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+def parse_listing(payload: Any, items_path: str, fields: Dict[str, str]) -> Optional[List[Dict]]:
+    """从列表接口响应中解析达人：[{index, id, name, ...}]；找不到达人数组时返回 None"""
+    items = dig(payload, items_path)
+    if not isinstance(items, list):
+        return None
+
+    talents = []
+    for index, item in enumerate(items):
+        card = {key: dig(item, path) for key, path in fields.items()}
+        name = str(card.get('name') or '').strip()
+        if not name:
+            continue
+        card['index'] = index
+        card['name'] = name
+        card['id'] = str(card.get('id') or name)
+        talents.append(card)
+    return talents
+
+
+class NetworkCardSource:
+    """读取列表接口响应的达人卡片来源"""
+
+    def __init__(self, driver, config: dict):
+        self.driver = driver
+        listing_api = {**DEFAULT_LISTING_API, **config.get('listing_api', {})}
+        self.url_pattern = re.compile(listing_api['url_pattern'])
+        self.items_path = listing_api['items_path']
+        self.fields = listing_api['fields']
+
+        # 解析成功 / 退回 DOM 提取的次数
+        self.counts = {"network": 0, "fallback": 0}
+
+    def _listing_responses(self) -> List[str]:
+        """读出自上次调用以来的 performance 日志，返回匹配接口的请求 ID（新的在前）"""
+        request_ids = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') != 'Network.responseReceived':
+                continue
+            params = message.get('params', {})
+            response = params.get('response', {})
+            if self.url_pattern.search(response.get('url', '')) and 'json' in response.get('mimeType', ''):
+                request_ids.append(params['requestId'])
+        return request_ids[::-1]
+
+    def collect(self) -> Optional[List[Dict]]:
+        """返回最近一次列表接口响应中的达人；没有可用的响应时返回 None"""
+        from selenium.common.exceptions import WebDriverException
+
+        for request_id in self._listing_responses():
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                payload = json.loads(body.get('body') or 'null')
+            except (WebDriverException, ValueError):
+                # 响应所属的文档已卸载，或不是 JSON
+                continue
+            talents = parse_listing(payload, self.items_path, self.fields)
+            if talents is not None:
+                self.counts["network"] += 1
+                return talents
+
+        self.counts["fallback"] += 1
+        return None
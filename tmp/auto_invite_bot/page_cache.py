@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已处理完的列表页缓存
+
+长期运行的店铺，达人广场前面若干页的达人基本都邀约过了，每次运行仍要逐页提取卡片、逐个判断。
+这里记住"整页都已处理"的页：键为该页按顺序排列的全部达人 ID 的摘要，只需一次脚本调用取回 ID 列表
+即可判断，命中时直接翻页，不提取卡片、不输出统计。
+
+失效规则：
+- 键包含整页 ID 及其顺序，列表内容或排序有任何变化都不会命中
+- 某一页号的键与缓存中记录的不同，说明列表顺序已经变动，该页及之后各页的缓存全部作废
+- 邀约记录文件或筛选规则改变时整个缓存作废；超过 page_cache_days 天的条目也会作废
+"""
+
+import hashlib
+from typing import List, Optional
+
+from json_state import ExpiringCache
+
+
+def page_key(talent_ids: List[str]) -> str:
+    """一页达人 ID（按顺序）的摘要"""
+    return hashlib.sha1("\n".join(talent_ids).encode('utf-8')).hexdigest()[:20]
+
+
+class PageCache(ExpiringCache):
+    """整页都已处理的列表页：页面键 -> {page, time}"""
+
+    ENTRIES_KEY = "pages"
+    DESCRIPTION = "页面缓存"
+
+    def __init__(self, cache_file: Optional[str], signature: str, ttl_days: float = 3):
+        self.invalidated = 0
+        super().__init__(cache_file, signature, ttl_days)
+
+    def lookup(self, key: str, page: int) -> bool:
+        """该页是否已全部处理；未命中且同一页号记录过别的键时，按列表顺序变动处理"""
+        if key in self.entries:
+            self.hits += 1
+            return True
+        stale = [k for k, entry in self.entries.items() if entry['page'] >= page]
+        if any(self.entries[k]['page'] == page for k in stale):
+            for k in stale:
+                del self.entries[k]
+            self.invalidated += len(stale)
+            self.dirty = True
+        return False
+
+    def mark_done(self, key: str, page: int):
+        self.put(key, page=page)
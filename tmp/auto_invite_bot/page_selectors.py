@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+邀约流程各步骤使用的页面选择器
+
+每一步在自己的范围内查找按钮，而不是在整个文档中扫描所有按钮：
+- card：当前达人卡片（"详情"，避免点到其他卡片的详情按钮）
+- modal：最上层的可见弹窗（"添加上次邀约商品"、"确认"、"发送邀约"）
+- pager：分页栏（需要在 selector_scopes 中配置分页栏的选择器，默认不使用）
+- page：整个页面（详情页上的"邀请带货"、列表页的"下一页"）
+
+默认的范围选择器只保留在保存的页面快照（assets/达人广场源代码.txt）中确认存在的 modal；
+快照中没有分页栏，"下一页"默认仍在整个页面中查找。
+
+页面上没有可见的范围元素时，card、modal 范围的步骤直接找不到（不能点到别的卡片或弹窗外的按钮），
+只有 OPTIONAL_SCOPES 中的范围（pager）退回在整个页面中查找；
+可用 python3 dom_snapshot.py <快照> --check-scopes 检查范围选择器在保存的页面中是否存在。
+
+每一步可以有多个选择器变体，按顺序尝试；实际匹配到的变体会被记录（selector_stats_file），
+之后优先尝试匹配次数最多的变体。
+
+config.json 中可覆盖：
+    "step_selectors": {"confirm": [".//button[normalize-space()='确定']", ".//button[contains(., '确认')]"]}
+    "step_scopes": {"next_page": "pager"}
+    "selector_scopes": {"modal": ".weui-desktop-dialog", "pager": ".weui-desktop-pagination"}
+以 /、./ 或 ( 开头的视为 XPath，其余视为 CSS 选择器；非 page 范围中以 // 开头的 XPath 会改为相对于范围元素（.//）。
+"""
+
+from typing import Dict, List, Optional
+
+from json_state import load_json, save_json
+
+
+# 步骤 -> (范围, [选择器变体, ...], 描述)
+DEFAULT_STEP_SELECTORS = {
+    "details": ("card", [".//button[normalize-space()='详情']",
+                         ".//button[contains(., '详情')]",
+                         ".//a[contains(., '详情')]"], "详情按钮"),
+    "invite": ("page", ["//button[normalize-space()='邀请带货']",
+                        "//button[contains(., '邀请带货')]"], "邀请带货按钮"),
+    "add_last_products": ("modal", [".//button[contains(., '添加上次邀约商品')]"], "添加上次邀约商品"),
+    "confirm": ("modal", [".//button[normalize-space()='确认']",
+                          ".//button[contains(., '确认')]"], "确认按钮"),
+    "send_invite": ("modal", [".//button[normalize-space()='发送邀约']",
+                              ".//button[contains(., '发送邀约')]"], "发送邀约按钮"),
+    "next_page": ("page", ["//button[normalize-space()='下一页']",
+                           "//button[contains(., '下一页')]",
+                           "//a[contains(., '下一页')]"], "下一页按钮"),
+}
+
+# 范围 -> 范围元素的 CSS 选择器（card 为当前卡片，page 为整个页面；没有配置选择器的范围按整个页面查找）
+DEFAULT_SCOPES = {
+    "modal": ".weui-desktop-dialog",
+}
+
+# 范围元素不存在时可以退回整个页面查找的范围
+OPTIONAL_SCOPES = {"pager"}
+
+# 步骤 -> (等待超时秒数, 就绪条件)；就绪条件可选 clickable / visible / present
+DEFAULT_STEP_WAITS = {
+    "details": (10, "clickable"),
+    "invite": (10, "clickable"),
+    "add_last_products": (8, "clickable"),
+    "confirm": (5, "clickable"),
+    "send_invite": (5, "clickable"),
+    "next_page": (5, "clickable"),
+}
+
+# 邀约单个达人时依次点击的步骤
+INVITE_STEPS = ["details", "invite", "add_last_products", "confirm", "send_invite"]
+
+
+def is_xpath(selector: str) -> bool:
+    """以 / 、./ 或 ( 开头的视为 XPath，其余视为 CSS 选择器"""
+    return selector.startswith(('/', './', '('))
+
+
+def scoped_selector(selector: str, scope: str) -> str:
+    """非 page 范围中以 // 开头的 XPath 改为相对于范围元素"""
+    if scope != 'page' and selector.startswith('//'):
+        return '.' + selector
+    return selector
+
+
+def load_step_scopes(config: dict) -> Dict[str, str]:
+    """合并默认值与 config.json 中的 step_scopes，返回 步骤 -> 范围"""
+    overrides = config.get('step_scopes', {})
+    return {step: overrides.get(step, scope) for step, (scope, _, _) in DEFAULT_STEP_SELECTORS.items()}
+
+
+def load_step_selectors(config: dict) -> Dict[str, List[str]]:
+    """合并默认值与 config.json 中的 step_selectors，返回 步骤 -> [选择器变体, ...]（可以只写一个字符串）"""
+    overrides = config.get('step_selectors', {})
+    scopes = load_step_scopes(config)
+    selectors = {}
+    for step, (_, variants, _) in DEFAULT_STEP_SELECTORS.items():
+        override = overrides.get(step, variants)
+        if isinstance(override, str):
+            override = [override]
+        selectors[step] = [scoped_selector(selector, scopes[step]) for selector in override]
+    return selectors
+
+
+def load_scope_selectors(config: dict) -> Dict[str, str]:
+    """合并默认值与 config.json 中的 selector_scopes"""
+    return {**DEFAULT_SCOPES, **config.get('selector_scopes', {})}
+
+
+def step_description(step: str) -> str:
+    """步骤的中文描述"""
+    return DEFAULT_STEP_SELECTORS[step][2]
+
+
+def load_step_waits(config: dict) -> Dict[str, Dict]:
+    """合并默认值与 config.json 中的 step_waits，返回 步骤 -> {timeout, condition}"""
+    overrides = config.get('step_waits', {})
+    waits = {}
+    for step, (timeout, condition) in DEFAULT_STEP_WAITS.items():
+        override = overrides.get(step, {})
+        waits[step] = {
+            "timeout": override.get("timeout", timeout),
+            "condition": override.get("condition", condition),
+        }
+    return waits
+
+
+class SelectorRegistry:
+    """启动时编译好的各步骤定位规则，按变体的匹配次数排序"""
+
+    def __init__(self, config: dict):
+        self.scopes = load_step_scopes(config)
+        scope_selectors = load_scope_selectors(config)
+        self.steps = {}
+        for step, variants in load_step_selectors(config).items():
+            scope = self.scopes[step]
+            self.steps[step] = {
+                "scope": scope_selectors.get(scope) if scope not in ('card', 'page') else None,
+                "scope_optional": scope in OPTIONAL_SCOPES,
+                "variants": [['xpath' if is_xpath(selector) else 'css', selector] for selector in variants],
+            }
+
+        # 步骤 -> 选择器 -> 匹配次数，跨运行保存
+        self.stats_file = config.get('selector_stats_file')
+        self.hits: Dict[str, Dict[str, int]] = {step: {} for step in self.steps}
+        self.dirty = False
+        self._load()
+        for step in self.steps:
+            self._reorder(step)
+
+    def _load(self):
+        saved = load_json(self.stats_file, "选择器统计") or {}
+        for step, hits in saved.items():
+            if step in self.hits:
+                self.hits[step] = {selector: count for selector, count in hits.items()}
+
+    def _reorder(self, step: str):
+        # sorted 是稳定排序，匹配次数相同时保持配置中的顺序
+        hits = self.hits[step]
+        self.steps[step]["variants"].sort(key=lambda variant: -hits.get(variant[1], 0))
+
+    def spec(self, step: str, card_scope: Optional[Dict] = None) -> Dict:
+        """步骤的定位规则 {scope, root, scope_optional, variants}；card 范围的步骤由调用方给出卡片的 scope（CSS）或 root（元素）"""
+        spec = {"scope": self.steps[step]["scope"], "root": None,
+                "scope_optional": self.steps[step]["scope_optional"], "variants": self.steps[step]["variants"]}
+        if self.scopes[step] == 'card' and card_scope:
+            spec.update(card_scope)
+        return spec
+
+    def record(self, step: str, selector: Optional[str]):
+        """记录匹配到的变体；顺序有变化时下次优先尝试它"""
+        if not selector:
+            return
+        hits = self.hits[step]
+        hits[selector] = hits.get(selector, 0) + 1
+        self.dirty = True
+        if self.steps[step]["variants"][0][1] != selector:
+            self._reorder(step)
+
+    def save(self):
+        """有改动时写临时文件后原子替换"""
+        if not self.stats_file or not self.dirty:
+            return
+        if save_json(self.stats_file, self.hits, "选择器统计", indent=2):
+            self.dirty = False
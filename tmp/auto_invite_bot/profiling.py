@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行剖析：WebDriver 命令计数与 Python 性能分析
+
+- DriverCommandStats：包装 driver.command_executor.execute，每个 WebDriver HTTP 命令
+  （findElement、getElementText、w3cExecuteScript、clickElement ...）按类型统计次数和耗时，
+  并可按达人、按页取区间增量；元素方法同样经由 command_executor 发出，都会被统计
+- profile_run：在 cProfile 或采样分析器中执行 run()，结束后写出分析文件
+
+config.json：
+    "driver_stats": true                         统计 WebDriver 命令
+    "profile": ""                                "cprofile" / "sampling"，为空时不做性能分析
+    "profile_file": "/tmp/auto_invite_bot/run.prof"
+    "profile_interval": 0.005                    采样分析器的采样间隔（秒）
+
+cProfile 的结果可用 python3 -m pstats run.prof 或 snakeviz 查看；采样分析器写出折叠栈格式
+（每行 "函数;函数;函数 次数"），可直接拖进 speedscope，或用 flamegraph.pl 生成火焰图。
+采样分析器只对主线程定时取栈，开销与调用次数无关，适合长时间运行。
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from timeline import percentile
+
+
+class DriverCommandStats:
+    """按类型统计 WebDriver 命令的次数和耗时"""
+
+    def __init__(self):
+        # 命令类型 -> [次数, 总耗时（秒）]
+        self.commands: Dict[str, List] = {}
+        self.total = 0
+        self.elapsed = 0.0
+        # 每位达人、每页的命令数
+        self.per_talent: List[int] = []
+        self.per_page: List[int] = []
+
+    def attach(self, driver):
+        """包装 driver 的 command_executor（重建浏览器后对新 driver 再调用一次）"""
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def timed_execute(command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(command, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                entry = self.commands.setdefault(command, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+                self.total += 1
+                self.elapsed += elapsed
+
+        executor.execute = timed_execute
+
+    def mark(self) -> Tuple[int, float, Dict[str, int]]:
+        """当前累计值，配合 since 计算区间内的命令数和耗时"""
+        return self.total, self.elapsed, {command: entry[0] for command, entry in self.commands.items()}
+
+    def since(self, mark: Tuple[int, float, Dict[str, int]]) -> Tuple[int, float, Dict[str, int]]:
+        """mark 之后的 (命令数, 耗时, 命令类型 -> 次数)"""
+        by_type = {command: entry[0] - mark[2].get(command, 0) for command, entry in self.commands.items()}
+        return self.total - mark[0], self.elapsed - mark[1], {k: v for k, v in by_type.items() if v}
+
+    def top(self, n: int = 8, by: str = "count") -> List[Tuple[str, int, float]]:
+        """按次数（count）或总耗时（time）排序的前 n 种命令：[(命令, 次数, 总耗时)]"""
+        index = 0 if by == "count" else 1
+        ranked = sorted(self.commands.items(), key=lambda item: -item[1][index])
+        return [(command, count, seconds) for command, (count, seconds) in ranked[:n]]
+
+    def report(self, n: int = 8) -> List[str]:
+        """运行结束时的汇总"""
+        if not self.total:
+            return []
+        lines = [f"WebDriver 命令 {self.total} 次，耗时 {self.elapsed:.1f}s"]
+        if self.per_talent:
+            lines[0] += (f"；每位达人 p50 {percentile(self.per_talent, 50):.0f} 次 / "
+                         f"p95 {percentile(self.per_talent, 95):.0f} 次 / 最多 {max(self.per_talent)} 次")
+        if self.per_page:
+            lines[0] += f"；每页平均 {sum(self.per_page) / len(self.per_page):.0f} 次"
+        lines.append("按次数: " + "，".join(f"{command} {count}" for command, count, _ in self.top(n, "count")))
+        lines.append("按耗时: " + "，".join(f"{command} {seconds:.2f}s（{count} 次）"
+                                           for command, count, seconds in self.top(n, "time")))
+        return lines
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """后台线程按固定间隔对指定线程取栈，统计折叠栈出现的次数"""
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """采样时正在执行（栈顶）次数最多的函数"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+    def write(self, path: str):
+        """写出折叠栈格式"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_run(mode: Optional[str], path: Optional[str], logger, interval: float = 0.005, top: int = 10):
+    """在 cProfile（mode="cprofile"）或采样分析器（mode="sampling"）中执行代码块，结束后写出 path 并输出热点"""
+    if mode not in ("cprofile", "sampling") or not path:
+        if mode:
+            logger.warning(f"不支持的 profile 配置: {mode}（可选 cprofile / sampling，并需要 profile_file）")
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+    try:
+        yield
+    finally:
+        if mode == "cprofile":
+            profiler.disable()
+            profiler.dump_stats(path)
+            # (文件, 行号, 函数) -> (原始调用次数, 调用次数, 自身耗时, 累计耗时, 调用方)
+            stats = pstats.Stats(profiler).stats
+            logger.info(f"cProfile 结果已写入 {path}，累计耗时最多的函数:")
+            for (filename, line, name), (_, calls, _, cumulative, _) in sorted(
+                    stats.items(), key=lambda item: -item[1][3])[:top]:
+                logger.info(f"  {cumulative:>8.2f}s  {calls:>8} 次  {name} ({os.path.basename(filename)}:{line})")
+        else:
+            profiler.stop()
+            profiler.write(path)
+            logger.info(f"采样分析结果已写入 {path}（{profiler.samples} 个样本），栈顶出现最多的函数:")
+            for name, count in profiler.top(top):
+                logger.info(f"  {count / max(1, profiler.samples):>6.1%}  {name}")
@@ -1,81 +1,138 @@
-import json
-import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Optional, Tuple
+
+from io_worker import BackgroundRecordStore
+from record_store import create_store
+
+
+def _empty_counter() -> Dict:
+    return {"attempts": 0, "success": 0, "failed": 0}
 
 
 class RecordManager:
     """邀约记录管理器"""
 
-    def __init__(self, record_file: str):
+    def __init__(self, record_file: str, backend: str = "json", background: bool = False,
+                 queue_size: int = 1000):
         self.record_file = record_file
-        self.records: Dict[str, List[Dict]] = {}
-        self._load_records()
-
-    def _load_records(self):
-        """加载记录文件"""
-        if os.path.exists(self.record_file):
-            try:
-                with open(self.record_file, 'r', encoding='utf-8') as f:
-                    self.records = json.load(f)
-            except Exception as e:
-                print(f"加载记录文件失败: {e}")
-                self.records = {}
-        else:
-            self.records = {}
-
-    def _save_records(self):
-        """保存记录到文件"""
-        try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.record_file), exist_ok=True)
-            with open(self.record_file, 'w', encoding='utf-8') as f:
-                json.dump(self.records, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存记录文件失败: {e}")
+        self.store = create_store(backend, record_file)
+
+        # 历史汇总只在启动时完整统计一次，之后由 add_record 增量维护
+        self._totals = self.store.statistics()
+
+        # background=True 时写入由后台线程分组提交，add_record 不等待磁盘
+        if background:
+            self.store = BackgroundRecordStore(self.store, queue_size)
+
+        # 本次运行 / 当前页 / 每小时的邀约次数
+        self.run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        self.current_page: Optional[int] = None
+        self._run_counter = _empty_counter()
+        self._page_counter = _empty_counter()
+        self._hour_counters: Dict[str, Dict] = {}
+
+    @property
+    def records(self) -> Dict:
+        """兼容旧代码：达人ID -> 邀约记录列表"""
+        return self.store.get_all()
 
     def is_invited(self, talent_id: str) -> bool:
         """检查达人是否已邀约"""
-        return talent_id in self.records
+        return self.store.contains(talent_id)
 
-    def add_record(self, talent_id: str, talent_name: str, status: str = "success"):
-        """添加邀约记录"""
-        if talent_id not in self.records:
-            self.records[talent_id] = []
+    def start_page(self, page: int):
+        """开始处理新的一页，重置当前页统计"""
+        self.current_page = page
+        self._page_counter = _empty_counter()
 
+    def _update_counters(self, previous: Optional[str], status: str, time_str: str):
+        """根据达人之前的汇总状态增量更新各项计数"""
+        if previous is None:
+            self._totals["total"] += 1
+            self._totals["success" if status == "success" else "failed"] += 1
+        elif previous != "success" and status == "success":
+            # 之前失败、重试成功
+            self._totals["failed"] -= 1
+            self._totals["success"] += 1
+
+        hour = time_str[:13]
+        hour_counter = self._hour_counters.setdefault(hour, _empty_counter())
+        result = "success" if status == "success" else "failed"
+        for counter in (self._run_counter, self._page_counter, hour_counter):
+            counter["attempts"] += 1
+            counter[result] += 1
+
+    def add_record(self, talent_id: str, talent_name: str, status: str = "success"):
+        """添加邀约记录；同步写入失败时抛出异常（后台写入时由后台线程重试）"""
         record = {
             "name": talent_name,
             "status": status,
             "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        self.records[talent_id].append(record)
-        self._save_records()
+        previous = self.store.talent_status(talent_id)
+        self.store.append(talent_id, record)
+        self._update_counters(previous, status, record["time"])
+
+    def add_records(self, entries: Iterable[Tuple[str, str, str]]):
+        """批量添加邀约记录，entries 为 (达人ID, 达人名称, 状态) 序列"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        batch = []
+        changes = []
+        # 同一批次内的先后记录也要正确累计
+        batch_status: Dict[str, str] = {}
+        for talent_id, talent_name, status in entries:
+            if talent_id in batch_status:
+                previous = batch_status[talent_id]
+            else:
+                previous = self.store.talent_status(talent_id)
+            changes.append((previous, status))
+            batch_status[talent_id] = "success" if status == "success" or previous == "success" else "failed"
+            batch.append((talent_id, {"name": talent_name, "status": status, "time": now}))
+
+        # 写入成功后再计数
+        self.store.append_many(batch)
+        for previous, status in changes:
+            self._update_counters(previous, status, now)
 
     def get_statistics(self) -> Dict:
         """获取统计信息"""
-        total = len(self.records)
-        success = sum(1 for records in self.records.values()
-                     if any(r["status"] == "success" for r in records))
-        failed = total - success
+        return dict(self._totals)
+
+    def recompute_statistics(self) -> Dict:
+        """从存储完整重新统计（用于校验增量计数）"""
+        return self.store.statistics()
 
+    def get_run_statistics(self) -> Dict:
+        """获取本次运行、当前页和每小时的邀约次数"""
         return {
-            "total": total,
-            "success": success,
-            "failed": failed
+            "run_id": self.run_id,
+            "run": dict(self._run_counter),
+            "page": dict(self._page_counter),
+            "hours": {hour: dict(counter) for hour, counter in self._hour_counters.items()}
         }
 
     def get_all_records(self) -> Dict:
         """获取所有记录"""
-        return self.records
+        return self.store.get_all()
+
+    def close(self):
+        """关闭存储后端（后台写入时先写完队列中的记录）"""
+        self.store.close()
 
     def print_statistics(self):
         """打印统计信息"""
         stats = self.get_statistics()
+        run = self._run_counter
+        page = self._page_counter
         print("\n" + "="*50)
         print("邀约统计")
         print("="*50)
         print(f"总计邀约: {stats['total']} 人")
         print(f"成功: {stats['success']} 人")
         print(f"失败: {stats['failed']} 人")
+        print("-"*50)
+        print(f"本次运行: {run['attempts']} 次（成功 {run['success']}，失败 {run['failed']}）")
+        if self.current_page is not None:
+            print(f"第 {self.current_page} 页: {page['attempts']} 次（成功 {page['success']}，失败 {page['failed']}）")
         print("="*50)
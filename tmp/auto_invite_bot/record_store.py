@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+邀约记录存储后端
+
+- json:  兼容旧格式，每次写入重写整个 invite_records.json
+- jsonl: 追加式日志，每条邀约只追加一行，启动时回放建立内存索引，定期压缩
+- sqlite: SQLite 数据库（WAL 模式），索引查询是否已邀约，统计由聚合 SQL 完成
+- indexed: 与 jsonl 相同的追加式日志 + 紧凑哈希索引（talent_index.py），启动时只读入索引，
+           完整历史在需要报表时才回放，适合数百万位达人的历史
+
+迁移旧记录（流式读取，文件被截断时保留所有完整的达人）：
+    python3 record_store.py migrate /tmp/auto_invite_bot/invite_records.json --to sqlite
+检查旧记录文件是否完整：
+    python3 record_store.py check /tmp/auto_invite_bot/invite_records.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from legacy_reader import LegacyRecordReader, convert_legacy_to_log
+from talent_index import CompactTalentIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_parent_dir(path: str):
+    """确保文件所在目录存在"""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+def load_legacy_json(record_file: str) -> Dict[str, List[Dict]]:
+    """读取旧格式 invite_records.json（流式解析，文件不完整时返回所有完整的达人）"""
+    reader = LegacyRecordReader(record_file)
+    records = dict(reader)
+    if not reader.complete:
+        print(reader.report())
+    return records
+
+
+def _backup_file(path: str) -> str:
+    """把文件复制一份 .corrupt-时间戳 备份，返回备份路径"""
+    backup = f"{path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    shutil.copy2(path, backup)
+    return backup
+
+
+def _history_status(history: List[Dict]) -> str:
+    """达人的汇总状态：有一次成功即为 success"""
+    return "success" if any(r["status"] == "success" for r in history) else "failed"
+
+
+def _count_statistics(records: Dict[str, List[Dict]]) -> Dict:
+    """在内存记录上统计总数、成功和失败人数"""
+    total = len(records)
+    success = sum(1 for history in records.values()
+                  if any(r["status"] == "success" for r in history))
+    return {
+        "total": total,
+        "success": success,
+        "failed": total - success
+    }
+
+
+def _iter_log(log_file: str, offset: int = 0) -> Iterator[Optional[Tuple[str, List[Dict]]]]:
+    """从字节偏移 offset 起逐行读取追加式日志，产出 (达人ID, 记录列表)；损坏的行产出 None"""
+    with open(log_file, 'rb') as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.strip():
+                continue
+            try:
+                entry = json.loads(raw.decode('utf-8'))
+                talent_id = entry.pop('id')
+            except (ValueError, KeyError, AttributeError):
+                # 通常是崩溃时写了一半的最后一行
+                yield None
+                continue
+            yield talent_id, entry['records'] if 'records' in entry else [entry]
+
+
+class JsonRecordStore:
+    """整文件 JSON 存储（旧格式）"""
+
+    def __init__(self, record_file: str):
+        self.record_file = record_file
+        self.records: Dict[str, List[Dict]] = {}
+        self._load_records()
+
+    def _load_records(self):
+        """加载记录文件
+
+        文件不完整时保留所有完整的达人，并先备份原文件，之后的整文件重写不会丢掉损坏部分之后的历史。
+        文件无法读取时直接抛出异常，而不是以空记录继续运行、再把历史覆盖掉。
+        """
+        if not os.path.exists(self.record_file):
+            self.records = {}
+            return
+
+        reader = LegacyRecordReader(self.record_file)
+        self.records = dict(reader)
+        if not reader.complete:
+            print(f"加载记录文件不完整: {reader.report()}")
+            print(f"原文件已备份到: {_backup_file(self.record_file)}")
+
+    def _save_records(self):
+        """写临时文件后原子替换；写入失败时抛出异常，原文件保持不变"""
+        _ensure_parent_dir(self.record_file)
+        tmp_file = self.record_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.record_file)
+
+    def contains(self, talent_id: str) -> bool:
+        return talent_id in self.records
+
+    def append(self, talent_id: str, record: Dict):
+        self.append_many([(talent_id, record)])
+
+    def append_many(self, entries: Iterable[Tuple[str, Dict]]):
+        """写入失败时撤回内存中的改动并抛出异常，调用方可以原样重试"""
+        added = []
+        for talent_id, record in entries:
+            self.records.setdefault(talent_id, []).append(record)
+            added.append(talent_id)
+        try:
+            self._save_records()
+        except Exception:
+            for talent_id in reversed(added):
+                history = self.records[talent_id]
+                history.pop()
+                if not history:
+                    del self.records[talent_id]
+            raise
+
+    def statistics(self) -> Dict:
+        return _count_statistics(self.records)
+
+    def talent_status(self, talent_id: str) -> Optional[str]:
+        history = self.records.get(talent_id)
+        return _history_status(history) if history else None
+
+    def get_all(self) -> Dict[str, List[Dict]]:
+        return self.records
+
+    def close(self):
+        pass
+
+
+class AppendLogRecordStore:
+    """追加式日志存储
+
+    日志文件每行一个 JSON 对象，两种行格式：
+      {"id": "达人ID", "name": ..., "status": ..., "time": ...}   单次邀约
+      {"id": "达人ID", "records": [...]}                        压缩后的整段历史
+
+    只有被取代的行（同一达人的多行，压缩后合成一行）超过 compact_threshold 行、且日志行数超过达人数的两倍时才压缩，
+    新达人的追加不会触发整份日志的重写。
+    """
+
+    def __init__(self, record_file: str, compact_threshold: int = 1000):
+        self.record_file = record_file
+        self.log_file = os.path.splitext(record_file)[0] + '.jsonl'
+        self.compact_threshold = compact_threshold
+        self.records: Dict[str, List[Dict]] = {}
+        self._line_count = 0
+        # 压缩失败后，行数到达这里之前不再尝试
+        self._compact_after = 0
+        self._handle = None
+        self._load()
+
+    def _load(self):
+        """回放日志；日志不存在时导入旧格式 JSON
+
+        导入失败时直接抛出异常：以空记录继续运行的话，第一次追加就会创建日志，之后的启动不再导入旧文件。
+        """
+        if os.path.exists(self.log_file):
+            corrupt = self._replay()
+            if corrupt or self._should_compact():
+                if corrupt:
+                    print(f"记录日志中有 {corrupt} 行损坏，已在压缩时丢弃")
+                self.compact()
+        elif os.path.exists(self.record_file):
+            reader = convert_legacy_to_log(self.record_file, self.log_file)
+            print(f"已从 {self.record_file} 导入 {reader.count} 位达人的记录")
+            if not reader.complete:
+                print(reader.report())
+            self._replay()
+
+    def _replay(self) -> int:
+        """逐行回放日志，返回损坏的行数"""
+        corrupt = 0
+        for item in _iter_log(self.log_file):
+            self._line_count += 1
+            if item is None:
+                corrupt += 1
+                continue
+            talent_id, records = item
+            self.records.setdefault(talent_id, []).extend(records)
+        return corrupt
+
+    def _open(self):
+        if self._handle is None:
+            _ensure_parent_dir(self.log_file)
+            self._handle = open(self.log_file, 'a', encoding='utf-8')
+        return self._handle
+
+    def contains(self, talent_id: str) -> bool:
+        return talent_id in self.records
+
+    def append(self, talent_id: str, record: Dict):
+        self.append_many([(talent_id, record)])
+
+    def append_many(self, entries: Iterable[Tuple[str, Dict]]):
+        """先写日志再更新内存；写入失败时抛出异常，调用方可以原样重试"""
+        entries = list(entries)
+        handle = self._open()
+        handle.write(''.join(json.dumps({"id": talent_id, **record}, ensure_ascii=False) + "\n"
+                             for talent_id, record in entries))
+        handle.flush()
+
+        for talent_id, record in entries:
+            self.records.setdefault(talent_id, []).append(record)
+        self._line_count += len(entries)
+        if self._should_compact():
+            self.compact()
+
+    def _should_compact(self) -> bool:
+        """被取代的行足够多时才值得重写整份日志"""
+        superseded = self._line_count - len(self.records)
+        return (superseded >= self.compact_threshold and self._line_count > len(self.records) * 2
+                and self._line_count >= self._compact_after)
+
+    def statistics(self) -> Dict:
+        return _count_statistics(self.records)
+
+    def talent_status(self, talent_id: str) -> Optional[str]:
+        history = self.records.get(talent_id)
+        return _history_status(history) if history else None
+
+    def compact(self):
+        """把日志重写为每位达人一行，写临时文件后原子替换"""
+        self.close()
+        tmp_file = self.log_file + '.tmp'
+        try:
+            _ensure_parent_dir(self.log_file)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for talent_id, history in self.records.items():
+                    f.write(json.dumps({"id": talent_id, "records": history}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.log_file)
+            self._line_count = len(self.records)
+        except Exception as e:
+            # 压缩失败不影响已写入的日志，再追加 compact_threshold 行后重试
+            self._compact_after = self._line_count + self.compact_threshold
+            logger.warning(f"压缩记录日志失败: {e}")
+
+    def get_all(self) -> Dict[str, List[Dict]]:
+        return self.records
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class SqliteRecordStore:
+    """SQLite 存储
+
+    talents 表每位达人一行（主键即达人ID），attempts 表记录每次邀约。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS talents (
+            talent_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            success INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_time TEXT
+        );
+        CREATE TABLE IF NOT EXISTS attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            talent_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            time TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_attempts_talent ON attempts(talent_id);
+    """
+
+    UPSERT_TALENT = """
+        INSERT INTO talents (talent_id, name, success, attempts, last_time)
+        VALUES (?, ?, ?, 1, ?)
+        ON CONFLICT(talent_id) DO UPDATE SET
+            name = excluded.name,
+            success = MAX(talents.success, excluded.success),
+            attempts = talents.attempts + 1,
+            last_time = excluded.last_time
+    """
+
+    INSERT_ATTEMPT = "INSERT INTO attempts (talent_id, name, status, time) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, record_file: str):
+        self.record_file = record_file
+        self.db_file = os.path.splitext(record_file)[0] + '.db'
+        _ensure_parent_dir(self.db_file)
+        # 允许由 io_worker 的后台线程写入（调用方负责串行访问）
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        if self._is_empty() and os.path.exists(record_file):
+            # 在一个事务中导入，失败时回滚并抛出异常，数据库保持为空，下次启动重新导入
+            reader = LegacyRecordReader(record_file)
+            try:
+                self._insert_many(_iter_legacy_entries(reader))
+            except Exception:
+                self.conn.close()
+                raise
+            print(f"已从 {record_file} 导入 {reader.count} 位达人的记录")
+            if not reader.complete:
+                print(reader.report())
+
+    def _is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM talents LIMIT 1").fetchone() is None
+
+    def contains(self, talent_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM talents WHERE talent_id = ?", (talent_id,)
+        ).fetchone()
+        return row is not None
+
+    def append(self, talent_id: str, record: Dict):
+        self.append_many([(talent_id, record)])
+
+    def _insert_many(self, entries: Iterable[Tuple[str, Dict]]):
+        """在一个事务中批量写入，出错时回滚并抛出异常"""
+        with self.conn:
+            for talent_id, record in entries:
+                success = 1 if record["status"] == "success" else 0
+                self.conn.execute(self.INSERT_ATTEMPT,
+                                  (talent_id, record["name"], record["status"], record["time"]))
+                self.conn.execute(self.UPSERT_TALENT,
+                                  (talent_id, record["name"], success, record["time"]))
+
+    def append_many(self, entries: Iterable[Tuple[str, Dict]]):
+        """在一个事务中批量写入；失败时整批回滚并抛出异常，调用方可以原样重试"""
+        self._insert_many(entries)
+
+    def talent_status(self, talent_id: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT success FROM talents WHERE talent_id = ?", (talent_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return "success" if row[0] else "failed"
+
+    def statistics(self) -> Dict:
+        total, success = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(success), 0) FROM talents"
+        ).fetchone()
+        return {
+            "total": total,
+            "success": success,
+            "failed": total - success
+        }
+
+    def get_all(self) -> Dict[str, List[Dict]]:
+        records: Dict[str, List[Dict]] = {}
+        rows = self.conn.execute("SELECT talent_id, name, status, time FROM attempts ORDER BY id")
+        for talent_id, name, status, time_str in rows:
+            records.setdefault(talent_id, []).append(
+                {"name": name, "status": status, "time": time_str}
+            )
+        return records
+
+    def close(self):
+        self.conn.close()
+
+
+class IndexedLogRecordStore:
+    """追加式日志 + 紧凑索引
+
+    日志格式与 jsonl 后端相同（两者可以互相切换）；是否已邀约和汇总统计由 .idx 索引回答。
+    启动时读入索引后只回放上次保存索引之后新增的日志行；没有索引或日志已被压缩重写时流式扫描一遍重建。
+    完整历史只在 get_all() 时回放。
+    """
+
+    def __init__(self, record_file: str):
+        self.record_file = record_file
+        self.log_file = os.path.splitext(record_file)[0] + '.jsonl'
+        self.index_file = os.path.splitext(record_file)[0] + '.idx'
+        self._handle = None
+        self._history: Optional[Dict[str, List[Dict]]] = None
+        # 索引相对索引文件有变化时，关闭时才重新保存
+        self._dirty = False
+
+        if not os.path.exists(self.log_file) and os.path.exists(record_file):
+            # 旧格式 JSON 流式转换成日志，不在内存中保留历史
+            reader = convert_legacy_to_log(record_file, self.log_file)
+            print(f"已从 {record_file} 导入 {reader.count} 位达人的记录")
+            if not reader.complete:
+                print(reader.report())
+        self.index = self._load_index()
+
+    def _load_index(self) -> CompactTalentIndex:
+        if not os.path.exists(self.log_file):
+            return CompactTalentIndex()
+
+        stat = os.stat(self.log_file)
+        loaded = CompactTalentIndex.load(self.index_file)
+        if loaded and loaded[1] == stat.st_ino and loaded[2] <= stat.st_size:
+            index, _, offset = loaded
+            for item in _iter_log(self.log_file, offset):
+                if item is not None:
+                    talent_id, records = item
+                    index.add(talent_id, _history_status(records) == "success")
+                    self._dirty = True
+            return index
+
+        corrupt = []
+
+        def entries():
+            for item in _iter_log(self.log_file):
+                if item is None:
+                    corrupt.append(1)
+                    continue
+                talent_id, records = item
+                yield talent_id, _history_status(records) == "success"
+
+        index = CompactTalentIndex.build(entries())
+        if corrupt:
+            print(f"记录日志中有 {len(corrupt)} 行损坏，已跳过")
+        self._save_index(index)
+        print(f"已重建达人索引: {index.total} 位达人")
+        return index
+
+    def _save_index(self, index: CompactTalentIndex):
+        try:
+            stat = os.stat(self.log_file)
+            index.save(self.index_file, stat.st_ino, stat.st_size)
+        except OSError as e:
+            # 索引只是加速启动，下次启动时从日志重建
+            logger.warning(f"保存达人索引失败: {e}")
+
+    def _open(self):
+        if self._handle is None:
+            _ensure_parent_dir(self.log_file)
+            self._handle = open(self.log_file, 'a+b')
+            # 上次崩溃留下半行时先补上换行，避免新记录接在损坏的行后面
+            if self._handle.tell() > 0:
+                self._handle.seek(-1, os.SEEK_END)
+                if self._handle.read(1) != b'\n':
+                    self._handle.write(b'\n')
+        return self._handle
+
+    def contains(self, talent_id: str) -> bool:
+        return talent_id in self.index
+
+    def append(self, talent_id: str, record: Dict):
+        self.append_many([(talent_id, record)])
+
+    def append_many(self, entries: Iterable[Tuple[str, Dict]]):
+        """先写日志再更新索引；写入失败时抛出异常，调用方可以原样重试"""
+        entries = list(entries)
+        handle = self._open()
+        handle.write(''.join(json.dumps({"id": talent_id, **record}, ensure_ascii=False) + "\n"
+                             for talent_id, record in entries).encode('utf-8'))
+        handle.flush()
+
+        for talent_id, record in entries:
+            self.index.add(talent_id, record["status"] == "success")
+            self._dirty = True
+            if self._history is not None:
+                self._history.setdefault(talent_id, []).append(record)
+
+    def statistics(self) -> Dict:
+        return {
+            "total": self.index.total,
+            "success": self.index.success,
+            "failed": self.index.total - self.index.success
+        }
+
+    def talent_status(self, talent_id: str) -> Optional[str]:
+        return self.index.status(talent_id)
+
+    def get_all(self) -> Dict[str, List[Dict]]:
+        """回放日志得到完整历史（第一次调用时才加载）"""
+        if self._history is None:
+            self._history = {}
+            if os.path.exists(self.log_file):
+                for item in _iter_log(self.log_file):
+                    if item is not None:
+                        self._history.setdefault(item[0], []).extend(item[1])
+        return self._history
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._dirty and os.path.exists(self.log_file):
+            self._save_index(self.index)
+            self._dirty = False
+
+
+def _iter_legacy_entries(items: Iterable[Tuple[str, List[Dict]]]) -> Iterable[Tuple[str, Dict]]:
+    """把 (达人ID, 记录列表) 展开为 (达人ID, 单条记录) 序列"""
+    for talent_id, history in items:
+        for record in history:
+            yield talent_id, record
+
+
+STORE_BACKENDS = {
+    'json': JsonRecordStore,
+    'jsonl': AppendLogRecordStore,
+    'sqlite': SqliteRecordStore,
+    'indexed': IndexedLogRecordStore,
+}
+
+
+def create_store(backend: str, record_file: str):
+    """根据配置创建存储后端"""
+    store_class = STORE_BACKENDS.get(backend)
+    if store_class is None:
+        raise ValueError(f"未知的记录存储后端: {backend}（可选: {', '.join(STORE_BACKENDS)}）")
+    return store_class(record_file)
+
+
+def migrate(record_file: str, backend: str):
+    """把旧格式 invite_records.json 导入指定后端（新后端在创建时流式导入，只遍历一次文件）"""
+    store = create_store(backend, record_file)
+    try:
+        # 新后端在创建时已自动导入过的，不重复写入
+        if store.statistics()["total"] == 0:
+            reader = LegacyRecordReader(record_file)
+            store.append_many(_iter_legacy_entries(reader))
+            if not reader.complete:
+                print(reader.report())
+        stats = store.statistics()
+    finally:
+        store.close()
+    print(f"迁移完成: {record_file} -> {backend}（库内共 {stats['total']} 位达人）")
+
+
+def check(record_file: str) -> bool:
+    """只读检查旧格式记录文件是否完整"""
+    reader = LegacyRecordReader(record_file)
+    for _ in reader:
+        pass
+    print(reader.report())
+    return reader.complete
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="邀约记录存储工具")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = subparsers.add_parser('migrate', help='把旧格式 JSON 记录迁移到新后端')
+    migrate_parser.add_argument('record_file', help='invite_records.json 路径')
+    migrate_parser.add_argument('--to', dest='backend', default='sqlite',
+                                choices=[b for b in STORE_BACKENDS if b != 'json'])
+
+    check_parser = subparsers.add_parser('check', help='检查旧格式 JSON 记录是否完整')
+    check_parser.add_argument('record_file', help='invite_records.json 路径')
+
+    args = parser.parse_args()
+    if args.command == 'migrate':
+        migrate(args.record_file, args.backend)
+    elif args.command == 'check':
+        if not check(args.record_file):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
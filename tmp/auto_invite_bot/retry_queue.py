@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+邀约失败的延后重试队列
+
+邀约失败分两类：
+- 临时失败：弹窗渲染慢、点击超时、WebDriver 异常等，放进重试队列，按指数退避
+  （retry_base_delay * 2^(次数-1)，不超过 retry_max_delay）延后重试
+- 永久失败：在 permanent_failure_steps 中的步骤失败（默认"邀请带货"按钮不存在，即达人不接受邀约）、
+  非浏览器异常，或临时失败已重试 retry_max_attempts 次
+
+两类失败都会写入一条 failed 记录，正常流程不会原地重试；队列保存在 retry_queue_file 中，
+到期的条目在运行结束时集中重试（有详情地址时直接打开），或在之后的运行中卡片再次出现时重试。
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from json_state import load_json, save_json
+
+
+class RetryQueue:
+    """达人ID -> {name, detail_url, page, attempts, next_time, reason}"""
+
+    def __init__(self, queue_file: Optional[str], base_delay: float = 60, max_delay: float = 6 * 3600,
+                 max_attempts: int = 3):
+        self.queue_file = queue_file
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.entries: Dict[str, Dict] = {}
+        # 本次运行：重试次数、重试成功、转为永久失败
+        self.counts = {"retried": 0, "recovered": 0, "gave_up": 0}
+        self._load()
+
+    def _load(self):
+        self.entries = load_json(self.queue_file, "重试队列") or {}
+
+    def __contains__(self, talent_id: str) -> bool:
+        return talent_id in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def is_due(self, talent_id: str, now: Optional[float] = None) -> bool:
+        entry = self.entries.get(talent_id)
+        return entry is not None and entry['next_time'] <= (now or time.time())
+
+    def due(self, now: Optional[float] = None) -> List[Dict]:
+        """已到重试时间的条目（含 id），最早失败的在前"""
+        now = now or time.time()
+        entries = [{"id": talent_id, **entry} for talent_id, entry in self.entries.items()
+                   if entry['next_time'] <= now]
+        return sorted(entries, key=lambda entry: entry['next_time'])
+
+    def defer(self, talent_id: str, name: str, reason: str, detail_url: Optional[str] = None,
+              page: Optional[int] = None) -> bool:
+        """记录一次临时失败；已达到最大重试次数时移出队列并返回 False（转为永久失败）"""
+        entry = self.entries.get(talent_id)
+        if entry:
+            self.counts["retried"] += 1
+        attempts = entry['attempts'] + 1 if entry else 1
+        if attempts > self.max_attempts:
+            self.entries.pop(talent_id, None)
+            self.counts["gave_up"] += 1
+            self.save()
+            return False
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        self.entries[talent_id] = {
+            "name": name,
+            "detail_url": detail_url or (entry or {}).get('detail_url'),
+            "page": page,
+            "attempts": attempts,
+            "next_time": time.time() + delay,
+            "reason": reason,
+        }
+        self.save()
+        return True
+
+    def drop(self, talent_id: str, recovered: bool = False, permanent: bool = False) -> bool:
+        """重试之后移出队列：recovered 为重试成功，permanent 为重试时遇到永久失败；返回之前是否在队列中
+
+        只有队列中已到期的达人才会被重试，所以在队列中即说明刚刚重试过一次。
+        """
+        if self.entries.pop(talent_id, None) is None:
+            return False
+        self.counts["retried"] += 1
+        if recovered:
+            self.counts["recovered"] += 1
+        if permanent:
+            self.counts["gave_up"] += 1
+        self.save()
+        return True
+
+    def save(self):
+        """写临时文件后原子替换"""
+        if not self.queue_file:
+            return
+        save_json(self.queue_file, self.entries, "重试队列", indent=2)
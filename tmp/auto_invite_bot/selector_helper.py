@@ -8,24 +8,22 @@
 3. 根据提示检查元素
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+import json
+
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+
+from browser_factory import create_driver, shutdown_driver
 
 
 class SelectorHelper:
     """选择器辅助工具"""
 
-    def __init__(self):
-        chrome_options = Options()
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--window-size=1920,1080')
+    def __init__(self, config_file: str = "config.json"):
+        with open(config_file, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
 
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        # 不使用系统用户目录，避免与正在运行的 Chrome 冲突
+        self.driver = create_driver(self.config, use_profile=False)
 
     def inspect_element(self):
         """检查元素"""
@@ -77,7 +75,7 @@ class SelectorHelper:
     def __del__(self):
         """关闭浏览器"""
         if self.driver:
-            self.driver.quit()
+            shutdown_driver(self.driver, self.config)
 
 
 def main():
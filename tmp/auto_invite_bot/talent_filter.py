@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按卡片信息预先筛选达人
+
+每位达人的邀约流程要点击 5 次、每次都有 1~3 秒的随机延迟，不符合条件的达人（类目不对、
+粉丝数不在范围内等）应该在打开详情页之前就跳过。卡片上的类目、粉丝数、带货等级等字段
+由 card_fields（或 listing_api.fields）一并取回，这里按 config.json 中的 talent_filters 判断：
+
+    "talent_filters": [
+        {"field": "category", "in": ["美妆", "个护"]},
+        {"field": "fans", "min": 10000, "max": 1000000},
+        {"field": "sales_tier", "not_in": ["暂无"]},
+        {"field": "name", "pattern": "官方|旗舰店", "exclude": true}
+    ]
+
+- in / not_in：取值在（不在）列表中
+- min / max：数值范围，"1.2万"、"3.5w"、"10万+"、"1,234" 等写法都会换算成数字
+- pattern：正则匹配；exclude 为 true 时匹配到的达人被跳过
+- 卡片上没有该字段时不做判断，除非规则写了 "required": true
+
+规则在启动时编译一次。跳过的达人按 ID 记入 skip_cache_file，之后的运行直接跳过；
+规则有改动时缓存自动作废，超过 skip_cache_days 天的条目也会重新判断（粉丝数会变化）。
+"""
+
+import hashlib
+import json
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from json_state import ExpiringCache
+
+
+# 数字后缀对应的倍数
+COUNT_UNITS = {
+    '': 1, 'k': 1e3, 'K': 1e3, '千': 1e3,
+    'w': 1e4, 'W': 1e4, '万': 1e4,
+    'm': 1e6, 'M': 1e6,
+    '亿': 1e8,
+}
+
+COUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*([kKwWmM千万亿]?)')
+
+
+def parse_count(value) -> Optional[float]:
+    """把 "1.2万"、"3.5w"、"10万+"、"1,234" 等写法换算成数字；区间（"1万-5万"）取下限；无法识别时返回 None"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return None
+    match = COUNT_PATTERN.search(str(value).replace(',', ''))
+    if not match:
+        return None
+    return float(match.group(1)) * COUNT_UNITS[match.group(2)]
+
+
+def _compile_rule(rule: Dict) -> Tuple[str, Callable[[object], bool], str]:
+    """把一条规则编译成 (字段名, 判断函数, 说明)，判断函数返回 True 表示符合条件"""
+    field = rule['field']
+    checks: List[Callable[[object], bool]] = []
+    parts = []
+
+    if 'in' in rule:
+        allowed = {str(v) for v in rule['in']}
+        checks.append(lambda value: str(value).strip() in allowed)
+        parts.append(f"属于 {'/'.join(sorted(allowed))}")
+    if 'not_in' in rule:
+        denied = {str(v) for v in rule['not_in']}
+        checks.append(lambda value: str(value).strip() not in denied)
+        parts.append(f"不属于 {'/'.join(sorted(denied))}")
+    if 'min' in rule or 'max' in rule:
+        low = rule.get('min', float('-inf'))
+        high = rule.get('max', float('inf'))
+
+        def in_range(value) -> bool:
+            number = parse_count(value)
+            return number is not None and low <= number <= high
+
+        checks.append(in_range)
+        parts.append(f"在 {rule.get('min', '-')} ~ {rule.get('max', '-')} 之间")
+    if 'pattern' in rule:
+        pattern = re.compile(rule['pattern'])
+        exclude = rule.get('exclude', False)
+        checks.append(lambda value: bool(pattern.search(str(value))) != exclude)
+        parts.append(f"{'不' if exclude else ''}匹配 {rule['pattern']}")
+
+    if not checks:
+        raise ValueError(f"筛选规则没有条件: {rule}")
+
+    return field, lambda value: all(check(value) for check in checks), f"{field} {'且'.join(parts)}"
+
+
+class TalentFilter:
+    """编译好的达人筛选规则"""
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = [(*_compile_rule(rule), rule.get('required', False)) for rule in rules]
+        # 规则内容的摘要，规则变化时跳过缓存作废
+        self.signature = hashlib.sha1(
+            json.dumps(rules, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+        # 每条规则跳过的达人数
+        self.counts: Dict[str, int] = {description: 0 for _, _, description, _ in self.rules}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def check(self, card: Dict) -> Optional[str]:
+        """达人不符合条件时返回原因（规则说明），符合或无法判断时返回 None"""
+        for field, accept, description, required in self.rules:
+            value = card.get(field)
+            if value is None or value == '':
+                if required:
+                    self.counts[description] += 1
+                    return f"缺少 {field}"
+                continue
+            if not accept(value):
+                self.counts[description] += 1
+                return f"{description}（实际 {value}）"
+        return None
+
+
+class SkipCache(ExpiringCache):
+    """按达人 ID 记住被筛掉的达人，跨运行复用"""
+
+    ENTRIES_KEY = "talents"
+    DESCRIPTION = "跳过缓存"
+
+    def __init__(self, cache_file: Optional[str], signature: str, ttl_days: float = 7):
+        super().__init__(cache_file, signature, ttl_days)
+
+    def get(self, talent_id: str) -> Optional[str]:
+        """缓存中的跳过原因，没有时返回 None"""
+        entry = self.entries.get(talent_id)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry['reason']
+
+    def add(self, talent_id: str, reason: str):
+        self.put(talent_id, reason=reason)
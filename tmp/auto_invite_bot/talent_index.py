@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的已邀约达人索引
+
+每位达人只占 8 字节：达人 ID 的 64 位哈希（blake2b），最低位改为"是否邀约成功"标记，
+排好序存成 array('Q')，查询用二分查找。本次运行新增的达人先放在小字典里，保存时再合并。
+
+索引文件（.idx）格式：
+    8 字节魔数 + 头部（条数、成功数、对应日志的 inode 和字节偏移）+ 排好序的 uint64 数组
+启动时直接读入数组，不需要解析全部邀约历史。
+
+哈希碰撞只会让一位从未邀约过的达人被误判为已邀约（跳过），500 万位达人时概率约百万分之一。
+"""
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Optional, Tuple
+
+
+MAGIC = b'TIDX\x00\x01\x00\x00'
+# 条数, 成功数, 日志 inode, 日志字节偏移
+HEADER = struct.Struct('<QQQQ')
+
+
+def hash_id(talent_id: str) -> int:
+    """达人 ID 的 64 位哈希，最低位清零（留作成功标记）"""
+    digest = hashlib.blake2b(talent_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') & ~1
+
+
+class CompactTalentIndex:
+    """排好序的哈希数组 + 本次运行新增的达人"""
+
+    def __init__(self, keys: Optional[array] = None, success: Optional[int] = None):
+        self.keys = keys if keys is not None else array('Q')
+        self.delta: Dict[int, bool] = {}
+        self.total = len(self.keys)
+        self.success = success if success is not None else sum(key & 1 for key in self.keys)
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, bool]]) -> 'CompactTalentIndex':
+        """由 (达人ID, 本次是否成功) 序列建立索引，同一达人多次出现时有一次成功即为成功"""
+        raw = array('Q', (hash_id(talent_id) | int(ok) for talent_id, ok in entries))
+        keys = array('Q')
+        # 排序后同一达人的"失败"键排在"成功"键前面，只保留最后一个
+        for key in sorted(raw):
+            if keys and keys[-1] | 1 == key | 1:
+                keys[-1] = key | keys[-1]
+            else:
+                keys.append(key)
+        return cls(keys)
+
+    def _base_status(self, key: int) -> Optional[bool]:
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] | 1 == key | 1:
+            # 失败键 (key) 与成功键 (key | 1) 只会存在一个
+            return bool(self.keys[index] & 1)
+        return None
+
+    def status(self, talent_id: str) -> Optional[str]:
+        """达人的汇总状态：success / failed，未邀约过返回 None"""
+        key = hash_id(talent_id)
+        ok = self.delta.get(key)
+        if ok is None:
+            ok = self._base_status(key)
+        if ok is None:
+            return None
+        return "success" if ok else "failed"
+
+    def __contains__(self, talent_id: str) -> bool:
+        return self.status(talent_id) is not None
+
+    def add(self, talent_id: str, ok: bool):
+        """记录一次邀约结果"""
+        key = hash_id(talent_id)
+        previous = self.delta.get(key)
+        if previous is None:
+            previous = self._base_status(key)
+        if previous is None:
+            self.total += 1
+        if ok and not previous:
+            self.success += 1
+        self.delta[key] = bool(ok or previous)
+
+    def merged(self) -> array:
+        """把新增的达人合并进排好序的数组"""
+        if not self.delta:
+            return self.keys
+        added = sorted(key | int(ok) for key, ok in self.delta.items())
+        merged = array('Q')
+        i = j = 0
+        keys = self.keys
+        while i < len(keys) or j < len(added):
+            if j >= len(added) or (i < len(keys) and keys[i] | 1 < added[j] | 1):
+                merged.append(keys[i])
+                i += 1
+            elif i >= len(keys) or added[j] | 1 < keys[i] | 1:
+                merged.append(added[j])
+                j += 1
+            else:
+                merged.append(keys[i] | added[j])
+                i += 1
+                j += 1
+        return merged
+
+    def save(self, index_file: str, log_inode: int, log_offset: int):
+        """写临时文件后原子替换"""
+        keys = self.merged()
+        if sys.byteorder != 'little':
+            keys = array('Q', keys)
+            keys.byteswap()
+        tmp_file = index_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(MAGIC)
+            f.write(HEADER.pack(len(keys), self.success, log_inode, log_offset))
+            keys.tofile(f)
+        os.replace(tmp_file, index_file)
+
+    @classmethod
+    def load(cls, index_file: str) -> Optional[Tuple['CompactTalentIndex', int, int]]:
+        """读取索引文件，返回 (索引, 日志 inode, 日志偏移)；文件不存在或损坏时返回 None"""
+        try:
+            with open(index_file, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                count, success, log_inode, log_offset = HEADER.unpack(f.read(HEADER.size))
+                keys = array('Q')
+                keys.fromfile(f, count)
+        except (OSError, EOFError, struct.error):
+            return None
+        if sys.byteorder != 'little':
+            keys.byteswap()
+        return cls(keys, success), log_inode, log_offset
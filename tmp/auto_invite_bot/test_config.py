@@ -112,10 +112,15 @@ def test_main_config():
     else:
         print("\n⚠ 未找到 START_URL 配置")
 
-    # 检查选择器
-    if 'talent-item' in content:
+    # 检查选择器（已移到 config.json 的 card_selector / card_fields）
+    try:
+        with open("config.json", 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception:
+        config = {}
+    if config.get('card_selector', '.talent-item') == '.talent-item':
         print("⚠ 达人卡片选择器使用默认值，可能需要修改")
-    if 'talent-name' in content:
+    if '.talent-name' in config.get('card_fields', {}).get('name', '.talent-name'):
         print("⚠ 达人名称选择器使用默认值，可能需要修改")
 
     print("\n提示：")
@@ -130,6 +135,86 @@ def test_main_config():
     return True
 
 
+# 两张达人卡片，没有打开的弹窗；页面其他位置还有一个"确认"按钮
+SCOPE_FIXTURE = """
+<div class="talent-list">
+  <div class="talent-item" data-id="t1"><span class="talent-name">达人一</span><button>详情</button></div>
+  <div class="talent-item" data-id="t2"><span class="talent-name">达人二</span><button>详情</button></div>
+</div>
+<div class="filter-bar"><button>确认</button></div>
+"""
+
+
+def check_missing_scopes() -> bool:
+    """当前卡片或弹窗不在页面上时，范围内的步骤必须找不到按钮，而不是退回整个页面点到别处"""
+    from card_extractor import CardExtractor, CardHandle
+    from dom_snapshot import locate, parse_html
+    from page_selectors import SelectorRegistry
+
+    # 使用默认的步骤选择器和范围，只检查范围的退回规则
+    config = {"card_selector": ".talent-item", "card_fields": {"id": "@data-id", "name": ".talent-name"}}
+    root = parse_html(SCOPE_FIXTURE)
+    registry = SelectorRegistry(config)
+    extractor = CardExtractor(None, config)
+
+    def details_of(talent_id):
+        spec = registry.spec('details', extractor.card_scope(CardHandle(extractor, talent_id)))
+        return locate(root, spec)
+
+    ok = True
+    found = details_of('t2')
+    if found is None or found.parent.attrs.get('data-id') != 't2':
+        print("✗ 没有在当前达人的卡片内找到详情按钮")
+        ok = False
+    if details_of('missing') is not None:
+        print("✗ 卡片不存在时在整个页面中找到了别的卡片的详情按钮")
+        ok = False
+    if locate(root, registry.spec('confirm')) is not None:
+        print("✗ 弹窗不存在时在弹窗外找到了确认按钮")
+        ok = False
+    if ok:
+        print("✓ 卡片或弹窗不存在时不会在整个页面中查找")
+    return ok
+
+
+def test_selector_scopes():
+    """检查卡片、弹窗不存在时不会退回整个页面，并用保存的页面快照检查弹窗、分页栏等范围选择器是否存在"""
+    print("\n" + "="*60)
+    print("范围选择器测试")
+    print("="*60)
+
+    from dom_snapshot import evaluate_snapshot
+
+    try:
+        with open("config.json", 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception:
+        config = {}
+    ok = check_missing_scopes()
+
+    snapshot = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'assets', '达人广场源代码.txt')
+    if not os.path.exists(snapshot):
+        print(f"⚠ 没有页面快照，跳过: {snapshot}")
+        return ok
+    with open(snapshot, 'r', encoding='utf-8') as f:
+        html = f.read()
+    report = evaluate_snapshot(html, config)
+
+    for scope, result in report['scopes'].items():
+        if result['count']:
+            print(f"✓ {scope} {result['selector']!r}: 快照中匹配 {result['count']} 个")
+        else:
+            print(f"✗ {scope} {result['selector']!r}: 快照中没有匹配（该范围内的步骤会找不到按钮）")
+            ok = False
+
+
+    print("\n" + "="*60)
+    print("范围选择器测试完成")
+    print("="*60)
+
+    return ok
+
+
 def test_dependencies():
     """测试依赖包"""
     print("\n" + "="*60)
@@ -181,6 +266,9 @@ def main():
     # 测试主程序配置
     results.append(("主程序配置", test_main_config()))
 
+    # 测试范围选择器
+    results.append(("范围选择器", test_selector_scopes()))
+
     # 测试依赖包
     results.append(("依赖包", test_dependencies()))
 
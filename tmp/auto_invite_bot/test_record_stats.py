@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+邀约统计测试脚本 - 检查各存储后端的增量统计与完整重新统计是否一致
+
+用法：
+    python3 test_record_stats.py [--backends json,jsonl,indexed,sqlite --streams 50 --length 500]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from record_manager import RecordManager
+
+
+def check_backend(backend: str, streams: int, length: int, rng: random.Random) -> bool:
+    """随机记录流：增量计数必须与完整重新统计一致，每小时计数之和必须等于本次运行的计数"""
+    print("\n" + "="*60)
+    print(f"{backend} 后端")
+    print("="*60)
+
+    mismatches = 0
+    work_dir = tempfile.mkdtemp(prefix='test_record_stats_')
+    try:
+        for stream in range(streams):
+            manager = RecordManager(os.path.join(work_dir, f'records_{stream}.json'), backend)
+            # ID 池较小，保证同一达人多次出现（失败后重试成功等情况）
+            pool = [f"talent_{i}" for i in range(rng.randint(1, length // 2 + 1))]
+            for _ in range(length):
+                if rng.random() < 0.1:
+                    entries = [(rng.choice(pool), "达人", rng.choice(["success", "failed"]))
+                               for _ in range(rng.randint(1, 5))]
+                    manager.add_records(entries)
+                else:
+                    manager.add_record(rng.choice(pool), "达人", rng.choice(["success", "failed"]))
+                if rng.random() < 0.05:
+                    manager.start_page(rng.randint(1, 100))
+
+            incremental = manager.get_statistics()
+            full = manager.recompute_statistics()
+            if incremental != full:
+                mismatches += 1
+                print(f"✗ 第 {stream} 组不一致: 增量 {incremental} / 重新统计 {full}")
+
+            run = manager.get_run_statistics()
+            hours_total = sum(c["attempts"] for c in run["hours"].values())
+            if hours_total != run["run"]["attempts"]:
+                mismatches += 1
+                print(f"✗ 第 {stream} 组每小时计数之和 {hours_total} 与本次运行 {run['run']['attempts']} 不一致")
+            manager.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if mismatches == 0:
+        print(f"✓ {streams} 组随机记录流的增量统计与完整统计一致")
+    return mismatches == 0
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="增量统计正确性测试")
+    parser.add_argument('--backends', default='json,jsonl,indexed,sqlite')
+    parser.add_argument('--streams', type=int, default=50)
+    parser.add_argument('--length', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = [(backend, check_backend(backend, args.streams, args.length, rng))
+               for backend in args.backends.split(',')]
+
+    print("\n" + "="*60)
+    print("测试总结")
+    print("="*60)
+    for name, result in results:
+        status = "✓ 通过" if result else "✗ 失败"
+        print(f"  {name}: {status}")
+    print("="*60)
+
+    if not all(result for _, result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
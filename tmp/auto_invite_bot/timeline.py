@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行时间线
+
+记录邀约流程中每一步的耗时（等待、操作、随机延迟、重试次数），写入：
+- jsonl:  每行一个事件
+- trace:  Chrome trace-event 格式，可直接拖进 chrome://tracing 或 Perfetto 查看
+
+每次运行追加到同一个文件，事件带有运行 ID（run），--resume 继续的运行沿用原来的运行 ID。
+
+按运行汇总各步骤、各页的 p50/p95/p99（--run 只看指定的运行）：
+    python3 timeline.py summarize /tmp/auto_invite_bot/timeline.jsonl
+    python3 timeline.py summarize /tmp/auto_invite_bot/timeline.jsonl --run 20240101120000
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class RunTimeline:
+    """运行时间线记录器；path 为空时不记录"""
+
+    def __init__(self, path: Optional[str], fmt: str = "jsonl", run_id: Optional[str] = None):
+        self.path = path
+        self.fmt = fmt
+        # 写入每个事件的运行 ID，恢复断点时由调用方改为原来的运行 ID
+        self.run_id = run_id
+        self._handle = None
+
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            # 追加写入，保留之前运行（包括被中断、之后 --resume 继续的运行）的事件
+            self._handle = open(path, 'a', encoding='utf-8')
+            if fmt == "trace" and self._handle.tell() == 0:
+                # JSON 数组格式允许省略结尾的 ]，崩溃时文件依然可读，之后的运行也能继续追加
+                self._handle.write("[\n")
+
+    @property
+    def enabled(self) -> bool:
+        return self._handle is not None
+
+    def event(self, name: str, category: str, start: float, duration: float, **args):
+        """记录一个已完成的事件；start 为 time.time() 时间戳，duration 单位为秒"""
+        if not self._handle:
+            return
+        if self.fmt == "trace":
+            # 多次运行写在同一个文件里，使用绝对时间戳以免各次运行的事件重叠
+            entry = {
+                "name": name, "cat": category, "ph": "X",
+                "ts": round(start * 1e6), "dur": round(duration * 1e6),
+                "pid": 1, "tid": 1, "args": {"run": self.run_id, **args},
+            }
+            self._handle.write(json.dumps(entry, ensure_ascii=False) + ",\n")
+        else:
+            entry = {"name": name, "cat": category, "run": self.run_id, "ts": round(start, 6),
+                     "dur": round(duration, 6), **args}
+            self._handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._handle.flush()
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        """记录代码块耗时；块内可往 yield 出的字典里追加字段"""
+        start = time.time()
+        extra: Dict = {}
+        try:
+            yield extra
+        finally:
+            self.event(name, category, start, time.time() - start, **args, **extra)
+
+    def close(self):
+        if self._handle:
+            self._handle.close()
+            self._handle = None
+
+
+def load_events(path: str) -> List[Dict]:
+    """读取 jsonl 或 trace 格式的时间线，统一为秒为单位、字段平铺的事件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    events = []
+    if content.lstrip().startswith('['):
+        body = content.strip().rstrip(',').rstrip(']').rstrip().rstrip(',')
+        for entry in json.loads(body + ']'):
+            events.append({"name": entry["name"], "cat": entry.get("cat"),
+                           "dur": entry.get("dur", 0) / 1e6, **entry.get("args", {})})
+    else:
+        for line in content.splitlines():
+            if line.strip():
+                events.append(json.loads(line))
+    return events
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩法百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(events: List[Dict]) -> Dict:
+    """按运行分组，每次运行按步骤和按页汇总耗时分位数：运行 ID -> {steps, pages}"""
+    by_run: Dict[str, List[Dict]] = {}
+    for event in events:
+        # 早期的时间线没有运行 ID
+        by_run.setdefault(event.get("run") or "", []).append(event)
+    return {run: summarize_run(run_events) for run, run_events in by_run.items()}
+
+
+def summarize_run(events: List[Dict]) -> Dict:
+    """一次运行的事件按步骤和按页汇总耗时分位数"""
+    by_step: Dict[str, List[Dict]] = {}
+    by_page: Dict[str, List[float]] = {}
+    for event in events:
+        if event.get("cat") == "step":
+            by_step.setdefault(event["name"], []).append(event)
+        elif event.get("cat") == "talent":
+            by_page.setdefault(str(event.get("page")), []).append(event["dur"])
+
+    steps = {}
+    for name, items in by_step.items():
+        durations = [e["dur"] for e in items]
+        steps[name] = {
+            "count": len(items),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+            "wait": sum(e.get("wait", 0) for e in items) / len(items),
+            "action": sum(e.get("action", 0) for e in items) / len(items),
+            "delay": sum(e.get("delay", 0) for e in items) / len(items),
+            "retries": sum(e.get("retries", 0) for e in items),
+            "failed": sum(1 for e in items if not e.get("ok", True)),
+        }
+
+    pages = {
+        page: {
+            "talents": len(durations),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+        }
+        for page, durations in by_page.items()
+    }
+    return {"steps": steps, "pages": pages}
+
+
+def print_summary(summary: Dict):
+    """逐个运行打印汇总表"""
+    for run, run_summary in sorted(summary.items()):
+        print(f"\n运行 {run or '（未记录运行 ID）'}")
+        print_run_summary(run_summary)
+
+
+def print_run_summary(summary: Dict):
+    """打印一次运行的汇总表"""
+    print("="*100)
+    print("各步骤耗时（秒）")
+    print("="*100)
+    print(f"{'步骤':<20}{'次数':>6}{'p50':>8}{'p95':>8}{'p99':>8}"
+          f"{'平均等待':>10}{'平均操作':>10}{'平均延迟':>10}{'重试':>6}{'失败':>6}")
+    steps = sorted(summary["steps"].items(), key=lambda item: item[1]["p50"], reverse=True)
+    for name, s in steps:
+        print(f"{name:<20}{s['count']:>6}{s['p50']:>8.2f}{s['p95']:>8.2f}{s['p99']:>8.2f}"
+              f"{s['wait']:>10.2f}{s['action']:>10.2f}{s['delay']:>10.2f}{s['retries']:>6}{s['failed']:>6}")
+
+    print("\n" + "="*100)
+    print("各页单个达人耗时（秒）")
+    print("="*100)
+    print(f"{'页码':<8}{'达人数':>8}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for page, p in sorted(summary["pages"].items(), key=lambda item: (len(item[0]), item[0])):
+        print(f"{page:<8}{p['talents']:>8}{p['p50']:>8.2f}{p['p95']:>8.2f}{p['p99']:>8.2f}")
+    print("="*100)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="运行时间线工具")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summarize_parser = subparsers.add_parser('summarize', help='汇总各步骤、各页耗时分位数')
+    summarize_parser.add_argument('path', help='timeline.jsonl 或 trace 文件')
+    summarize_parser.add_argument('--run', nargs='+', metavar='RUN_ID', help='只汇总指定的运行')
+    summarize_parser.add_argument('--json', action='store_true', help='以 JSON 输出')
+    args = parser.parse_args()
+
+    summary = summarize(load_events(args.path))
+    if args.run:
+        summary = {run: s for run, s in summary.items() if run in args.run}
+        if not summary:
+            print(f"时间线中没有运行: {', '.join(args.run)}")
+            return
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()